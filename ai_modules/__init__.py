@@ -0,0 +1,46 @@
+"""
+FinSight AI modules.
+
+Importing `ai_modules` is free: submodules are only imported when first
+accessed (`ai_modules.fx_predictor`) and entry points are registered as
+"module:attribute" strings, so listing or wiring them up doesn't pull in
+numpy, scikit-learn or pandas.
+
+Models are retrained incrementally in the background by
+`ai_modules.training.RetrainScheduler`.
+"""
+
+import importlib
+
+SUBMODULES = (
+    "esg_scanner",
+    "fx_predictor",
+    "geo_risk",
+    "liquidity_model",
+    "regime_detection",
+    "valuation_model",
+)
+
+# Streaming tick subscribers consumed by ingestion.Pipeline.
+SUBSCRIBERS = {
+    "regime_detection": "ai_modules.regime_detection.stream:RegimeSubscriber",
+    "liquidity_model": "ai_modules.liquidity_model.stream:LiquiditySubscriber",
+    "fx_predictor": "ai_modules.fx_predictor.stream:FxSubscriber",
+}
+
+
+def resolve(target):
+    """Import and return the object named by a "module:attribute" string."""
+    module_name, _, attr = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr) if attr else module
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(SUBMODULES))
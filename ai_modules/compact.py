@@ -0,0 +1,271 @@
+"""
+Compact, memory-mappable inference artifacts for ai_modules models.
+
+`export()` turns a fitted scikit-learn model into a single .fsm file: a small
+JSON header followed by 64-byte aligned arrays (float32 or int8 weights,
+int32/int16 tree nodes). `load()` maps the file and scores it with numpy
+only, without importing scikit-learn or unpickling anything:
+
+    export(forest, "models/fx_predictor.fsm")             # or dtype="int8"
+    model = load("models/fx_predictor.fsm")                # ~ms, pages shared across workers
+    model.predict(X)
+
+Supported: linear models (anything with coef_ / intercept_), decision trees,
+random forests / extra trees and gradient boosting (classifiers and
+regressors), optionally behind StandardScaler steps of a Pipeline.
+
+All trees of an ensemble are flattened into shared node arrays (children
+stored as [right, left] pairs, leaves pointing to themselves), so
+prediction walks every tree for every row at once, one vectorized step per
+level over the (tree, row) pairs that have not reached a leaf yet. NaN features follow
+the side scikit-learn learned for missing values at each split. Like scikit-learn, features and thresholds are
+compared in float32, so predictions match up to float32 rounding of the leaf
+values (and the int8 scale, when quantized).
+"""
+
+import json
+import os
+
+import numpy as np
+
+from tracing import traced
+
+MAGIC = b"FSMODEL1"
+ALIGN = 64
+
+
+# --- File format ---
+def _write(path, header, arrays):
+    entries, offset = {}, 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        offset = -(-offset // ALIGN) * ALIGN
+        entries[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+    meta = json.dumps({**header, "arrays": entries}).encode()
+    start = -(-(len(MAGIC) + 8 + len(meta)) // ALIGN) * ALIGN
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + len(meta).to_bytes(8, "little") + meta)
+        for name, arr in arrays.items():
+            f.seek(start + entries[name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(start + offset)
+    os.replace(tmp, path)
+
+
+def _read(path):
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a compact model file")
+    size = int.from_bytes(bytes(buf[len(MAGIC):len(MAGIC) + 8]), "little")
+    header = json.loads(bytes(buf[len(MAGIC) + 8:len(MAGIC) + 8 + size]))
+    start = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+    arrays = {}
+    for name, e in header.pop("arrays").items():
+        dtype = np.dtype(e["dtype"])
+        count = int(np.prod(e["shape"], dtype=np.int64))
+        begin = start + e["offset"]
+        arrays[name] = buf[begin:begin + count * dtype.itemsize].view(dtype).reshape(e["shape"])
+    return header, arrays
+
+
+def _quantize(values, dtype):
+    """`values` as float32, or int8 with a per-column scale (returned alongside)."""
+    values = np.asarray(values, dtype=np.float64)
+    if dtype == "float32":
+        return values.astype(np.float32), None
+    if dtype != "int8":
+        raise ValueError(f"dtype must be 'float32' or 'int8', not {dtype!r}")
+    scale = np.abs(values).max(axis=0) / 127.0
+    scale = np.where(scale > 0, scale, 1.0)
+    return np.round(values / scale).astype(np.int8), scale.astype(np.float32)
+
+
+# --- Export ---
+def export(model, path, dtype="float32"):
+    """Write `model` to `path` in the compact format; returns the file size in bytes."""
+    header, arrays = {"version": 1, "dtype": dtype}, {}
+    steps = getattr(model, "steps", None)
+    if steps is not None:
+        for _, step in steps[:-1]:
+            if not hasattr(step, "scale_") or not hasattr(step, "mean_"):
+                raise TypeError(f"Only StandardScaler pipeline steps are supported, not {type(step).__name__}")
+            mean = step.mean_ if step.with_mean else np.zeros_like(step.scale_)
+            scale = step.scale_ if step.with_std else np.ones_like(step.mean_)
+            if "scale_mean" in arrays:  # chained scalers: x' = ((x - m1) / s1 - m2) / s2
+                mean = arrays["scale_mean"] + mean * arrays["scale_std"]
+                scale = arrays["scale_std"] * scale
+            arrays["scale_mean"], arrays["scale_std"] = mean.astype(np.float32), scale.astype(np.float32)
+        model = steps[-1][1]
+    classes = getattr(model, "classes_", None)
+    if classes is not None:
+        header["classes"] = np.asarray(classes).tolist()
+
+    if hasattr(model, "coef_") and hasattr(model, "intercept_"):
+        header["kind"] = "linear"
+        coef = np.atleast_2d(model.coef_).T                      # (F, outputs)
+        arrays["coef"], coef_scale = _quantize(coef, dtype)
+        if coef_scale is not None:
+            arrays["coef_scale"] = coef_scale
+        arrays["intercept"] = np.atleast_1d(model.intercept_).astype(np.float32)
+        header["link"] = "logistic" if hasattr(model, "predict_proba") and classes is not None else "identity"
+    elif hasattr(model, "tree_") or hasattr(model, "estimators_"):
+        header.update(_export_trees(model, arrays, dtype))
+    else:
+        raise TypeError(f"Cannot export {type(model).__name__}: no coef_ or tree structure")
+    header["n_features"] = int(getattr(model, "n_features_in_", arrays.get("coef", np.empty((0,))).shape[0]))
+    _write(path, header, arrays)
+    return os.path.getsize(path)
+
+
+def _round_down(thresholds):
+    """Largest float32 <= each threshold, so `x <= t` is unchanged for float32 x."""
+    t32 = thresholds.astype(np.float32)
+    return np.where(t32 > thresholds, np.nextafter(t32, np.float32(-np.inf)), t32)
+
+
+def _export_trees(model, arrays, dtype):
+    boosted = hasattr(model, "learning_rate") and hasattr(model, "init_")
+    if hasattr(model, "tree_"):
+        trees = [model]
+    elif boosted:
+        trees = list(np.asarray(model.estimators_).ravel())     # (stages, K) in stage-major order
+    else:
+        trees = list(model.estimators_)
+
+    features, thresholds, lefts, rights, values, roots, missing = [], [], [], [], [], [], []
+    offset, depth = 0, 0
+    for est in trees:
+        t = est.tree_
+        leaf = t.children_left == -1
+        idx = np.arange(t.node_count) + offset
+        features.append(np.where(leaf, 0, t.feature))
+        thresholds.append(np.where(leaf, np.inf, t.threshold))
+        lefts.append(np.where(leaf, idx, t.children_left + offset))
+        rights.append(np.where(leaf, idx, t.children_right + offset))
+        # scikit-learn >= 1.3 sends NaN to a learned side of each split.
+        missing.append(np.asarray(getattr(t, "missing_go_to_left", np.zeros(t.node_count)), dtype=bool) & ~leaf)
+        v = t.value[:, :, 0] if t.value.shape[2] == 1 else t.value[:, 0, :]   # (nodes, outputs)
+        if not boosted and t.value.shape[2] > 1:
+            v = v / np.maximum(v.sum(axis=1, keepdims=True), 1e-12)           # class counts -> proportions
+        values.append(v)
+        roots.append(offset)
+        offset += t.node_count
+        depth = max(depth, t.max_depth)
+
+    n_features = int(model.n_features_in_)
+    arrays["feature"] = np.concatenate(features).astype(np.int16 if n_features < 2 ** 15 else np.int32)
+    arrays["threshold"] = _round_down(np.concatenate(thresholds))
+    arrays["children"] = np.column_stack([np.concatenate(rights), np.concatenate(lefts)]).astype(np.int32)
+    arrays["roots"] = np.array(roots, dtype=np.int32)
+    missing = np.concatenate(missing)
+    if missing.any():
+        arrays["missing_left"] = missing.astype(np.uint8)
+    arrays["value"], value_scale = _quantize(np.concatenate(values), dtype)
+    if value_scale is not None:
+        arrays["value_scale"] = value_scale
+    header = {"kind": "trees", "depth": int(depth), "n_trees": len(trees)}
+    if boosted:
+        n_classes = np.asarray(model.estimators_).shape[1]
+        baseline = model._raw_predict_init(np.zeros((1, n_features), dtype=np.float32))[0]
+        arrays["baseline"] = np.asarray(baseline, dtype=np.float32)
+        header.update(combine="boost", learning_rate=float(model.learning_rate), n_groups=int(n_classes),
+                      link="identity" if getattr(model, "classes_", None) is None else "logistic")
+    else:
+        header.update(combine="mean", link="identity")
+    return header
+
+
+# --- Scoring ---
+class CompactModel:
+    """Numpy-only scorer for a file written by `export`."""
+
+    def __init__(self, header, arrays, path=None):
+        self.header = header
+        self.arrays = arrays
+        self.path = path
+        self.classes_ = np.asarray(header["classes"]) if "classes" in header else None
+        self.n_features_in_ = header["n_features"]
+
+    def __repr__(self):
+        return f"CompactModel({self.header['kind']}, {self.path!r})"
+
+    def _prepare(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None]
+        a = self.arrays
+        if "scale_mean" in a:
+            X = (X - a["scale_mean"]) / a["scale_std"]
+        return X
+
+    def _values(self, name):
+        v = self.arrays[name]
+        scale = self.arrays.get(f"{name}_scale")
+        return v if scale is None else v.astype(np.float32) * scale
+
+    @traced()
+    def raw(self, X):
+        """Margin / regression output, (n_samples, outputs)."""
+        X, a = self._prepare(X), self.arrays
+        if self.header["kind"] == "linear":
+            return X @ self._values("coef") + a["intercept"]
+
+        node = self._walk(X)                                    # (trees, samples) leaf index
+        leaf = self._values("value")[node]                      # (trees, samples, outputs)
+        if self.header["combine"] == "mean":
+            return leaf.mean(axis=0)
+        groups = self.header["n_groups"]
+        stages = leaf[..., 0].reshape(-1, groups, len(X)).sum(axis=0).T       # (samples, groups)
+        return a["baseline"] + self.header["learning_rate"] * stages
+
+    def _walk(self, X):
+        """Leaf reached in every tree by every row; only rows still inside a tree are stepped."""
+        a = self.arrays
+        feature, threshold, children = a["feature"], a["threshold"], a["children"]
+        n_samples, n_features = X.shape
+        x = np.ascontiguousarray(X).ravel()
+        node = np.repeat(a["roots"].astype(np.intp), n_samples)
+        offset = np.tile(np.arange(n_samples, dtype=np.intp) * n_features, len(a["roots"]))
+        missing_left = a.get("missing_left")
+        # Leaves are their own children; an infinite threshold is a real split
+        # (every value left, NaN right) in trees fitted on missing values.
+        active = np.flatnonzero(children[node, 0] != node)
+        while active.size:
+            idx = node[active]
+            xs = x[offset[active] + feature[idx]]
+            go_left = xs <= threshold[idx]
+            if missing_left is not None:
+                go_left |= np.isnan(xs) & missing_left[idx].astype(bool)
+            node[active] = nxt = children[idx, go_left.view(np.int8)]
+            active = active[children[nxt, 0] != nxt]
+        return node.reshape(len(a["roots"]), n_samples)
+
+    def predict_proba(self, X):
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        raw = self.raw(X)
+        if self.header["link"] != "logistic" or self.header.get("combine") == "mean":
+            return raw                                          # forests already average proportions
+        if raw.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        raw = np.exp(raw - raw.max(axis=1, keepdims=True))
+        return raw / raw.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        if self.classes_ is not None:
+            raw = self.raw(X)
+            if raw.shape[1] == 1:
+                idx = (raw[:, 0] > (0.5 if self.header.get("combine") == "mean" else 0.0)).astype(int)
+            else:
+                idx = raw.argmax(axis=1)
+            return self.classes_[idx]
+        out = self.raw(X)
+        return out[:, 0] if out.shape[1] == 1 else out
+
+
+def load(path):
+    header, arrays = _read(path)
+    return CompactModel(header, arrays, path)
@@ -0,0 +1,435 @@
+"""
+Pluggable executors for heavy jobs (Monte Carlo, backtests, ESG scans, retraining).
+
+Module code asks for an executor instead of creating pools itself, so the
+same code runs on threads, local processes or several machines:
+
+    with get_executor() as ex:                       # FINSIGHT_EXECUTOR, default "process"
+        for result in ex.map(simulate, paths, chunksize=64, retries=2, ordered=False):
+            ...                                      # streamed as chunks finish
+
+Backends, selected by a spec string (or FINSIGHT_EXECUTOR):
+
+    "thread[:N]"                 ThreadExecutor, for numpy/IO work that releases the GIL
+    "process[:N]"                ProcessExecutor, a local process pool
+    "cluster://host:port"        ClusterExecutor against a running broker
+    "cluster://local:N"          ClusterExecutor with its own broker and N local
+                                 worker processes (the single-machine stand-in)
+
+The cluster broker is a multiprocessing.managers server holding a task queue
+and one result queue per client; workers on any host pull chunks, run them
+and push results back:
+
+    export FINSIGHT_EXECUTOR_AUTHKEY=<shared secret>
+    python -m ai_modules.executor broker 0.0.0.0:50000
+    python -m ai_modules.executor worker broker-host:50000 --processes 8
+
+Workers unpickle and run whatever the broker hands them, so the broker is
+guarded by FINSIGHT_EXECUTOR_AUTHKEY, which every broker, worker and client
+reaching a non-loopback address must share (they refuse to start without
+it). On loopback a per-user key file is used instead, and
+"cluster://local:N" uses a random key of its own.
+
+Functions must be importable on the workers (module-level, same code
+deployed); arguments and results travel pickled. Work is sent in chunks of
+`chunksize` items to amortize the round trip. A chunk that raises, or, on a
+cluster, doesn't come back within `task_timeout` of a worker picking it up
+(a dead node), is resubmitted up to `retries` times; late results of a
+superseded attempt are dropped.
+Chunks carry the caller's trace context, so with tracing on they show up
+as child spans wherever they ran.
+"""
+
+import argparse
+import ipaddress
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import Process
+from multiprocessing.managers import BaseManager
+
+import tracing
+
+EXECUTOR = os.getenv("FINSIGHT_EXECUTOR", "process")
+AUTHKEY = os.getenv("FINSIGHT_EXECUTOR_AUTHKEY")
+KEYFILE = os.path.join(os.path.expanduser("~"), ".cache", "finsight", "executor.key")
+
+
+def _run_chunk(fn, chunk, parent=None):
+    if parent is None:
+        return [fn(*args) for args in chunk]
+    with tracing.span(getattr(fn, "__qualname__", "chunk"), parent=parent, items=len(chunk), pid=os.getpid()):
+        return [fn(*args) for args in chunk]
+
+
+# --- Executors ---
+class Executor:
+    """Base class: backends implement `_submit_chunk(fn, chunk) -> Future` of a result list."""
+
+    workers = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    def _submit_chunk(self, fn, chunk):
+        raise NotImplementedError
+
+    def submit(self, fn, *args):
+        """Future of fn(*args)."""
+        outer = Future()
+
+        def done(inner):
+            if inner.exception() is not None:
+                outer.set_exception(inner.exception())
+            else:
+                outer.set_result(inner.result()[0])
+        self._submit_chunk(fn, [args]).add_done_callback(done)
+        return outer
+
+    def map(self, fn, *iterables, chunksize=None, retries=0, ordered=True, max_pending=None):
+        """Yield fn(*args) for args zipped from `iterables`, streaming results as chunks complete.
+
+        At most `max_pending` chunks (default 4 per worker) are in flight, so
+        long or lazy iterables are consumed incrementally.
+        """
+        items = zip(*iterables)
+        chunksize = chunksize or 1
+        max_pending = max_pending or 4 * self.workers
+        chunks = enumerate(iter(lambda: list(itertools.islice(items, chunksize)), []))
+        pending, finished, next_index = {}, {}, 0
+
+        def launch(index, chunk, attempt):
+            pending[self._submit_chunk(fn, chunk)] = (index, chunk, attempt)
+
+        for index, chunk in itertools.islice(chunks, max_pending):
+            launch(index, chunk, 0)
+        try:
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, chunk, attempt = pending.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        if attempt >= retries:
+                            raise error
+                        launch(index, chunk, attempt + 1)
+                        continue
+                    refill = next(chunks, None)
+                    if refill is not None:
+                        launch(*refill, 0)
+                    if not ordered:
+                        yield from future.result()
+                        continue
+                    finished[index] = future.result()
+                    while next_index in finished:
+                        yield from finished.pop(next_index)
+                        next_index += 1
+        finally:  # failed, or the consumer stopped early
+            for future in pending:
+                future.cancel()
+
+
+class ThreadExecutor(Executor):
+    def __init__(self, workers=None):
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="finsight-exec")
+
+    def _submit_chunk(self, fn, chunk):
+        return self._pool.submit(_run_chunk, fn, chunk, tracing.traceparent())
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class ProcessExecutor(Executor):
+    def __init__(self, workers=None, initializer=None, initargs=()):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(self.workers, initializer=initializer, initargs=initargs)
+
+    def _submit_chunk(self, fn, chunk):
+        return self._pool.submit(_run_chunk, fn, chunk, tracing.traceparent())
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+# --- Cluster broker ---
+_TASKS = queue.Queue()
+_RESULTS = {}
+_RESULTS_LOCK = threading.Lock()
+
+
+def _tasks():
+    return _TASKS
+
+
+def _results(client):
+    with _RESULTS_LOCK:
+        return _RESULTS.setdefault(client, queue.Queue())
+
+
+def _drop_results(client):
+    with _RESULTS_LOCK:
+        _RESULTS.pop(client, None)
+
+
+class BrokerManager(BaseManager):
+    pass
+
+
+BrokerManager.register("tasks", callable=_tasks)
+BrokerManager.register("results", callable=_results)
+BrokerManager.register("drop_results", callable=_drop_results)
+
+
+def _parse_address(address):
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _is_loopback(host):
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def _local_key():
+    os.makedirs(os.path.dirname(KEYFILE), mode=0o700, exist_ok=True)
+    try:
+        fd = os.open(KEYFILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        for _ in range(50):
+            with open(KEYFILE, "rb") as f:
+                key = f.read().strip()
+            if key:
+                return key
+            time.sleep(0.01)  # another process is still writing it
+        raise RuntimeError(f"{KEYFILE} is empty")
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(32).hex().encode())
+    return _local_key()
+
+
+def resolve_authkey(address, authkey=None):
+    """`authkey`, else FINSIGHT_EXECUTOR_AUTHKEY, else (loopback only) the per-user key file."""
+    if authkey is not None:
+        return authkey.encode() if isinstance(authkey, str) else authkey
+    if AUTHKEY:
+        return AUTHKEY.encode()
+    if not _is_loopback(address[0]):
+        raise PermissionError(f"Set FINSIGHT_EXECUTOR_AUTHKEY to use a broker on {address[0]}: "
+                              "workers run whatever it hands them")
+    return _local_key()
+
+
+def start_broker(address=("127.0.0.1", 0), authkey=None):
+    """Start a broker in a child process; returns the started manager (`.address`, `.shutdown()`)."""
+    manager = BrokerManager(address=address, authkey=resolve_authkey(address, authkey))
+    manager.start()
+    return manager
+
+
+def connect(address, authkey=None, attempts=50):
+    manager = BrokerManager(address=address, authkey=resolve_authkey(address, authkey))
+    for attempt in range(attempts):
+        try:
+            manager.connect()
+            return manager
+        except (ConnectionRefusedError, OSError):
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.1)
+
+
+def worker_loop(address, authkey=None, stop=None):
+    """Pull chunks from the broker at `address` and run them until `stop` is set or the broker goes away."""
+    manager = connect(address, authkey)
+    tasks = manager.tasks()
+    result_queues = {}
+    while stop is None or not stop.is_set():
+        try:
+            task = tasks.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        except (EOFError, ConnectionError):
+            return
+        client, task_id, payload, track = task
+        if client not in result_queues:
+            result_queues[client] = manager.results(client)
+        if track:  # the client's task_timeout runs from here, not from when the chunk was queued
+            result_queues[client].put((task_id, None, None))
+        try:
+            reply = (task_id, True, pickle.dumps(_run_chunk(*pickle.loads(payload))))
+        except Exception as e:  # shipped back to the client, which decides on retries
+            try:
+                reply = (task_id, False, pickle.dumps(e))
+            except Exception:
+                reply = (task_id, False, pickle.dumps(RuntimeError(repr(e))))
+        result_queues[client].put(reply)
+
+
+class ClusterExecutor(Executor):
+    """Ships chunks through a broker to worker processes on any number of hosts."""
+
+    def __init__(self, address=None, local_workers=0, authkey=None, task_timeout=None, workers=None):
+        self._broker = None
+        if address is None:
+            authkey = authkey or os.urandom(32)
+            self._broker = start_broker(authkey=authkey)
+            address = self._broker.address
+        authkey = resolve_authkey(address, authkey)
+        self.address = address
+        self.task_timeout = task_timeout
+        self.client = uuid.uuid4().hex
+        self._manager = connect(address, authkey)
+        self._tasks = self._manager.tasks()
+        self._results = self._manager.results(self.client)
+        self._futures = {}      # task_id -> (Future, picked up at, or None while queued)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._stop = threading.Event()
+        self._local_stop = multiprocessing.Event()
+        self._local = [Process(target=worker_loop, args=(address, authkey, self._local_stop), daemon=True)
+                       for _ in range(local_workers)]
+        for p in self._local:
+            p.start()
+        self.workers = workers or max(1, local_workers)
+        self._collector = threading.Thread(target=self._collect, name="finsight-exec-results", daemon=True)
+        self._collector.start()
+
+    def _submit_chunk(self, fn, chunk):
+        future = Future()
+        task_id = next(self._ids)
+        payload = pickle.dumps((fn, chunk, tracing.traceparent()))
+        with self._lock:
+            self._futures[task_id] = (future, None)
+        self._tasks.put((self.client, task_id, payload, self.task_timeout is not None))
+        return future
+
+    def _collect(self):
+        while not self._stop.is_set():
+            try:
+                task_id, ok, payload = self._results.get(timeout=0.5)
+            except queue.Empty:
+                self._expire()
+                continue
+            except (EOFError, ConnectionError):
+                self._fail_all(ConnectionError("Executor broker went away"))
+                return
+            if ok is None:  # a worker picked the chunk up
+                with self._lock:
+                    if task_id in self._futures:
+                        self._futures[task_id] = (self._futures[task_id][0], time.monotonic())
+                self._expire()
+                continue
+            with self._lock:
+                entry = self._futures.pop(task_id, None)
+            if entry is None or entry[0].cancelled():
+                continue  # timed out and resubmitted, or abandoned by its map()
+            future = entry[0]
+            value = pickle.loads(payload)
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+            self._expire()
+
+    def _expire(self):
+        if self.task_timeout is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            expired = [t for t, (_, at) in self._futures.items() if at is not None and now - at > self.task_timeout]
+            futures = [self._futures.pop(t)[0] for t in expired]
+        for future in futures:
+            if not future.cancelled():
+                future.set_exception(TimeoutError(f"No result within {self.task_timeout}s; worker lost?"))
+
+    def _fail_all(self, error):
+        with self._lock:
+            futures = [f for f, _ in self._futures.values()]
+            self._futures.clear()
+        for future in futures:
+            if not future.cancelled():
+                future.set_exception(error)
+
+    def close(self):
+        self._stop.set()
+        self._collector.join()
+        self._local_stop.set()
+        for p in self._local:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        try:
+            self._manager.drop_results(self.client)
+        except (EOFError, ConnectionError):
+            pass
+        self._fail_all(RuntimeError("Executor closed"))
+        if self._broker is not None:
+            self._broker.shutdown()
+
+
+def get_executor(spec=None, **kwargs):
+    """Executor for `spec` (default FINSIGHT_EXECUTOR); see the module docstring."""
+    spec = spec or EXECUTOR
+    kind, _, arg = spec.partition(":")
+    if kind == "thread":
+        return ThreadExecutor(int(arg) if arg else None, **kwargs)
+    if kind == "process":
+        return ProcessExecutor(int(arg) if arg else None, **kwargs)
+    if kind == "cluster":
+        target = arg.lstrip("/")
+        if target.startswith("local"):
+            n = target.partition(":")[2]
+            return ClusterExecutor(local_workers=int(n) if n else os.cpu_count() or 1, **kwargs)
+        return ClusterExecutor(_parse_address(target), **kwargs)
+    raise ValueError(f"Unknown executor {spec!r}: use thread[:N], process[:N] or cluster://host:port")
+
+
+# --- Command line: run a broker or worker node ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ai_modules.executor")
+    sub = parser.add_subparsers(dest="role", required=True)
+    broker = sub.add_parser("broker", help="serve the task queue")
+    broker.add_argument("address", help="host:port to listen on")
+    worker = sub.add_parser("worker", help="run tasks from a broker")
+    worker.add_argument("address", help="broker host:port")
+    worker.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    address = _parse_address(args.address)
+    try:
+        authkey = resolve_authkey(address)
+    except PermissionError as e:
+        parser.error(str(e))
+    if args.role == "broker":
+        manager = BrokerManager(address=address, authkey=authkey)
+        print(f"Broker listening on {args.address}")
+        manager.get_server().serve_forever()
+        return 0
+    procs = [Process(target=worker_loop, args=(address, authkey)) for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+    print(f"{len(procs)} worker processes on {args.address}")
+    for p in procs:
+        p.join()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
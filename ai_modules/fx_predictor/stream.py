@@ -0,0 +1,48 @@
+"""
+Streaming FX predictor.
+
+Tracks the latest mid quote per currency pair and an exponentially weighted
+log-drift per elapsed second, and extrapolates it for short-horizon forecasts.
+"""
+
+import numpy as np
+
+from ingestion.records import ensure_capacity, grouped_last
+
+
+class FxSubscriber:
+    name = "fx_predictor"
+
+    def __init__(self, alpha=0.05):
+        self.n_symbols = 0
+        self.alpha = alpha
+        self.mid = np.empty(0)
+        self.ts = np.empty(0, dtype=np.int64)
+        self.drift_per_s = np.empty(0)
+
+    def on_batch(self, batch, symbols):
+        n = self.n_symbols = len(symbols)
+        self.mid = ensure_capacity(self.mid, n)
+        self.ts = ensure_capacity(self.ts, n, 0)
+        self.drift_per_s = ensure_capacity(self.drift_per_s, n, 0.0)
+
+        sym = batch["symbol"]
+        bid, ask = batch["bid"], batch["ask"]
+        mid = np.where((bid > 0) & (ask > 0), 0.5 * (bid + ask), batch["price"])
+        last_mid = grouped_last(sym, mid, n)
+        last_ts = np.zeros(n, dtype=np.int64)
+        last_ts[sym] = batch["ts"]
+
+        seen = ~np.isnan(last_mid)
+        had_prior = seen & ~np.isnan(self.mid[:n])
+        dt = (last_ts[had_prior] - self.ts[:n][had_prior]) / 1e9
+        step = np.log(last_mid[had_prior] / self.mid[:n][had_prior])
+        rate = np.divide(step, dt, out=np.zeros_like(step), where=dt > 0)
+        self.drift_per_s[:n][had_prior] = (1 - self.alpha) * self.drift_per_s[:n][had_prior] + self.alpha * rate
+        self.mid[:n][seen] = last_mid[seen]
+        self.ts[:n][seen] = last_ts[seen]
+
+    def forecast(self, horizon_s):
+        """Projected mid per pair `horizon_s` seconds ahead."""
+        n = self.n_symbols
+        return self.mid[:n] * np.exp(self.drift_per_s[:n] * horizon_s)
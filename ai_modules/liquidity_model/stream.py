@@ -0,0 +1,57 @@
+"""
+Streaming liquidity model.
+
+Accumulates per-symbol traded volume, notional and an exponentially weighted
+quoted spread (in basis points) from tick batches.
+"""
+
+import numpy as np
+
+from ingestion.records import ensure_capacity
+
+
+class LiquiditySubscriber:
+    name = "liquidity_model"
+
+    def __init__(self, spread_alpha=0.01):
+        self.n_symbols = 0
+        self.spread_alpha = spread_alpha
+        self.volume = np.empty(0)
+        self.notional = np.empty(0)
+        self.trades = np.empty(0)
+        self.spread_bps = np.empty(0)
+
+    def on_batch(self, batch, symbols):
+        n = self.n_symbols = len(symbols)
+        self.volume = ensure_capacity(self.volume, n, 0.0)
+        self.notional = ensure_capacity(self.notional, n, 0.0)
+        self.trades = ensure_capacity(self.trades, n, 0.0)
+        self.spread_bps = ensure_capacity(self.spread_bps, n)
+
+        sym = batch["symbol"]
+        size = batch["size"]
+        self.volume[:n] += np.bincount(sym, weights=size, minlength=n)
+        self.notional[:n] += np.bincount(sym, weights=size * batch["price"], minlength=n)
+        counts = np.bincount(sym, minlength=n)
+        self.trades[:n] += counts
+
+        bid, ask = batch["bid"], batch["ask"]
+        quoted = (bid > 0) & (ask > bid)
+        mid = 0.5 * (bid + ask)
+        spread = np.divide(ask - bid, mid, out=np.zeros_like(mid), where=quoted) * 1e4
+        q_counts = np.bincount(sym[quoted], minlength=n)
+        seen = q_counts > 0
+        batch_spread = np.bincount(sym[quoted], weights=spread[quoted], minlength=n)[seen] / q_counts[seen]
+        decay = (1.0 - self.spread_alpha) ** q_counts[seen]
+        prior = self.spread_bps[:n][seen]
+        self.spread_bps[:n][seen] = np.where(
+            np.isnan(prior), batch_spread, decay * prior + (1 - decay) * batch_spread
+        )
+
+    def snapshot(self):
+        return {
+            "volume": self.volume[:self.n_symbols],
+            "notional": self.notional[:self.n_symbols],
+            "trades": self.trades[:self.n_symbols],
+            "spread_bps": self.spread_bps[:self.n_symbols],
+        }
@@ -0,0 +1,58 @@
+"""
+Streaming regime detection.
+
+Keeps an exponentially weighted estimate of per-symbol drift and volatility of
+tick log-returns and labels each symbol's regime from them. State is updated
+once per batch with vectorized per-symbol aggregates.
+"""
+
+import numpy as np
+
+from ingestion.records import ensure_capacity, per_symbol_diff
+
+CALM, TRENDING, VOLATILE = 0, 1, 2
+REGIME_NAMES = ("calm", "trending", "volatile")
+
+
+class RegimeSubscriber:
+    name = "regime_detection"
+
+    def __init__(self, halflife_ticks=500, vol_threshold=3e-4, trend_threshold=0.5):
+        self.n_symbols = 0
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife_ticks)
+        self.vol_threshold = vol_threshold
+        self.trend_threshold = trend_threshold
+        self.last_log_price = np.empty(0)
+        self.drift = np.empty(0)
+        self.var = np.empty(0)
+
+    def on_batch(self, batch, symbols):
+        n = self.n_symbols = len(symbols)
+        self.last_log_price = ensure_capacity(self.last_log_price, n)
+        self.drift = ensure_capacity(self.drift, n, 0.0)
+        self.var = ensure_capacity(self.var, n, 0.0)
+
+        sym = batch["symbol"]
+        log_price = np.log(batch["price"])
+        rets = per_symbol_diff(sym, log_price, self.last_log_price)
+        ok = np.isfinite(rets)
+        counts = np.bincount(sym[ok], minlength=n)
+        seen = counts > 0
+        sums = np.bincount(sym[ok], weights=rets[ok], minlength=n)
+        sq = np.bincount(sym[ok], weights=rets[ok] ** 2, minlength=n)
+
+        # Treat the batch as `counts` consecutive EWMA steps of its mean.
+        decay = (1.0 - self.alpha) ** counts[seen]
+        mean = sums[seen] / counts[seen]
+        self.drift[:n][seen] = decay * self.drift[:n][seen] + (1 - decay) * mean
+        self.var[:n][seen] = decay * self.var[:n][seen] + (1 - decay) * (sq[seen] / counts[seen])
+        self.last_log_price[sym] = log_price
+
+    def regimes(self):
+        """Regime id per symbol id."""
+        vol = np.sqrt(self.var[:self.n_symbols])
+        trend = np.abs(self.drift[:self.n_symbols]) / np.where(vol > 0, vol, np.inf)
+        out = np.full(len(vol), CALM, dtype=np.int8)
+        out[trend > self.trend_threshold] = TRENDING
+        out[vol > self.vol_threshold] = VOLATILE
+        return out
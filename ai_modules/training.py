@@ -0,0 +1,431 @@
+"""
+Incremental retraining scheduler for ai_modules models.
+
+New training data is handed to the scheduler as it arrives; the scheduler
+tracks, per model, how many rows arrived since the last training and how far
+the feature distribution has drifted (population stability index against
+the training data), and retrains in a background process pool when either
+crosses its threshold:
+
+    scheduler = RetrainScheduler(workers=1, cpu_quota=2)
+    scheduler.register(ModelSpec("fx_predictor", "sklearn.linear_model:SGDRegressor"))
+    scheduler.observe("fx_predictor", X, y)     # cheap: one .npy chunk + drift counts
+    scheduler.start()                           # or call poll() from your own loop
+
+Retrains are incremental where the estimator allows it: `partial_fit` on the
+rows since the last version, else `warm_start` (ensembles grow by
+`warm_start_step` estimators), else a full fit. Drift above
+`drift_threshold` always forces a full refit on all data.
+
+Workers run niced, pinned to the last `cpu_quota` CPUs and with BLAS/OpenMP
+threads capped, so inference in the serving processes keeps its cores. A new
+version is written next to the old one and swapped in with os.replace
+(MODELS_DIR/<name>.joblib, plus <name>.fsm with `compact` set, read by
+backend.resources), previous versions are kept under MODELS_DIR/.history,
+and the backend is told to reload (SIGHUP to the gunicorn master when
+FINSIGHT_PIDFILE exists).
+"""
+
+import glob
+import json
+import os
+import shutil
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from tracing import traced
+
+from . import resolve
+
+MODELS_DIR = os.getenv("FINSIGHT_MODELS_DIR", "models")
+TRAINING_DIR = os.getenv("FINSIGHT_TRAINING_DIR", os.path.join("data", "training"))
+PIDFILE = os.getenv("FINSIGHT_PIDFILE", "/tmp/finsight-gunicorn.pid")
+KEEP_VERSIONS = 3
+
+
+@dataclass
+class ModelSpec:
+    name: str
+    estimator: str                      # "module:Class", e.g. "sklearn.linear_model:SGDRegressor"
+    params: dict = field(default_factory=dict)
+    min_new_rows: int = 10_000          # retrain once this many rows arrived ...
+    drift_threshold: float = 0.2        # ... or the max per-feature PSI reaches this (full refit)
+    max_age_s: float = None             # ... or the current version is this old
+    warm_start_step: int = 10           # extra estimators per warm-started ensemble retrain
+    fit_kwargs: dict = field(default_factory=dict)  # e.g. {"classes": [0, 1]} for partial_fit
+    compact: str = None                 # also publish an ai_modules.compact export ("float32" / "int8")
+
+
+# --- Drift ---
+class DriftMonitor:
+    """Population stability index of new data against the training distribution, per feature."""
+
+    def __init__(self, edges, expected):
+        self.edges = edges                  # (F, bins - 1) inner quantile edges
+        self.expected = expected            # (F, bins) training proportions
+        self.counts = np.zeros_like(expected)
+
+    @classmethod
+    def from_data(cls, X, bins=10):
+        X = np.asarray(X, dtype=np.float64)
+        qs = np.linspace(0, 1, bins + 1)[1:-1]
+        edges = np.nanquantile(X, qs, axis=0).T
+        monitor = cls(edges, np.zeros((X.shape[1], bins)))
+        monitor.expected = monitor._histogram(X)
+        monitor.expected /= np.maximum(monitor.expected.sum(axis=1, keepdims=True), 1)
+        return monitor
+
+    def _histogram(self, X):
+        counts = np.zeros((X.shape[1], self.edges.shape[1] + 1))
+        for j in range(X.shape[1]):
+            col = X[:, j]
+            idx = np.searchsorted(self.edges[j], col[~np.isnan(col)], side="right")
+            counts[j] = np.bincount(idx, minlength=counts.shape[1])
+        return counts
+
+    def update(self, X):
+        self.counts += self._histogram(np.asarray(X, dtype=np.float64))
+
+    def psi(self):
+        """Max PSI over features (0 until new data arrives)."""
+        total = self.counts.sum(axis=1, keepdims=True)
+        if not total.any():
+            return 0.0
+        actual = np.clip(self.counts / np.maximum(total, 1), 1e-4, None)
+        expected = np.clip(self.expected, 1e-4, None)
+        return float(((actual - expected) * np.log(actual / expected)).sum(axis=1).max())
+
+    def to_dict(self):
+        return {"edges": self.edges.tolist(), "expected": self.expected.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(np.array(d["edges"]), np.array(d["expected"]))
+
+
+# --- Training (runs in worker processes) ---
+def limit_worker(cpus, nice):
+    """Pool initializer: lower priority, pin to `cpus`, cap native thread pools."""
+    try:
+        os.nice(nice)
+    except (AttributeError, OSError):
+        pass
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError:
+            pass
+    threads = max(1, len(cpus) if cpus else 1)
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+
+
+def _load_chunks(paths):
+    if not paths:
+        return None, None
+    X = np.concatenate([np.load(p, mmap_mode="r") for p, _ in paths])
+    y = np.concatenate([np.load(p, mmap_mode="r") for _, p in paths])
+    return X, y
+
+
+def _compact_path(joblib_path):
+    return joblib_path[:-len(".joblib")] + ".fsm"
+
+
+def _archive(path, dest):
+    """Keep a copy of `path` at `dest` while `path` stays live (a hard link where possible)."""
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(path, dest)
+    except OSError:
+        shutil.copy2(path, dest)
+
+
+@traced()
+def train_version(spec, previous_path, all_chunks, new_chunks, full, target_path):
+    """Train one version and publish it atomically at `target_path`; returns its metadata."""
+    import joblib
+
+    started = time.perf_counter()
+    model = joblib.load(previous_path) if previous_path and not full and os.path.exists(previous_path) else None
+    if model is not None and hasattr(model, "partial_fit"):
+        X, y = _load_chunks(new_chunks)
+        model.partial_fit(X, y, **spec.fit_kwargs)
+        mode = "partial_fit"
+    elif model is not None and "warm_start" in model.get_params():
+        X, y = _load_chunks(all_chunks)
+        params = {"warm_start": True}
+        if "n_estimators" in model.get_params():
+            params["n_estimators"] = model.get_params()["n_estimators"] + spec.warm_start_step
+        model.set_params(**params)
+        model.fit(X, y)
+        mode = "warm_start"
+    else:
+        X, y = _load_chunks(all_chunks)
+        model = resolve(spec.estimator)(**spec.params)
+        if hasattr(model, "partial_fit") and spec.fit_kwargs:
+            model.partial_fit(X, y, **spec.fit_kwargs)
+        else:
+            model.fit(X, y)
+        mode = "full"
+    tmp = f"{target_path}.{os.getpid()}.tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, target_path)
+    compact = None
+    if os.path.exists(_compact_path(target_path)):  # left over from an earlier attempt
+        os.remove(_compact_path(target_path))
+    if spec.compact:
+        from .compact import export
+        try:
+            compact = export(model, _compact_path(target_path), spec.compact)
+        except TypeError as e:
+            compact = repr(e)
+    # Drift is measured against the data this version has seen.
+    reference = X if len(X) <= 200_000 else X[np.random.default_rng(0).choice(len(X), 200_000, replace=False)]
+    return {
+        "mode": mode,
+        "compact": compact,
+        "rows": int(len(X)),
+        "seconds": time.perf_counter() - started,
+        "score": float(model.score(X[-10_000:], y[-10_000:])) if hasattr(model, "score") else None,
+        "drift_reference": DriftMonitor.from_data(reference).to_dict(),
+    }
+
+
+# --- Scheduler ---
+class _ModelState:
+    def __init__(self, spec):
+        self.spec = spec
+        self.chunks = []          # [(X path, y path)] of all data
+        self.trained_upto = 0     # number of chunks the current version has seen
+        self.new_rows = 0
+        self.version = 0
+        self.trained_at = None
+        self.drift = None         # DriftMonitor against the current version's data
+        self.running = None       # Future of an in-flight retrain
+        self.last = None          # metadata of the latest version
+
+
+class RetrainScheduler:
+    def __init__(self, models_dir=MODELS_DIR, data_dir=TRAINING_DIR, workers=1, cpu_quota=None, nice=10,
+                 notify=True):
+        self.models_dir = models_dir
+        self.data_dir = data_dir
+        self.notify = notify
+        self.models = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        n_cpus = os.cpu_count() or 1
+        quota = min(cpu_quota or max(1, n_cpus // 4), n_cpus)
+        # The last `quota` CPUs; serving processes are usually on the first ones.
+        cpus = set(range(n_cpus - quota, n_cpus))
+        self._pool = ProcessPoolExecutor(workers, initializer=limit_worker, initargs=(cpus, nice))
+        os.makedirs(os.path.join(models_dir, ".history"), exist_ok=True)
+
+    def register(self, spec):
+        state = _ModelState(spec)
+        meta = self._read_meta(spec.name)
+        if meta is not None:
+            state.version = meta["version"]
+            state.trained_at = meta["trained_at"]
+            state.drift = DriftMonitor.from_dict(meta["drift_reference"])
+            state.last = meta
+        chunk_dir = os.path.join(self.data_dir, spec.name)
+        os.makedirs(chunk_dir, exist_ok=True)
+        for x_path in sorted(glob.glob(os.path.join(chunk_dir, "*.X.npy"))):
+            state.chunks.append((x_path, x_path[:-len(".X.npy")] + ".y.npy"))
+        state.trained_upto = min(meta.get("chunks", 0), len(state.chunks)) if meta else 0
+        self.models[spec.name] = state
+        return state
+
+    def _meta_path(self, name):
+        return os.path.join(self.models_dir, f"{name}.json")
+
+    def _read_meta(self, name):
+        try:
+            with open(self._meta_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # --- Data ---
+    def observe(self, name, X, y):
+        """Append a batch of training rows for `name` and update its drift statistics."""
+        X, y = np.ascontiguousarray(X, dtype=np.float64), np.ascontiguousarray(y)
+        state = self.models[name]
+        base = os.path.join(self.data_dir, name, f"{time.time_ns():020d}")
+        np.save(base + ".X.npy", X)
+        np.save(base + ".y.npy", y)
+        with self._lock:
+            state.chunks.append((base + ".X.npy", base + ".y.npy"))
+            state.new_rows += len(X)
+            if state.drift is not None:
+                state.drift.update(X)
+
+    # --- Policy ---
+    def due(self, state):
+        """(reason, full refit?) if `state` should retrain now, else None."""
+        spec = state.spec
+        if state.running is not None or state.trained_upto == len(state.chunks):
+            return None
+        if state.version == 0:
+            return "initial", True
+        drift = state.drift.psi() if state.drift is not None else 0.0
+        if drift >= spec.drift_threshold:
+            return f"drift {drift:.3f}", True
+        if state.new_rows >= spec.min_new_rows:
+            return f"{state.new_rows} new rows", False
+        if spec.max_age_s and time.time() - state.trained_at >= spec.max_age_s:
+            return "age", False
+        return None
+
+    def poll(self):
+        """Collect finished retrains and start due ones; never blocks on training."""
+        with self._lock:
+            published = self._collect()
+            for state in self.models.values():
+                decision = self.due(state)
+                if decision is None:
+                    continue
+                reason, full = decision
+                name = state.spec.name
+                upto = len(state.chunks)
+                state.running = self._pool.submit(
+                    train_version, state.spec, os.path.join(self.models_dir, f"{name}.joblib"),
+                    list(state.chunks[:upto]), list(state.chunks[state.trained_upto:upto]), full,
+                    os.path.join(self.models_dir, f".{name}.next.joblib"),
+                )
+                state.running.info = {"reason": reason, "chunks": upto, "new_rows": state.new_rows}
+        return self._published(published)
+
+    def collect(self):
+        """Publish finished retrains without starting new ones (e.g. once the pool is shut down)."""
+        with self._lock:
+            published = self._collect()
+        return self._published(published)
+
+    def _collect(self):
+        return [self._finish(s) for s in self.models.values() if s.running is not None and s.running.done()]
+
+    def _published(self, published):
+        published = [p for p in published if p is not None]
+        if published and self.notify:
+            notify_backend()
+        return published
+
+    def _finish(self, state):
+        future, state.running = state.running, None
+        name = state.spec.name
+        try:
+            meta = future.result()
+        except Exception as e:
+            state.last = {"error": repr(e), "at": time.time()}
+            return None
+        version = state.version + 1
+        current = os.path.join(self.models_dir, f"{name}.joblib")
+        staged = os.path.join(self.models_dir, f".{name}.next.joblib")
+        archived = os.path.join(self.models_dir, ".history", f"{name}.{state.version}.joblib")
+        # Archive by copy so the live files never disappear; each file is then
+        # swapped in with a single rename. backend.resources prefers <name>.fsm,
+        # so a new one goes first, and a stale one is removed only after the
+        # joblib swap: a reload at any point sees either the old or the new model.
+        if os.path.exists(current):
+            _archive(current, archived)
+        if os.path.exists(_compact_path(current)):
+            _archive(_compact_path(current), _compact_path(archived))
+        if os.path.exists(_compact_path(staged)):
+            os.replace(_compact_path(staged), _compact_path(current))
+            os.replace(staged, current)
+        else:
+            os.replace(staged, current)
+            if os.path.exists(_compact_path(current)):
+                os.remove(_compact_path(current))
+        for old in sorted(glob.glob(os.path.join(self.models_dir, ".history", f"{name}.*.joblib")),
+                          key=lambda p: int(p.rsplit(".", 2)[-2]))[:-KEEP_VERSIONS]:
+            os.remove(old)
+            if os.path.exists(_compact_path(old)):
+                os.remove(_compact_path(old))
+
+        state.version, state.trained_at = version, time.time()
+        state.trained_upto = future.info["chunks"]
+        state.new_rows -= future.info["new_rows"]  # rows observed while training count towards the next one
+        state.drift = DriftMonitor.from_dict(meta["drift_reference"])
+        state.last = {**meta, "name": name, "version": version, "trained_at": state.trained_at,
+                      "reason": future.info["reason"], "chunks": state.trained_upto}
+        tmp = f"{self._meta_path(name)}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state.last, f)
+        os.replace(tmp, self._meta_path(name))
+        return name, version
+
+    # --- Lifecycle ---
+    def start(self, interval=10.0):
+        """Poll from a daemon thread every `interval` seconds."""
+        def loop():
+            while not self._stop.wait(interval):
+                self.poll()
+        self._thread = threading.Thread(target=loop, name="retrain-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self, wait=True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+        if wait:
+            self.collect()
+
+    def status(self):
+        with self._lock:
+            return {
+                name: {
+                    "version": s.version,
+                    "trained_at": s.trained_at,
+                    "new_rows": s.new_rows,
+                    "pending_chunks": len(s.chunks) - s.trained_upto,
+                    "drift": s.drift.psi() if s.drift is not None else None,
+                    "running": s.running is not None,
+                    "last": {k: v for k, v in (s.last or {}).items() if k != "drift_reference"},
+                }
+                for name, s in self.models.items()
+            }
+
+
+def _is_gunicorn(pid):
+    """Whether `pid` runs gunicorn, so a stale pidfile never signals an unrelated process."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            command = f.read().replace(b"\0", b" ").decode(errors="replace")
+    except FileNotFoundError:
+        if os.path.isdir("/proc"):
+            return False  # no such process
+        import subprocess  # no procfs (macOS)
+        result = subprocess.run(["ps", "-p", str(pid), "-o", "command="], capture_output=True, text=True)
+        command = result.stdout
+    return "gunicorn" in command
+
+
+def notify_backend(pidfile=PIDFILE):
+    """Ask the gunicorn master to reload resources (graceful, see serve.sh); False if not running."""
+    try:
+        with open(pidfile, "r", encoding="utf-8") as f:
+            pid = int(f.read().strip())
+        if not _is_gunicorn(pid):
+            return False
+        os.kill(pid, signal.SIGHUP)
+        return True
+    except (OSError, ValueError):
+        return False
@@ -0,0 +1,257 @@
+"""
+Parallel hyperparameter search over shared, memory-mapped folds.
+
+Data preparation happens once per dataset: the feature function (if any) runs
+once, every cross-validation fold is materialized as contiguous .npy files
+under a directory keyed by the data's content hash, and workers map them
+read-only, so all candidates share the same page cache and a candidate costs
+only its fits:
+
+    folds = FoldSet.prepare(X, y, cv=5, features="ai_modules.fx_predictor.features:build")
+    search = HalvingSearch("sklearn.ensemble:RandomForestRegressor", candidates, folds,
+                           resource="n_estimators", min_resource=20, max_resource=320)
+    best = search.run(workers=4)
+
+Candidates are raced with successive halving: every rung evaluates the
+survivors with `eta` times more resource than the last (training rows, or an
+estimator parameter such as n_estimators) and keeps the best 1/eta. Each
+(candidate, budget) result is appended to a JSONL file next to the folds as
+it finishes, so an interrupted search picks up where it stopped and a
+repeated one is free. A candidate whose fit raises is recorded with score
+-inf and its error, and the race goes on without it.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from tracing import traced
+
+from . import resolve
+from .training import limit_worker
+
+TUNING_DIR = os.getenv("FINSIGHT_TUNING_DIR", os.path.join("data", "tuning"))
+
+
+def grid(**params):
+    """All combinations of the given parameter values, as a list of dicts."""
+    keys = sorted(params)
+    return [dict(zip(keys, values)) for values in itertools.product(*(params[k] for k in keys))]
+
+
+def candidate_key(params):
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+# --- Folds ---
+class FoldSet:
+    """Cross-validation folds materialized once on disk and opened as memory maps."""
+
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, "folds.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self._arrays = {}
+
+    @classmethod
+    def prepare(cls, X, y, cv=5, features=None, root=TUNING_DIR, seed=0):
+        """Build (or reuse) the folds of `X`, `y`.
+
+        `cv` is a number of shuffled folds, "time:<n>" for forward-chaining
+        splits that keep the row order, or any scikit-learn splitter.
+        `features` is a callable or "module:attr" applied to X once.
+        """
+        X, y = np.ascontiguousarray(X), np.ascontiguousarray(y)
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(memoryview(X).cast("B"))
+        digest.update(memoryview(y).cast("B"))
+        digest.update(repr((X.shape, X.dtype.str, y.shape, cv, features, seed)).encode())
+        path = os.path.join(root, digest.hexdigest())
+        if os.path.exists(os.path.join(path, "folds.json")):
+            return cls(path)
+
+        if features is not None:
+            X = np.ascontiguousarray((resolve(features) if isinstance(features, str) else features)(X))
+        splitter, ordered = cls._splitter(cv, seed)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        rng = np.random.default_rng(seed)
+        folds = []
+        for k, (train, test) in enumerate(splitter.split(X, y)):
+            # Unordered folds are stored shuffled so any prefix is a random subsample.
+            train = train if ordered else rng.permutation(train)
+            for part, idx in (("train", train), ("test", test)):
+                np.save(os.path.join(tmp, f"{k}.{part}.X.npy"), X[idx])
+                np.save(os.path.join(tmp, f"{k}.{part}.y.npy"), y[idx])
+            folds.append({"train": int(len(train)), "test": int(len(test))})
+        with open(os.path.join(tmp, "folds.json"), "w", encoding="utf-8") as f:
+            json.dump({"folds": folds, "ordered": ordered, "n_features": int(X.shape[1]),
+                       "created_at": time.time()}, f)
+        try:
+            os.replace(tmp, path)
+        except OSError:  # prepared concurrently by another process
+            shutil.rmtree(tmp, ignore_errors=True)
+        return cls(path)
+
+    @staticmethod
+    def _splitter(cv, seed):
+        from sklearn.model_selection import KFold, TimeSeriesSplit
+
+        if isinstance(cv, int):
+            return KFold(cv, shuffle=True, random_state=seed), False
+        if isinstance(cv, str) and cv.startswith("time:"):
+            return TimeSeriesSplit(int(cv[5:])), True
+        return cv, False
+
+    def __len__(self):
+        return len(self.meta["folds"])
+
+    @property
+    def min_train_rows(self):
+        return min(f["train"] for f in self.meta["folds"])
+
+    def fold(self, k, train_rows=None):
+        """(X_train, y_train, X_test, y_test) of fold `k`, optionally limited to `train_rows` rows.
+
+        Ordered (time) folds keep their most recent rows.
+        """
+        arrays = self._arrays.get(k)
+        if arrays is None:
+            arrays = self._arrays[k] = tuple(
+                np.load(os.path.join(self.root, f"{k}.{part}.{a}.npy"), mmap_mode="r")
+                for part in ("train", "test") for a in ("X", "y")
+            )
+        X_train, y_train, X_test, y_test = arrays
+        if train_rows is not None and train_rows < len(X_train):
+            rows = slice(-train_rows, None) if self.meta["ordered"] else slice(train_rows)
+            X_train, y_train = X_train[rows], y_train[rows]
+        return X_train, y_train, X_test, y_test
+
+
+# --- Evaluation (runs in worker processes) ---
+_FOLDSETS = {}
+
+
+@traced()
+def evaluate(estimator, params, fold_root, resource, budget, scoring=None):
+    """Mean and per-fold test score of one candidate at one resource budget."""
+    folds = _FOLDSETS.get(fold_root)
+    if folds is None:
+        folds = _FOLDSETS[fold_root] = FoldSet(fold_root)
+    scorer = None
+    if scoring is not None:
+        from sklearn.metrics import get_scorer
+        scorer = get_scorer(scoring)
+
+    started = time.perf_counter()
+    scores = []
+    for k in range(len(folds)):
+        train_rows = budget if resource == "n_samples" else None
+        X_train, y_train, X_test, y_test = folds.fold(k, train_rows)
+        model = resolve(estimator)(**params, **({} if resource == "n_samples" else {resource: budget}))
+        model.fit(X_train, y_train)
+        scores.append(float(scorer(model, X_test, y_test) if scorer else model.score(X_test, y_test)))
+    return {"score": float(np.mean(scores)), "fold_scores": scores, "seconds": time.perf_counter() - started}
+
+
+# --- Search ---
+class HalvingSearch:
+    def __init__(self, estimator, candidates, folds, resource="n_samples", min_resource=None, max_resource=None,
+                 eta=3, scoring=None, results_path=None):
+        """`resource` is "n_samples" (training rows) or an integer estimator parameter."""
+        self.estimator = estimator
+        self.candidates = list(candidates)
+        self.folds = folds
+        self.resource = resource
+        self.eta = eta
+        self.scoring = scoring
+        if max_resource is None:
+            if resource != "n_samples":
+                raise ValueError(f"max_resource is required when resource is {resource!r}")
+            max_resource = folds.min_train_rows
+        self.max_resource = int(max_resource)
+        # Enough rungs to get from all candidates down to about one.
+        n_rungs = max(1, math.ceil(math.log(max(len(self.candidates), 1), eta)) + 1)
+        if min_resource is None:
+            min_resource = max(1, self.max_resource // eta ** (n_rungs - 1))
+        self.min_resource = int(min_resource)
+        self.results_path = results_path or os.path.join(
+            folds.root, "searches", hashlib.blake2b(
+                repr((estimator, resource, scoring, eta)).encode(), digest_size=8).hexdigest() + ".jsonl")
+        self.results = self._load()
+
+    def _load(self):
+        results = {}
+        try:
+            with open(self.results_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:  # torn last line of an interrupted run
+                        continue
+                    results[(row["candidate"], row["budget"])] = row
+        except OSError:
+            pass
+        return results
+
+    def _append(self, row):
+        os.makedirs(os.path.dirname(self.results_path), exist_ok=True)
+        with open(self.results_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row) + "\n")
+        self.results[(row["candidate"], row["budget"])] = row
+
+    def budgets(self):
+        """Resource per rung: max_resource, divided by eta per rung down to min_resource."""
+        n_rungs = int(math.log(self.max_resource / self.min_resource, self.eta) + 1e-9) + 1 \
+            if self.max_resource > self.min_resource else 1
+        return [max(self.min_resource, self.max_resource // self.eta ** (n_rungs - 1 - i)) for i in range(n_rungs)]
+
+    def run(self, workers=1, cpu_quota=None, nice=10, log=None):
+        """Race the candidates; returns the best {"params", "score", ...} at the largest budget."""
+        survivors = [candidate_key(p) for p in self.candidates]
+        params = dict(zip(survivors, self.candidates))
+        budgets = self.budgets()
+        cpus = set(range((os.cpu_count() or 1) - min(cpu_quota or workers, os.cpu_count() or 1),
+                         os.cpu_count() or 1))
+        with ProcessPoolExecutor(workers, initializer=limit_worker, initargs=(cpus, nice)) as pool:
+            for rung, budget in enumerate(budgets):
+                pending = {
+                    pool.submit(evaluate, self.estimator, params[key], self.folds.root, self.resource, budget,
+                                self.scoring): key
+                    for key in survivors if (key, budget) not in self.results
+                }
+                for future in as_completed(pending):
+                    key = pending[future]
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:  # e.g. an invalid grid point; the others keep racing
+                        result = {"score": float("-inf"), "error": repr(e)}
+                    self._append({"candidate": key, "params": params[key], "budget": budget, "rung": rung,
+                                  **result})
+                ranked = sorted(survivors, key=lambda k: self.results[(k, budget)]["score"], reverse=True)
+                if log is not None:
+                    best = self.results[(ranked[0], budget)]
+                    log(f"rung {rung}: {len(survivors)} candidates at {self.resource}={budget}, "
+                        f"best {best['score']:.4f} {best['params']} ({len(pending)} evaluated)")
+                if rung < len(budgets) - 1:
+                    survivors = ranked[:max(1, math.ceil(len(ranked) / self.eta))]
+                else:
+                    survivors = ranked
+        best = self.results[(survivors[0], budgets[-1])]
+        if "error" in best:
+            raise RuntimeError(f"Every candidate failed at {self.resource}={budgets[-1]}; first: {best['error']}")
+        return best
+
+    def leaderboard(self):
+        """Every evaluated (candidate, budget), best first within the largest budget reached."""
+        return sorted(self.results.values(), key=lambda r: (r["budget"], r["score"]), reverse=True)
@@ -0,0 +1 @@
+"""Support code for the FastAPI backend in main.py."""
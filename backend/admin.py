@@ -0,0 +1,24 @@
+"""
+Access control for the /admin endpoints.
+
+    @app.post('/admin/cache/invalidate', dependencies=[Depends(require_admin)])
+
+Requests must carry `Authorization: Bearer <FINSIGHT_ADMIN_TOKEN>`. Without
+FINSIGHT_ADMIN_TOKEN set, the admin endpoints refuse every request.
+"""
+
+import hmac
+import os
+
+from fastapi import HTTPException, Request
+
+ADMIN_TOKEN = os.getenv("FINSIGHT_ADMIN_TOKEN")
+
+
+def require_admin(request: Request):
+    """FastAPI dependency: 401 without the admin bearer token, 403 when admin access is disabled."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(403, "Admin endpoints are disabled; set FINSIGHT_ADMIN_TOKEN to enable them")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(401, "Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
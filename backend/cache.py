@@ -0,0 +1,343 @@
+"""
+Response cache with ETags and conditional requests for read endpoints.
+
+Mark an endpoint as cacheable and install the middleware once:
+
+    app.add_middleware(CacheMiddleware, cache=response_cache)
+
+    @app.get('/')
+    @cached(ttl=5, tags=('status',))
+    def read_root(): ...
+
+The first GET of a path runs the endpoint normally; its body is stored with a
+strong ETag. Until the TTL expires, later requests are answered from the
+cache without entering the router, and requests carrying a matching
+`If-None-Match` get an empty 304. `invalidate('models')` drops every entry
+tagged 'models'. Entries are also keyed by the backend.resources version, so
+a resource reload invalidates everything implicitly.
+
+Set FINSIGHT_CACHE_DIR to persist entries on disk, shared by all workers.
+Tag generations always live in a shared file (under the cache dir, else
+FINSIGHT_CACHE_GENERATIONS, by default a file in /dev/shm named after this
+app's directory), so an invalidation received by one worker applies to all
+of them and not to other deployments on the host.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+
+from . import resources
+
+# Request headers that change the representation and so belong in the key.
+VARY_HEADERS = (b"accept", b"accept-encoding")
+
+_SHM = "/dev/shm"
+_APP_ID = hashlib.blake2b(os.path.dirname(os.path.dirname(os.path.abspath(__file__))).encode(),
+                          digest_size=6).hexdigest()
+GENERATIONS_FILE = os.getenv(
+    "FINSIGHT_CACHE_GENERATIONS",
+    os.path.join(_SHM if os.path.isdir(_SHM) else tempfile.gettempdir(), f"finsight-cache-{_APP_ID}.json"),
+)
+
+
+def cached(ttl, tags=()):
+    """Mark an endpoint cacheable for `ttl` seconds under `tags`."""
+    def decorator(fn):
+        fn.__cache_policy__ = (float(ttl), tuple(tags))
+        return fn
+    return decorator
+
+
+class Entry:
+    __slots__ = ("expires_at", "stored_at", "status", "headers", "body", "etag", "tags")
+
+    def __init__(self, expires_at, stored_at, status, headers, body, etag, tags):
+        self.expires_at = expires_at
+        self.stored_at = stored_at
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.tags = tags
+
+
+# --- Stores ---
+class MemoryStore:
+    """LRU of entries bounded by count."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self, tags=None):
+        """Drop all entries, or only those carrying any of `tags`."""
+        with self._lock:
+            if tags is None:
+                self._data.clear()
+                return
+            for key in [k for k, e in self._data.items() if set(e.tags) & set(tags)]:
+                del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+    def nbytes(self):
+        with self._lock:
+            return sum(len(e.body) for e in self._data.values())
+
+
+class DiskStore:
+    """One pickle per entry under `path`, written atomically."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.entry")
+
+    def get(self, key):
+        try:
+            with open(self._file(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set(self, key, entry):
+        tmp = f"{self._file(key)}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._file(key))
+
+    def clear(self):
+        now = time.time()
+        for name in os.listdir(self.path):
+            if name.endswith(".entry"):
+                entry = self.get(name[:-len(".entry")])
+                if entry is None or entry.expires_at <= now:
+                    try:
+                        os.remove(os.path.join(self.path, name))
+                    except OSError:
+                        pass
+
+
+# --- Cache ---
+class ResponseCache:
+    def __init__(self, max_entries=4096, disk_dir=None, generations_file=None):
+        self.memory = MemoryStore(max_entries)
+        self.disk = DiskStore(disk_dir) if disk_dir else None
+        self.generations_file = os.path.join(disk_dir, "generations.json") if disk_dir else generations_file
+        self.policies = {}  # path -> (ttl, tags), filled in by CacheMiddleware
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+        self._generations = {}
+        self._gen_mtime = None
+
+    # Tag generations are bumped on invalidation; they are part of every key,
+    # so stale entries simply stop being found. Without a generations file
+    # they are only tracked in this process.
+    def _sync_generations(self):
+        path = self.generations_file
+        if path is None:
+            return
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._gen_mtime:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._generations = json.load(f)
+            except (OSError, ValueError):
+                return
+            self._gen_mtime = mtime
+
+    def invalidate(self, *tags):
+        """Drop every entry tagged with any of `tags` (all entries if none given)."""
+        self._sync_generations()
+        if not tags:
+            tags = ("*",)
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        self.memory.clear(None if "*" in tags else tags)
+        path = self.generations_file
+        if path is not None:
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._generations, f)
+            os.replace(tmp, path)
+            self._gen_mtime = os.stat(path).st_mtime_ns
+        if self.disk is not None:
+            self.disk.clear()
+
+    def key(self, scope, tags):
+        self._sync_generations()
+        h = hashlib.blake2b(digest_size=16)
+        h.update(b"GET")  # HEAD is answered from the GET entry
+        h.update(b"\0" + scope["path"].encode() + b"\0" + scope.get("query_string", b""))
+        headers = dict(scope["headers"])
+        for name in VARY_HEADERS:
+            h.update(b"\0" + headers.get(name, b""))
+        gens = [self._generations.get("*", 0), resources.STATE["version"]]
+        gens += [self._generations.get(t, 0) for t in tags]
+        h.update(repr(gens).encode())
+        return h.hexdigest()
+
+    def lookup(self, key):
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return entry
+
+    def store(self, key, status, headers, body, ttl, tags):
+        now = time.time()
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        entry = Entry(now + ttl, now, status, headers, body, etag, tags)
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+        return entry
+
+    def info(self):
+        return {
+            **self.stats,
+            "entries": len(self.memory),
+            "bytes": self.memory.nbytes(),
+            "routes": {p: {"ttl": t, "tags": list(tags)} for p, (t, tags) in self.policies.items()},
+            "disk_dir": self.disk.path if self.disk else None,
+            "generations_file": self.generations_file,
+        }
+
+
+response_cache = ResponseCache(disk_dir=os.getenv("FINSIGHT_CACHE_DIR"), generations_file=GENERATIONS_FILE)
+
+
+# --- ASGI middleware ---
+def _header_lines(entry, now):
+    age = int(now - entry.stored_at)
+    max_age = max(int(entry.expires_at - now), 0)
+    return [
+        (b"etag", entry.etag.encode()),
+        (b"cache-control", b"public, max-age=%d" % max_age),
+        (b"age", b"%d" % age),
+        (b"last-modified", formatdate(entry.stored_at, usegmt=True).encode()),
+        (b"vary", b"Accept, Accept-Encoding"),
+    ]
+
+
+def _etag_matches(if_none_match, etag):
+    if if_none_match is None:
+        return False
+    candidates = [c.strip() for c in if_none_match.decode("latin-1").split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class CacheMiddleware:
+    def __init__(self, app, cache=response_cache):
+        self.app = app
+        self.cache = cache
+        self._patterns = None  # [(path_regex, policy)] for routes with path parameters
+
+    def _learn_routes(self, app):
+        self._patterns = []
+        for route in getattr(app, "routes", ()):
+            policy = getattr(getattr(route, "endpoint", None), "__cache_policy__", None)
+            if policy is None or "GET" not in getattr(route, "methods", ()):
+                continue
+            if route.param_convertors:
+                self._patterns.append((route.path_regex, policy))
+            else:
+                self.cache.policies[route.path] = policy
+
+    def _policy(self, scope):
+        if self._patterns is None:
+            self._learn_routes(scope.get("app"))
+        path = scope["path"]
+        policy = self.cache.policies.get(path)
+        if policy is None:
+            for regex, candidate in self._patterns:
+                if regex.match(path):
+                    return candidate
+        return policy
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        policy = self._policy(scope)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        ttl, tags = policy
+        key = self.cache.key(scope, tags)
+        entry = self.cache.lookup(key)
+        if entry is not None:
+            await self._serve(entry, scope, send)
+            return
+        self.cache.stats["misses"] += 1
+
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await finish(b"".join(chunks))
+            else:
+                await send(message)
+
+        async def finish(body):
+            if start["status"] == 200 and scope["method"] == "GET":
+                entry = self.cache.store(key, 200, list(start.get("headers", [])), body, ttl, tags)
+                await self._serve(entry, scope, send, count_hit=False)
+                return
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, capture)
+
+    async def _serve(self, entry, scope, send, count_hit=True):
+        now = time.time()
+        cache_headers = _header_lines(entry, now)
+        request_headers = dict(scope["headers"])
+        if _etag_matches(request_headers.get(b"if-none-match"), entry.etag):
+            self.cache.stats["not_modified"] += 1
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if count_hit:
+            self.cache.stats["hits"] += 1
+        names = {name for name, _ in cache_headers}
+        headers = [(k, v) for k, v in entry.headers if k.lower() not in names] + cache_headers
+        body = b"" if scope["method"] == "HEAD" else entry.body
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,190 @@
+"""
+Local data plane: versioned numpy / Arrow buffers in memory-mapped files.
+
+The backend publishes large arrays (time series, covariance matrices) once;
+processes on the same host (the Streamlit dashboard, notebooks) map them
+read-only instead of fetching and decoding JSON over HTTP:
+
+    # backend
+    plane = DataPlane()
+    plane.publish("fx_rates", rates)                    # numpy -> name.<version>.npy
+    plane.publish("positions", arrow_table)             # Arrow/pandas -> name.<version>.arrow
+
+    # dashboard
+    reader = DataPlaneReader()
+    rates, version = reader.get("fx_rates")             # zero-copy, read-only
+    reader.get("fx_rates")                              # same object until a new version lands
+
+Each dataset has a small pointer file (name.json) naming its current data
+file; publishing writes the new data file first and then swaps the pointer
+with os.replace, so readers never see a half-written buffer. A reader only
+re-stats the pointer per call and remaps when its version changes. The last
+`keep` versions stay on disk so readers still holding an older map are
+unaffected (on Linux unlinked maps stay valid anyway).
+
+FINSIGHT_DATAPLANE_DIR defaults to /dev/shm/finsight where available, which
+keeps the files in RAM.
+"""
+
+import glob
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+_SHM = "/dev/shm"
+DATAPLANE_DIR = os.getenv(
+    "FINSIGHT_DATAPLANE_DIR",
+    os.path.join(_SHM, "finsight") if os.path.isdir(_SHM) else os.path.join(tempfile.gettempdir(), "finsight-dataplane"),
+)
+
+_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _check_name(name):
+    if not _NAME.match(name):
+        raise ValueError(f"Invalid dataset name {name!r}: use letters, digits, '_' and '-'")
+
+
+def _pointer(root, name):
+    return os.path.join(root, f"{name}.json")
+
+
+def _read_pointer(root, name):
+    try:
+        with open(_pointer(root, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# --- Publishing ---
+class DataPlane:
+    def __init__(self, root=DATAPLANE_DIR, keep=2):
+        self.root = root
+        self.keep = keep
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def publish(self, name, data, meta=None):
+        """Publish a new version of `name`; returns the version number.
+
+        `data` is a numpy array, or a pyarrow Table / RecordBatch or pandas
+        DataFrame (stored as an Arrow IPC file).
+        """
+        _check_name(name)
+        with self._lock:
+            current = _read_pointer(self.root, name)
+            version = (current["version"] if current else 0) + 1
+            if isinstance(data, np.ndarray):
+                kind, ext = "numpy", "npy"
+            else:
+                kind, ext = "arrow", "arrow"
+            filename = f"{name}.{version}.{ext}"
+            path = os.path.join(self.root, filename)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            if kind == "numpy":
+                with open(tmp, "wb") as f:
+                    np.lib.format.write_array(f, np.ascontiguousarray(data), allow_pickle=False)
+                info = {"shape": list(data.shape), "dtype": data.dtype.str}
+            else:
+                info = {"rows": self._write_arrow(tmp, data)}
+            os.replace(tmp, path)
+            pointer = {"version": version, "file": filename, "kind": kind, "published_at": time.time(),
+                       "pid": os.getpid(), "meta": meta or {}, **info}
+            tmp = f"{_pointer(self.root, name)}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(pointer, f)
+            os.replace(tmp, _pointer(self.root, name))
+            self._prune(name, version)
+            return version
+
+    @staticmethod
+    def _write_arrow(path, data):
+        import pyarrow as pa
+
+        if isinstance(data, pa.RecordBatch):
+            data = pa.Table.from_batches([data])
+        elif not isinstance(data, pa.Table):
+            data = pa.Table.from_pandas(data)
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, data.schema) as writer:
+            writer.write_table(data)
+        return data.num_rows
+
+    def _prune(self, name, version):
+        for path in glob.glob(os.path.join(self.root, f"{name}.*.*")):
+            parts = os.path.basename(path).split(".")
+            if len(parts) == 3 and parts[1].isdigit() and int(parts[1]) <= version - self.keep:
+                try:
+                    os.remove(path)
+                except OSError:  # still mapped on Windows; retried on the next publish
+                    pass
+
+    def unpublish(self, name):
+        _check_name(name)
+        with self._lock:
+            for path in glob.glob(os.path.join(self.root, f"{name}.*")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def catalog(self):
+        return catalog(self.root)
+
+
+def catalog(root=DATAPLANE_DIR):
+    """Current pointer of every published dataset, by name."""
+    out = {}
+    for path in sorted(glob.glob(os.path.join(root, "*.json"))):
+        name = os.path.basename(path)[:-len(".json")]
+        pointer = _read_pointer(root, name)
+        if pointer is not None:
+            out[name] = pointer
+    return out
+
+
+# --- Attaching ---
+class DataPlaneReader:
+    """Maps published datasets read-only and keeps them until their version changes."""
+
+    def __init__(self, root=DATAPLANE_DIR):
+        self.root = root
+        self._attached = {}  # name -> (pointer mtime_ns, version, data)
+
+    def get(self, name):
+        """(data, version) of the current version of `name`, or (None, 0) if unpublished."""
+        _check_name(name)
+        try:
+            mtime = os.stat(_pointer(self.root, name)).st_mtime_ns
+        except OSError:
+            self._attached.pop(name, None)
+            return None, 0
+        attached = self._attached.get(name)
+        if attached is not None and attached[0] == mtime:
+            return attached[2], attached[1]
+        pointer = _read_pointer(self.root, name)
+        if pointer is None:
+            return (attached[2], attached[1]) if attached else (None, 0)
+        if attached is not None and attached[1] == pointer["version"]:
+            self._attached[name] = (mtime, attached[1], attached[2])
+            return attached[2], attached[1]
+        data = self._map(pointer)
+        self._attached[name] = (mtime, pointer["version"], data)
+        return data, pointer["version"]
+
+    def _map(self, pointer):
+        path = os.path.join(self.root, pointer["file"])
+        if pointer["kind"] == "numpy":
+            return np.load(path, mmap_mode="r", allow_pickle=False)
+        import pyarrow as pa
+        return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+    def versions(self):
+        return {name: pointer["version"] for name, pointer in catalog(self.root).items()}
@@ -0,0 +1,206 @@
+"""
+Memory diagnostics for the backend and the modules it loads.
+
+Off by default and then free: nothing is traced and the admin endpoints
+answer 404. Set FINSIGHT_MEMDIAG=1 (or =<frames> for deeper tracebacks) to
+start tracemalloc at import, before resources are preloaded, so allocations
+of models and reference data are attributed too. The endpoints also need
+the admin token (backend.admin):
+
+    GET  /admin/memory?group=module&limit=20     top allocators and caches
+    GET  /admin/memory?objects=1                 plus live object counts (walks every GC object)
+    GET  /admin/memory?diff=1                    growth since the baseline
+    POST /admin/memory/baseline                  take a new baseline snapshot
+
+Caches make themselves visible with `register_cache(name, obj)`; anything
+with `info()` (returning "bytes"/"nbytes" and "entries"), a functools
+lru_cache, a mapping or a zero-argument callable works.
+
+Every worker answers for itself (the response carries its pid); tracing
+costs roughly 2x allocation time and some memory per live block, so enable
+it on one instance while hunting a leak, not fleet-wide.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+FRAMES = os.getenv("FINSIGHT_MEMDIAG", "0")
+ENABLED = FRAMES not in ("", "0")
+
+CACHES = {}
+
+_baseline = None
+_lock = threading.Lock()
+
+# Frames from these files are bookkeeping of the diagnostics themselves.
+_IGNORED = (__file__, tracemalloc.__file__, "<frozen importlib._bootstrap>",
+            "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+def start(frames=None):
+    """Start tracing allocations (no-op if already tracing)."""
+    global ENABLED
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(max(1, int(frames or (FRAMES if FRAMES.isdigit() else 1))))
+    ENABLED = True
+
+
+def stop():
+    global ENABLED, _baseline
+    tracemalloc.stop()
+    ENABLED, _baseline = False, None
+
+
+def register_cache(name, obj):
+    CACHES[name] = obj
+    return obj
+
+
+# --- Readings ---
+def rss():
+    """Current and peak resident set size of this process in bytes (current is Linux-only)."""
+    out = {"current": None, "peak": None}
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    out["current"] = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    out["peak"] = int(line.split()[1]) * 1024
+    except OSError:
+        try:
+            import resource
+            out["peak"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        except ImportError:
+            pass
+    return out
+
+
+def nbytes(obj, _depth=0):
+    """Rough deep size: array buffers, containers and their items (up to 3 levels deep)."""
+    size = getattr(obj, "nbytes", None)
+    if isinstance(size, int):
+        return size
+    if callable(size):
+        return size()
+    size = sys.getsizeof(obj, 0)
+    if _depth >= 3:
+        return size
+    if isinstance(obj, dict):
+        size += sum(nbytes(k, _depth + 1) + nbytes(v, _depth + 1) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(nbytes(v, _depth + 1) for v in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += nbytes(vars(obj), _depth + 1)
+    return size
+
+
+def cache_sizes():
+    out = {}
+    for name, obj in list(CACHES.items()):
+        try:
+            if hasattr(obj, "cache_info"):            # functools.lru_cache
+                info = obj.cache_info()
+                out[name] = {"entries": info.currsize, "max_entries": info.maxsize,
+                             "hits": info.hits, "misses": info.misses}
+            elif hasattr(obj, "info"):
+                info = obj.info()
+                out[name] = {k: v for k, v in info.items() if not isinstance(v, (dict, list))}
+            elif callable(obj):
+                out[name] = obj()
+            else:
+                out[name] = {"entries": len(obj), "bytes": nbytes(obj)}
+        except Exception as e:  # a broken reporter must not break the endpoint
+            out[name] = {"error": repr(e)}
+    return out
+
+
+def object_counts(limit=20):
+    """Most common live object types tracked by the GC."""
+    counts = Counter(type(o).__qualname__ for o in gc.get_objects())
+    return {"tracked": sum(counts.values()), "gc_counts": gc.get_count(), "gc_frozen": gc.get_freeze_count(),
+            "top": counts.most_common(limit)}
+
+
+# --- tracemalloc ---
+def _module_names():
+    paths = {}
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path:
+            paths[os.path.abspath(path)] = name
+    return paths
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, f) for f in _IGNORED])
+
+
+def baseline():
+    """Take a snapshot that later `allocations(diff=True)` calls compare against."""
+    global _baseline
+    if not ENABLED:
+        return None
+    with _lock:
+        _baseline = _snapshot()
+        return {"taken_at": time.time(), "traced_bytes": tracemalloc.get_traced_memory()[0]}
+
+
+def allocations(group="module", limit=20, diff=False):
+    """Top allocation sites grouped by "module", "package", "line" or "traceback".
+
+    With `diff`, sizes are the growth since `baseline()` (taken on first use).
+    """
+    global _baseline
+    if not ENABLED:
+        return {"enabled": False, "hint": "set FINSIGHT_MEMDIAG=1 to trace allocations"}
+    with _lock:
+        snapshot = _snapshot()
+        if diff and _baseline is None:
+            _baseline = snapshot
+        key = "traceback" if group == "traceback" else "lineno" if group == "line" else "filename"
+        if diff:
+            stats = snapshot.compare_to(_baseline, key)
+            rows = [(s.traceback, s.size_diff, s.count_diff) for s in stats]
+        else:
+            rows = [(s.traceback, s.size, s.count) for s in snapshot.statistics(key)]
+
+    current, peak = tracemalloc.get_traced_memory()
+    out = {"enabled": True, "group": group, "diff": diff, "traced_bytes": current, "traced_peak": peak,
+           "tracemalloc_overhead": tracemalloc.get_tracemalloc_memory()}
+    if group in ("module", "package"):
+        modules = _module_names()
+        totals = Counter()
+        counts = Counter()
+        for tb, size, count in rows:
+            filename = tb[0].filename
+            name = filename if filename.startswith("<") else modules.get(os.path.abspath(filename), filename)
+            if group == "package":
+                name = name.split(".")[0]
+            totals[name] += size
+            counts[name] += count
+        ranked = sorted(totals, key=lambda n: abs(totals[n]), reverse=True)[:limit]
+        out["top"] = [{"name": n, "bytes": totals[n], "blocks": counts[n]} for n in ranked]
+    else:
+        rows.sort(key=lambda r: abs(r[1]), reverse=True)
+        out["top"] = [{"where": [f"{f.filename}:{f.lineno}" for f in tb], "bytes": size, "blocks": count}
+                      for tb, size, count in rows[:limit]]
+    return out
+
+
+def report(group="module", limit=20, diff=False, objects=False):
+    """Everything the admin endpoint returns."""
+    out = {"pid": os.getpid(), "rss": rss(), "caches": cache_sizes(),
+           "allocations": allocations(group, limit, diff)}
+    if objects:
+        out["objects"] = object_counts(limit)
+    return out
+
+
+if ENABLED:
+    start()
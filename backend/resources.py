@@ -0,0 +1,138 @@
+"""
+Process-wide models and reference data for the backend.
+
+Everything here is loaded once per process tree. Under the production server
+(gunicorn_conf.py) the master process calls `preload()` before forking, so
+workers inherit the loaded objects copy-on-write instead of each loading
+their own copy. Under a plain `uvicorn main:app` the app lifespan loads them.
+
+Loaders are registered by name and return any object:
+
+    @register("fx_reference")
+    def load_fx_reference():
+        return np.load("data/reference/fx.npy", mmap_mode="r")
+"""
+
+import gc
+import glob
+import json
+import os
+import threading
+import time
+
+from tracing import span
+
+MODELS_DIR = os.getenv("FINSIGHT_MODELS_DIR", "models")
+REFERENCE_DIR = os.getenv("FINSIGHT_REFERENCE_DIR", os.path.join("data", "reference"))
+PUBLISH = os.getenv("FINSIGHT_DATAPLANE", "1") != "0"
+
+LOADERS = {}
+RESOURCES = {}
+STATE = {"version": 0, "loaded_at": None, "loaded_by_pid": None, "load_seconds": None}
+
+_lock = threading.Lock()
+
+
+def register(name):
+    def decorator(fn):
+        LOADERS[name] = fn
+        return fn
+    return decorator
+
+
+@register("models")
+def load_models():
+    """Every model artifact in MODELS_DIR, keyed by file stem.
+
+    A compact `*.fsm` export (ai_modules.compact) is memory-mapped and scored
+    with numpy alone; it wins over a `*.joblib` pickle of the same name, so
+    scikit-learn is only imported for models that have no compact export.
+    """
+    models = {}
+    for path in sorted(glob.glob(os.path.join(MODELS_DIR, "*.fsm"))):
+        from ai_modules import compact
+        models[os.path.splitext(os.path.basename(path))[0]] = compact.load(path)
+    paths = [p for p in sorted(glob.glob(os.path.join(MODELS_DIR, "*.joblib")))
+             if os.path.splitext(os.path.basename(p))[0] not in models]
+    if paths:
+        import joblib
+        models.update((os.path.splitext(os.path.basename(p))[0], joblib.load(p)) for p in paths)
+    return models
+
+
+@register("reference")
+def load_reference():
+    """`*.npy` (memory-mapped) and `*.json` files in REFERENCE_DIR, keyed by file stem."""
+    data = {}
+    for path in sorted(glob.glob(os.path.join(REFERENCE_DIR, "*"))):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        if ext == ".npy":
+            import numpy as np
+            data[stem] = np.load(path, mmap_mode="r")
+        elif ext == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                data[stem] = json.load(f)
+    return data
+
+
+def _load_all():
+    started = time.perf_counter()
+    loaded = {}
+    for name, loader in LOADERS.items():
+        with span("resources.load", resource=name):
+            loaded[name] = loader()
+    RESOURCES.clear()
+    RESOURCES.update(loaded)
+    STATE.update(
+        version=STATE["version"] + 1,
+        loaded_at=time.time(),
+        loaded_by_pid=os.getpid(),
+        load_seconds=time.perf_counter() - started,
+    )
+    if PUBLISH:
+        publish_reference()
+
+
+def publish_reference():
+    """Publish every reference array to the local data plane (see backend/dataplane.py)."""
+    arrays = {k: v for k, v in RESOURCES.get("reference", {}).items() if hasattr(v, "dtype")}
+    if not arrays:
+        return {}
+    from .dataplane import DataPlane
+    plane = DataPlane()
+    return {name: plane.publish(name, arr, meta={"resource_version": STATE["version"]})
+            for name, arr in arrays.items()}
+
+
+def preload(freeze=False):
+    """Load all resources unless this process (or its parent) already has.
+
+    With `freeze=True` the loaded objects are moved into the permanent GC
+    generation so collections in forked workers don't touch (and copy) their
+    pages.
+    """
+    with _lock:
+        if STATE["version"] == 0:
+            _load_all()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+
+def reload():
+    """Reload everything; used by the master on a graceful reload (SIGHUP)."""
+    with _lock:
+        gc.unfreeze()
+        _load_all()
+
+
+def get(name, default=None):
+    return RESOURCES.get(name, default)
+
+
+def status():
+    return {
+        **STATE,
+        "resources": sorted(RESOURCES),
+        "shared_from_parent": STATE["loaded_by_pid"] not in (None, os.getpid()),
+    }
@@ -0,0 +1,195 @@
+"""
+Content negotiation for numpy-heavy request and response bodies.
+
+Supported media types (request Content-Type and response Accept):
+
+    application/json                       orjson, arrays serialized natively
+    application/msgpack                    arrays as raw little-endian buffers
+    application/vnd.apache.arrow.stream    Arrow IPC stream, one row with a list column per array
+                                           (plain columns and several batches accepted on input)
+
+Arrays travel as contiguous buffers in the binary formats and are rebuilt with
+`np.frombuffer` on the way in, so no per-element Python float is created.
+Nested dicts/lists of scalars are kept as-is (Arrow stores them as JSON in the
+schema metadata).
+"""
+
+import json
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")  # only needed once a body actually carries arrays
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+_ND_KEY = "__ndarray__"
+
+
+# --- JSON ---
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_json_default).encode()
+
+
+def loads_json(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+# --- msgpack ---
+def _msgpack_default(obj):
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        if arr.dtype.byteorder == ">":
+            arr = arr.astype(arr.dtype.newbyteorder("<"))
+        return {_ND_KEY: [arr.dtype.str, list(arr.shape), memoryview(arr).cast("B")]}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not msgpack serializable")
+
+
+def _msgpack_hook(obj):
+    spec = obj.get(_ND_KEY) if len(obj) == 1 else None
+    if spec is None:
+        return obj
+    dtype, shape, data = spec
+    return np.frombuffer(data, dtype=np.dtype(dtype)).reshape(shape)
+
+
+def dumps_msgpack(obj):
+    import msgpack
+    return msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+
+
+def loads_msgpack(body):
+    import msgpack
+    return msgpack.unpackb(body, object_hook=_msgpack_hook, raw=False)
+
+
+# --- Arrow IPC ---
+def dumps_arrow(obj):
+    """Top-level ndarrays become single-row list columns; the rest goes to metadata."""
+    import pyarrow as pa
+
+    arrays, fields, rest = [], [], {}
+    for name, value in obj.items():
+        if isinstance(value, np.ndarray):
+            flat = np.ascontiguousarray(value).reshape(-1)
+            offsets = pa.array(np.array([0, flat.size], dtype=np.int64))
+            column = pa.LargeListArray.from_arrays(offsets, pa.array(flat))
+            arrays.append(column)
+            fields.append(pa.field(name, column.type, metadata={"shape": json.dumps(value.shape)}))
+        else:
+            rest[name] = value
+    schema = pa.schema(fields, metadata={"json": dumps_json(rest)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+    return sink.getvalue().to_pybytes()
+
+
+def loads_arrow(body):
+    """Each column becomes one array: list columns are flattened across rows, others taken as-is."""
+    import pyarrow as pa
+
+    reader = pa.ipc.open_stream(pa.py_buffer(body))
+    table = reader.read_all()
+    meta = table.schema.metadata or {}
+    out = loads_json(meta[b"json"]) if b"json" in meta else {}
+    for field, column in zip(table.schema, table.columns):
+        shape = (field.metadata or {}).get(b"shape")
+        column = column.combine_chunks()
+        if pa.types.is_list(field.type) or pa.types.is_large_list(field.type):
+            column = column.flatten()
+        arr = column.to_numpy(zero_copy_only=False)
+        out[field.name] = arr.reshape(json.loads(shape)) if shape is not None else arr
+    return out
+
+
+CODECS = {
+    JSON: (dumps_json, loads_json),
+    MSGPACK: (dumps_msgpack, loads_msgpack),
+    ARROW: (dumps_arrow, loads_arrow),
+}
+
+
+# --- Negotiation ---
+def _media_type(header):
+    media = (header or "").split(";", 1)[0].strip().lower()
+    return _ALIASES.get(media, media)
+
+
+def choose_response_type(accept):
+    """Highest-q supported media type in an Accept header (JSON by default).
+
+    Types listed with q=0 are refused, never chosen.
+    """
+    best, best_q = JSON, 0.0
+    for part in (accept or "").split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        media = _ALIASES.get(media.lower(), media.lower())
+        if media not in CODECS:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = media, q
+    return best
+
+
+async def read_body(request):
+    """Decode the request body according to its Content-Type ({} when empty)."""
+    body = await request.body()
+    if not body:
+        return {}
+    media = _media_type(request.headers.get("content-type")) or JSON
+    codec = CODECS.get(media)
+    if codec is None:
+        raise HTTPException(415, f"Unsupported Content-Type {media!r}; use one of {sorted(CODECS)}")
+    try:
+        return codec[1](body)
+    except Exception as e:
+        raise HTTPException(400, f"Could not decode {media} body: {e}")
+
+
+async def read_mapping(request):
+    """Like read_body, but the decoded body must be an object (422 otherwise)."""
+    body = await read_body(request)
+    if not isinstance(body, dict):
+        raise HTTPException(422, f"Request body must be an object, not {type(body).__name__}")
+    return body
+
+
+def negotiated(request, content, status_code=200):
+    """Encode `content` in the format the client prefers."""
+    media = choose_response_type(request.headers.get("accept"))
+    return Response(CODECS[media][0](content), status_code=status_code, media_type=media,
+                    headers={"Vary": "Accept"})
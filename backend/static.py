@@ -0,0 +1,126 @@
+"""
+Serve the generated site (output_plan/) from the backend.
+
+    app.mount('/site', SiteFiles(directory='output_plan'))
+
+On top of Starlette's StaticFiles (ETag/Last-Modified, 304s, Range and
+If-Range, and `http.response.pathsend` for zero-copy sends on servers that
+support it):
+
+* picks the .br / .gz sibling written by `wargame.site` when the client
+  accepts that encoding, so nothing is compressed per request;
+* content-hashed assets (name.<16 hex>.ext) are cached for a year as
+  immutable, other pages briefly and revalidated by ETag;
+* `/site/` serves the landing-page index;
+* only files listed in the build manifest are served. The site shares its
+  directory with the rest of the wargame output (prompts, raw responses,
+  plan, run history), none of which is public.
+"""
+
+import json
+import mimetypes
+import os
+import re
+import stat
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+INDEX_PAGE = "landing_page_index.html"
+MANIFEST = ".site_manifest.json"  # written by wargame.site
+HASHED_MAX_AGE = 365 * 24 * 3600
+PAGE_MAX_AGE = 60
+
+# Preferred first; suffixes match wargame.site.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_HASHED = re.compile(r"\.[0-9a-f]{16}\.[A-Za-z0-9]+$")
+
+
+def accepted_encodings(header):
+    """Encodings in an Accept-Encoding header with a non-zero q."""
+    accepted = set()
+    for part in (header or "").split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.add(name.lower())
+    return accepted
+
+
+class SiteFiles(StaticFiles):
+    def __init__(self, *, directory, hashed_max_age=HASHED_MAX_AGE, page_max_age=PAGE_MAX_AGE, **kwargs):
+        kwargs.setdefault("check_dir", False)  # the site may not be built yet
+        super().__init__(directory=directory, **kwargs)
+        self.hashed_max_age = hashed_max_age
+        self.page_max_age = page_max_age
+        self._published = frozenset()
+        self._manifest_mtime = None
+
+    def published(self):
+        """Relative paths of the pages and assets in the last build (reloaded when it changes)."""
+        path = os.path.join(self.directory, MANIFEST)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return frozenset()
+        if mtime != self._manifest_mtime:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._published = frozenset(json.load(f))
+            except (OSError, ValueError):
+                return frozenset()
+            self._manifest_mtime = mtime
+        return self._published
+
+    async def get_response(self, path, scope):
+        parts = [p for p in path.replace("\\", "/").split("/") if p not in ("", ".")]
+        path = "/".join(parts) or INDEX_PAGE
+        if path not in self.published():
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def _variant(self, full_path, request_headers):
+        if "range" in request_headers:
+            return None  # ranges refer to the identity bytes
+        accepted = accepted_encodings(request_headers.get("accept-encoding"))
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(f"{full_path}{suffix}")
+            except OSError:
+                continue
+            if stat.S_ISREG(variant_stat.st_mode):
+                return encoding, f"{full_path}{suffix}", variant_stat
+        return None
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        if _HASHED.search(full_path):
+            cache_control = f"public, max-age={self.hashed_max_age}, immutable"
+        else:
+            cache_control = f"public, max-age={self.page_max_age}, must-revalidate"
+        headers = {"cache-control": cache_control, "vary": "Accept-Encoding"}
+
+        variant = self._variant(full_path, request_headers)
+        if variant is not None:
+            encoding, path, stat_result = variant
+            media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+            headers["content-encoding"] = encoding
+            response = FileResponse(path, status_code=status_code, headers=headers, media_type=media_type,
+                                    stat_result=stat_result)
+        else:
+            response = FileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,271 @@
+"""
+Benchmarks for the system's hot paths.
+
+Covers the war-game prompt pipeline (against an in-process mock model),
+landing-page rendering, the FastAPI `/` and `/run` endpoints under
+concurrent load, and the ai_modules / portfolio_engine compute paths.
+"""
+
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from .harness import Result, benchmark, measure
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# --- Mock model ---
+IDEAS_REPLY = "\n".join(
+    f"{i}. Idea {i} - Automated faceless tool number {i} for small businesses." for i in range(1, 11)
+)
+LANDING_REPLY = "Headline\nSubheadline\n- Saves hours every week\n- No manual work\n- Cancel anytime\nPricing: $29/mo"
+
+
+class MockChatCompletion:
+    """Stands in for `openai.ChatCompletion` with canned replies and fixed latency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, model=None, messages=(), max_tokens=None, temperature=None, stream=False, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = messages[-1]["content"] if messages else ""
+        content = IDEAS_REPLY if "ideas" in prompt.lower() else LANDING_REPLY
+        if stream:
+            return (SimpleNamespace(choices=[{"delta": {"content": line}}])
+                    for line in content.splitlines(keepends=True))
+        return SimpleNamespace(choices=[SimpleNamespace(message={"content": content})])
+
+
+@contextlib.contextmanager
+def _mock_client(latency=0.0):
+    """A ModelClient wired to MockChatCompletion, writing into a temp dir."""
+    from wargame import client as client_module
+    from wargame.config import Paths
+
+    real = client_module.openai
+    client_module.openai = SimpleNamespace(ChatCompletion=MockChatCompletion(latency), api_key=None)
+    try:
+        with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull, \
+                contextlib.redirect_stdout(devnull):
+            yield client_module.ModelClient(api_key="mock"), Paths(tmp)
+    finally:
+        client_module.openai = real
+
+
+@benchmark("wargame.plan_pipeline")
+def wargame_plan_pipeline():
+    from wargame import commands
+
+    with _mock_client() as (client, paths):
+        return measure(lambda: commands.plan(client, paths))
+
+
+@benchmark("wargame.ideas_pages_pipeline")
+def wargame_ideas_pages_pipeline():
+    from wargame import commands
+
+    with _mock_client() as (client, paths):
+        return measure(lambda: commands.pages(client, paths, regenerate_ideas=True))
+
+
+@benchmark("pages.render_landing_html")
+def render_landing_html():
+    from wargame.pages import generate_landing_html
+
+    bullets = ["Automates a repetitive task", "No manual labor", "Subscription + templates"]
+    return measure(lambda: generate_landing_html("Title", "Subtitle", bullets, "$29/mo", "Go"))
+
+
+# --- Backend under concurrent load ---
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def _backend():
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline:
+            with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), 0.2):
+                break
+            time.sleep(0.05)
+        else:
+            raise RuntimeError("backend did not start")
+        yield base
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+
+def _load(method, url, requests_total=2000, concurrency=32):
+    import requests
+
+    local = threading.local()
+
+    def one(_):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        session.request(method, url, timeout=30).raise_for_status()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(concurrency * 2)))  # warm up connections
+        start = time.perf_counter()
+        latencies = np.array(list(pool.map(one, range(requests_total))))
+        elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return Result(
+        float(p50),
+        extra={"p99_s": float(p99), "requests_per_s": requests_total / elapsed, "concurrency": concurrency},
+    )
+
+
+@benchmark("backend.get_root")
+def backend_get_root():
+    with _backend() as base:
+        return _load("GET", f"{base}/")
+
+
+@benchmark("backend.post_run")
+def backend_post_run():
+    with _backend() as base:
+        return _load("POST", f"{base}/run")
+
+
+# --- ai_modules / portfolio_engine ---
+def _tick_batch(n=16384, n_symbols=200, seed=0):
+    from ingestion.records import TICK_DTYPE, SymbolTable
+
+    rng = np.random.default_rng(seed)
+    batch = np.zeros(n, dtype=TICK_DTYPE)
+    batch["ts"] = np.arange(n) * 1000
+    batch["symbol"] = rng.integers(0, n_symbols, n)
+    batch["price"] = 100 * np.exp(rng.normal(0, 1e-3, n))
+    batch["size"] = rng.integers(1, 100, n)
+    batch["bid"] = batch["price"] - 0.01
+    batch["ask"] = batch["price"] + 0.01
+    symbols = SymbolTable()
+    symbols.reserve(n_symbols)
+    return batch, symbols
+
+
+def _subscriber_bench(factory):
+    batch, symbols = _tick_batch()
+    subscriber = factory()
+    result = measure(lambda: subscriber.on_batch(batch, symbols))
+    result.extra["ticks_per_s"] = len(batch) / result.value
+    return result
+
+
+@benchmark("ai_modules.regime_detection.on_batch")
+def regime_on_batch():
+    from ai_modules.regime_detection.stream import RegimeSubscriber
+    return _subscriber_bench(RegimeSubscriber)
+
+
+@benchmark("ai_modules.liquidity_model.on_batch")
+def liquidity_on_batch():
+    from ai_modules.liquidity_model.stream import LiquiditySubscriber
+    return _subscriber_bench(LiquiditySubscriber)
+
+
+@benchmark("ai_modules.fx_predictor.on_batch")
+def fx_on_batch():
+    from ai_modules.fx_predictor.stream import FxSubscriber
+    return _subscriber_bench(FxSubscriber)
+
+
+@benchmark("ingestion.validate")
+def ingestion_validate():
+    from ingestion.validation import Validator
+
+    batch, symbols = _tick_batch()
+    batch["ts"] = np.sort(batch["ts"])
+    batch["price"][::997] = np.nan
+    # A fresh validator per call: replaying the same batch would quarantine every row as out of order.
+    result = measure(lambda: Validator().validate(batch, symbols))
+    result.extra["ticks_per_s"] = len(batch) / result.value
+    return result
+
+
+@benchmark("portfolio_engine.evaluate_config")
+def backtest_evaluate_config():
+    from portfolio_engine.backtest import evaluate_config, walk_forward_windows
+
+    rng = np.random.default_rng(0)
+    prices = 100 * np.cumprod(1 + rng.normal(3e-4, 1e-2, (2520, 100)), axis=0)
+    windows = walk_forward_windows(len(prices), 504, 126)
+    params = {"lookback": 60, "top_frac": 0.2}
+    return measure(lambda: evaluate_config(prices, "momentum", params, windows), repeat=5)
+
+
+@benchmark("portfolio_engine.factor_model_fit")
+def factor_model_fit():
+    from portfolio_engine.factor_model import FactorRiskModel
+
+    rng = np.random.default_rng(0)
+    exposures = rng.normal(size=(1000, 20))
+    returns = rng.normal(0, 0.02, (2520, 1000))
+    returns[rng.random(returns.shape) < 0.02] = np.nan
+    return measure(lambda: FactorRiskModel().fit(returns, exposures), repeat=3)
+
+
+@benchmark("portfolio_engine.min_variance")
+def factor_min_variance():
+    from portfolio_engine.factor_model import RiskModel
+    from portfolio_engine.optimizer import min_variance
+
+    rng = np.random.default_rng(0)
+    factors = rng.normal(size=(40, 40)) * 0.01
+    risk = RiskModel(rng.normal(size=(3000, 40)), factors @ factors.T, rng.uniform(1e-4, 4e-4, 3000))
+    return measure(lambda: min_variance(risk))
+
+
+@benchmark("portfolio_engine.scenario_pnl")
+def scenario_pnl():
+    """A new combined what-if on a 3,000-asset book whose components are cached."""
+    import itertools
+
+    from portfolio_engine.factor_model import RiskModel
+    from portfolio_engine.scenarios import CountryDowngrade, FxShock, MarketData, Scenario, ScenarioEngine
+
+    rng = np.random.default_rng(0)
+    n, k = 3000, 40
+    fx = rng.normal(size=(6, 6)) * 0.01
+    factors = rng.normal(size=(k, k)) * 0.01
+    market = MarketData(
+        assets=[f"A{i}" for i in range(n)], positions=rng.uniform(1e5, 1e6, n),
+        currencies=["USD", "EUR", "GBP", "JPY", "CHF", "SEK"], asset_currency=rng.integers(0, 6, n),
+        fx_cov=fx @ fx.T, countries=["IT", "DE", "FR"], country_exposure=rng.dirichlet(np.ones(3), n),
+        spread_duration=rng.uniform(0, 8, n), downgrade_bp=np.array([40.0, 20.0, 25.0]),
+        risk=RiskModel(rng.normal(size=(n, k)), factors @ factors.T, rng.uniform(1e-4, 4e-4, n)),
+        factors=[f"f{i}" for i in range(k)],
+    )
+    engine = ScenarioEngine(market)
+    pcts = itertools.count(1)
+    return measure(lambda: engine.pnl(Scenario.of(FxShock("EUR", -next(pcts) * 1e-6), CountryDowngrade("IT", 2))))
@@ -0,0 +1,64 @@
+"""
+Timing primitives and the benchmark registry.
+
+A benchmark is a function decorated with @benchmark that returns a Result.
+Results are compared on `value` (lower is better unless stated otherwise).
+"""
+
+import gc
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+
+REGISTRY = {}
+
+
+@dataclass
+class Result:
+    value: float
+    unit: str = "s"
+    lower_is_better: bool = True
+    extra: dict = field(default_factory=dict)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def benchmark(name):
+    def register(fn):
+        REGISTRY[name] = fn
+        return fn
+    return register
+
+
+def measure(fn, repeat=7, number=None, warmup=1, min_time=0.2):
+    """timeit-style: median seconds per call over `repeat` rounds of `number` calls."""
+    for _ in range(warmup):
+        fn()
+    if number is None:
+        number, elapsed = 1, 0.0
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time / repeat or number >= 1 << 20:
+                break
+            number *= 2
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    samples.sort()
+    return Result(
+        statistics.median(samples),
+        extra={"min_s": samples[0], "max_s": samples[-1], "repeat": repeat, "number": number},
+    )
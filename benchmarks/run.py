@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Run the benchmark suite and compare it against a saved baseline.
+
+Results are written to benchmarks/results/<timestamp>.json. A benchmark whose
+value is worse than the baseline by more than --threshold is reported as a
+regression and the command exits with status 1, as it does when a benchmark
+fails to run.
+
+Usage:
+    python -m benchmarks.run                       # run all, compare to baseline
+    python -m benchmarks.run -k ai_modules         # only names containing "ai_modules"
+    python -m benchmarks.run --save-baseline       # accept current numbers as the baseline
+"""
+
+import argparse
+import json
+import platform
+import sys
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+
+from . import cases  # noqa: F401  (registers benchmarks)
+from .harness import REGISTRY
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+
+def run(selected):
+    """Results by name, and the error of each benchmark that raised."""
+    results, errors = {}, {}
+    for name in selected:
+        print(f"{name} ...", end=" ", flush=True)
+        try:
+            result = REGISTRY[name]().to_dict()
+        except Exception as e:
+            print(f"ERROR: {e}")
+            traceback.print_exc()
+            errors[name] = f"{type(e).__name__}: {e}"
+            continue
+        results[name] = result
+        print(f"{result['value'] * 1e3:.3f} ms" if result["unit"] == "s" else result["value"])
+    return results, errors
+
+
+def compare(results, baseline, threshold):
+    """Names of benchmarks that got worse than `baseline` by more than `threshold`."""
+    regressions = []
+    for name, current in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or not base["value"]:
+            continue
+        change = (current["value"] - base["value"]) / base["value"]
+        if not current.get("lower_is_better", True):
+            change = -change
+        flag = "REGRESSION" if change > threshold else ""
+        print(f"{name:45} {base['value']:12.6g} -> {current['value']:12.6g} {change:+8.1%} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FinSight benchmark suite")
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks containing this text")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    selected = [name for name in REGISTRY if args.pattern in name]
+    results, errors = run(selected)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    payload = {
+        "recorded_at": stamp,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+        "errors": errors,
+    }
+    out = RESULTS_DIR / f"{stamp}.json"
+    out.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"\nResults written to {out}")
+
+    status = 0
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {"results": {}}
+        baseline["results"].update(results)
+        baseline["recorded_at"] = stamp
+        args.baseline.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+        print(f"Baseline updated: {args.baseline}")
+    elif not args.baseline.exists():
+        print("No baseline yet; run with --save-baseline to create one.")
+    else:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            status = 1
+    if errors:
+        print(f"\n{len(errors)} benchmark(s) failed: {', '.join(errors)}")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Gunicorn configuration for running the backend in production on Linux.
+
+    gunicorn -c gunicorn_conf.py main:app        (or ./serve.sh start)
+
+The app is imported and backend.resources are loaded once in the master and
+frozen, then workers are forked and share those pages copy-on-write. Each
+worker runs its own uvicorn event loop, so throughput scales with cores.
+
+Signals to the master (see serve.sh):
+    HUP   graceful reload: reload resources in the master, fork fresh workers,
+          let old workers finish in-flight requests
+    USR2  start a new master with new code next to the old one (then QUIT the old)
+    TTIN / TTOU  add / remove a worker
+"""
+
+import multiprocessing
+import os
+import random
+
+bind = os.getenv("FINSIGHT_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("FINSIGHT_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# A worker that misses heartbeats for `timeout` seconds is killed and replaced;
+# on reload/shutdown workers get `graceful_timeout` seconds to drain.
+timeout = int(os.getenv("FINSIGHT_WORKER_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("FINSIGHT_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers periodically so slow leaks can't grow unbounded.
+max_requests = int(os.getenv("FINSIGHT_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("FINSIGHT_ACCESS_LOG")
+errorlog = "-"
+pidfile = os.getenv("FINSIGHT_PIDFILE", "/tmp/finsight-gunicorn.pid")
+
+
+def when_ready(server):
+    from backend import resources
+    resources.preload(freeze=True)
+    server.log.info("Resources loaded in master (version %s)", resources.STATE["version"])
+
+
+def on_reload(server):
+    from backend import resources
+    resources.reload()
+    resources.preload(freeze=True)
+    server.log.info("Resources reloaded in master (version %s)", resources.STATE["version"])
+
+
+def post_fork(server, worker):
+    # Forked workers would otherwise share the master's RNG state.
+    random.seed()
+    try:
+        import numpy as np
+        np.random.seed()
+    except ImportError:
+        pass
+
+
+def post_worker_init(worker):
+    from backend import resources
+    worker.log.info("Worker %s ready (resources version %s)", worker.pid, resources.STATE["version"])
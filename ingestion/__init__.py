@@ -0,0 +1,6 @@
+"""Streaming market-data ingestion feeding the ai_modules."""
+
+from .pipeline import Pipeline, default_subscribers
+from .records import BAR_DTYPE, TICK_DTYPE, SymbolTable
+from .sources import FileReplaySource, WebSocketSource
+from .validation import Validator
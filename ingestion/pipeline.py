@@ -0,0 +1,90 @@
+"""
+Asyncio fan-out pipeline from one source to many subscribers.
+
+Each subscriber gets its own bounded queue. The producer awaits every queue
+before pulling the next batch, so the slowest subscriber throttles the source
+instead of letting memory grow without bound.
+"""
+
+import asyncio
+import time
+
+from .records import SymbolTable
+
+_STOP = object()
+
+
+class Pipeline:
+    """Runs `source` and delivers every batch to each subscriber's `on_batch`.
+
+    Subscribers are plain objects with `on_batch(batch, symbols)` and an
+    optional `name`. Handlers are synchronous and expected to be vectorized;
+    a handler that needs to block should offload to an executor itself.
+
+    With a `validator` (ingestion.validation.Validator), every batch is
+    checked and repaired before fan-out; quarantined rows never reach the
+    subscribers and the validation state is saved when the run ends.
+    """
+
+    def __init__(self, source, subscribers, queue_size=8, symbols=None, validator=None):
+        self.source = source
+        self.subscribers = list(subscribers)
+        self.queue_size = queue_size
+        self.symbols = symbols or SymbolTable()
+        self.validator = validator
+        self.stats = {"batches": 0, "ticks": 0, "quarantined": 0, "seconds": 0.0}
+
+    async def _consume(self, subscriber, queue):
+        while True:
+            batch = await queue.get()
+            if batch is _STOP:
+                return
+            subscriber.on_batch(batch, self.symbols)
+
+    async def _put(self, queue, consumer, batch):
+        if queue.full():
+            put = asyncio.ensure_future(queue.put(batch))
+            await asyncio.wait({put, consumer}, return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                consumer.result()  # re-raise the subscriber's error
+                raise RuntimeError(f"subscriber {consumer.get_name()} stopped early")
+        else:
+            queue.put_nowait(batch)
+
+    async def run(self):
+        queues = [asyncio.Queue(self.queue_size) for _ in self.subscribers]
+        consumers = [
+            asyncio.create_task(self._consume(sub, q), name=getattr(sub, "name", None))
+            for sub, q in zip(self.subscribers, queues)
+        ]
+        started = time.perf_counter()
+        try:
+            async for batch in self.source.batches(self.symbols):
+                if self.validator is not None:
+                    received = len(batch)
+                    batch = self.validator.validate(batch, self.symbols)
+                    self.stats["quarantined"] += received - len(batch)
+                    if not len(batch):
+                        continue
+                for q, consumer in zip(queues, consumers):
+                    await self._put(q, consumer, batch)
+                self.stats["batches"] += 1
+                self.stats["ticks"] += len(batch)
+            for q, consumer in zip(queues, consumers):
+                await self._put(q, consumer, _STOP)
+            await asyncio.gather(*consumers)
+        finally:
+            for task in consumers:
+                task.cancel()
+            if self.validator is not None:
+                self.validator.save()
+            self.stats["seconds"] = time.perf_counter() - started
+        return self.stats
+
+
+def default_subscribers():
+    """Streaming subscribers of the ai_modules that consume ticks."""
+    import ai_modules
+
+    return [ai_modules.resolve(target)() for target in ai_modules.SUBSCRIBERS.values()]
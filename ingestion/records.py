@@ -0,0 +1,118 @@
+"""
+Compact record layouts shared by ingestion sources and subscribers.
+
+Ticks and bars travel through the pipeline as numpy structured arrays, one
+array per batch, so no Python object is created per tick. Symbols are
+interned to small integer ids by a SymbolTable owned by the pipeline.
+"""
+
+import numpy as np
+
+TICK_DTYPE = np.dtype([
+    ("ts", "<i8"),       # exchange timestamp, ns since epoch
+    ("symbol", "<u4"),   # SymbolTable id
+    ("price", "<f8"),
+    ("size", "<f8"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+])
+
+BAR_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("symbol", "<u4"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+
+class SymbolTable:
+    """Maps symbol strings to dense uint32 ids (and back)."""
+
+    def __init__(self):
+        self._ids = {}
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        sid = self._ids.get(name)
+        if sid is None:
+            sid = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return sid
+
+    def reserve(self, n):
+        """Make ids 0..n-1 valid, naming unknown ones "#<id>"."""
+        for sid in range(len(self.names), n):
+            self.intern(f"#{sid}")
+
+    def intern_many(self, names):
+        """Vectorized intern: unique names are looked up once, not per row."""
+        uniques, inverse = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+        ids = np.fromiter((self.intern(n) for n in uniques), dtype=np.uint32, count=len(uniques))
+        return ids[inverse]
+
+
+class BatchBuilder:
+    """Preallocated ring of record slots that is flushed as one batch."""
+
+    def __init__(self, dtype=TICK_DTYPE, capacity=65536):
+        self._buf = np.empty(capacity, dtype=dtype)
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def free(self):
+        return len(self._buf) - self._n
+
+    def extend(self, records):
+        """Copy as many of `records` as fit; returns how many were taken."""
+        take = min(len(records), self.free)
+        self._buf[self._n:self._n + take] = records[:take]
+        self._n += take
+        return take
+
+    def flush(self):
+        batch = self._buf[:self._n].copy()
+        self._n = 0
+        return batch
+
+
+def grouped_last(symbols, values, n_symbols):
+    """Last value per symbol id within a batch (NaN where a symbol is absent)."""
+    out = np.full(n_symbols, np.nan)
+    out[symbols] = values  # later rows overwrite earlier ones
+    return out
+
+
+def per_symbol_diff(symbols, values, prev):
+    """Row-wise `values - previous value of the same symbol`.
+
+    `prev` holds the last value seen per symbol before this batch (NaN if
+    unseen). Rows are assumed to be in arrival order.
+    """
+    order = np.argsort(symbols, kind="stable")
+    s, v = symbols[order], values[order]
+    before = np.empty_like(v)
+    before[1:] = v[:-1]
+    first = np.ones(len(s), dtype=bool)
+    first[1:] = s[1:] != s[:-1]
+    before[first] = prev[s[first]]
+    out = np.empty_like(v)
+    out[order] = v - before
+    return out
+
+
+def ensure_capacity(state, n_symbols, fill=np.nan):
+    """Grow a per-symbol state vector so it can be indexed by every id."""
+    if len(state) >= n_symbols:
+        return state
+    grown = np.full(max(n_symbols, 2 * len(state), 64), fill, dtype=state.dtype)
+    grown[:len(state)] = state
+    return grown
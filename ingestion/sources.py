@@ -0,0 +1,150 @@
+"""
+Pluggable tick/bar sources for the ingestion pipeline.
+
+A source is any object with an async `batches(symbols)` generator that yields
+numpy structured arrays of TICK_DTYPE (or BAR_DTYPE). Sources decode frames in
+bulk so the per-tick cost stays inside numpy.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .records import TICK_DTYPE, BatchBuilder
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+
+class FileReplaySource:
+    """Replays archived ticks from `.npy` (memory-mapped), `.csv` or `.parquet` files.
+
+    CSV and Parquet files need the columns ts, symbol, price, size, bid, ask
+    and are read with pandas (CSV in chunks). `.npy` files hold symbol ids;
+    their names are read from a `<name>.symbols.json` sidecar when present. `speed=None` replays as fast as possible; otherwise
+    batches are paced so that `speed` seconds of market time pass per second.
+    """
+
+    def __init__(self, path, batch_size=16384, speed=None, dtype=TICK_DTYPE):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.speed = speed
+        self.dtype = dtype
+
+    async def batches(self, symbols):
+        start_wall = start_ts = None
+        for batch in self._read(symbols):
+            if self.speed and len(batch):
+                first_ts = int(batch["ts"][0])
+                if start_ts is None:
+                    start_wall, start_ts = time.perf_counter(), first_ts
+                due = start_wall + (first_ts - start_ts) / 1e9 / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield batch
+            await asyncio.sleep(0)
+
+    def _read(self, symbols):
+        if self.path.suffix == ".npy":
+            sidecar = self.path.with_suffix(".symbols.json")
+            if sidecar.exists():
+                for name in _json.loads(sidecar.read_bytes()):
+                    symbols.intern(name)
+            data = np.load(self.path, mmap_mode="r")
+            for i in range(0, len(data), self.batch_size):
+                batch = np.asarray(data[i:i + self.batch_size], dtype=self.dtype)
+                if len(batch):
+                    symbols.reserve(int(batch["symbol"].max()) + 1)
+                yield batch
+            return
+        import pandas as pd
+        if self.path.suffix == ".parquet":
+            frame = pd.read_parquet(self.path, columns=list(self.dtype.names))
+            chunks = (frame.iloc[i:i + self.batch_size] for i in range(0, len(frame), self.batch_size))
+        else:
+            chunks = pd.read_csv(self.path, chunksize=self.batch_size)
+        for chunk in chunks:
+            yield frame_to_records(chunk, symbols, self.dtype)
+
+
+def frame_to_records(frame, symbols, dtype=TICK_DTYPE):
+    """Convert a pandas DataFrame column-wise into a structured record array."""
+    import pandas as pd
+
+    batch = np.empty(len(frame), dtype=dtype)
+    for name in dtype.names:
+        col = frame[name]
+        if name == "symbol":
+            batch[name] = symbols.intern_many(col.to_numpy())
+        elif name == "ts" and not pd.api.types.is_integer_dtype(col):
+            batch[name] = pd.to_datetime(col).to_numpy("datetime64[ns]").view("i8")
+        else:
+            batch[name] = col.to_numpy()
+    return batch
+
+
+class WebSocketSource:
+    """Reads ticks from a websocket feed.
+
+    Binary frames must be packed TICK_DTYPE records and are decoded with
+    `np.frombuffer`. Text frames must be columnar JSON, e.g.
+    {"ts": [...], "symbol": [...], "price": [...], ...}. Frames are coalesced
+    into batches of up to `batch_size` rows or `flush_interval` seconds.
+    Requires the optional `websockets` package.
+    """
+
+    def __init__(self, url, batch_size=16384, flush_interval=0.05, subscribe_message=None):
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.subscribe_message = subscribe_message
+
+    def decode(self, frame, symbols):
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            return np.frombuffer(frame, dtype=TICK_DTYPE)
+        cols = _json.loads(frame)
+        n = len(cols["ts"])
+        batch = np.zeros(n, dtype=TICK_DTYPE)
+        for name in TICK_DTYPE.names:
+            if name not in cols:
+                continue
+            if name == "symbol":
+                batch[name] = symbols.intern_many(cols[name])
+            else:
+                batch[name] = cols[name]
+        return batch
+
+    async def batches(self, symbols):
+        import websockets
+
+        builder = BatchBuilder(TICK_DTYPE, self.batch_size)
+        async with websockets.connect(self.url, max_size=None) as ws:
+            if self.subscribe_message is not None:
+                await ws.send(self.subscribe_message)
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                try:
+                    timeout = max(deadline - time.monotonic(), 0)
+                    frame = await asyncio.wait_for(ws.recv(), timeout)
+                except asyncio.TimeoutError:
+                    frame = None
+                except websockets.ConnectionClosed:
+                    break
+                if frame is not None:
+                    records = self.decode(frame, symbols)
+                    while len(records):
+                        taken = builder.extend(records)
+                        records = records[taken:]
+                        if not builder.free:
+                            yield builder.flush()
+                if time.monotonic() >= deadline:
+                    if len(builder):
+                        yield builder.flush()
+                    deadline = time.monotonic() + self.flush_interval
+        if len(builder):
+            yield builder.flush()
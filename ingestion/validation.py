@@ -0,0 +1,480 @@
+"""
+Vectorized data-quality validation and repair at ingest time.
+
+A Validator sits between the source and the subscribers of Pipeline and
+checks each batch column by column, with no Python work per row:
+
+* prices that are NaN, infinite, zero or negative, and negative sizes/volumes;
+* bars whose high/low do not bracket open and close;
+* duplicate rows: the same (symbol, ts) for bars, or identical ticks. This
+  includes a bar at the last timestamp already ingested for the symbol;
+* timestamps running backwards within a symbol, and outlier timestamps:
+  ahead of both neighbouring rows of the symbol, or of the wall clock;
+* split-like jumps: a move from the symbol's previous price that is close to
+  2:1, 3:1, 4:1, ... or one of their inverses.
+
+Rows are repaired when the correct value is unambiguous:
+* a missing size/volume becomes 0;
+* a missing bid/ask falls back to the price;
+* a missing open/high/low falls back to the close;
+* high/low are widened to bracket open and close;
+* after a split confirmed by a corporate action, prices are put back on the
+  pre-split scale (and sizes scaled the other way), so downstream returns
+  stay continuous.
+
+A split-like jump without a matching corporate action is not repaired: the
+row, and the later rows of the symbol at the jumped level, are quarantined
+until the split is confirmed (`add_split`) and the data re-ingested.
+
+Rows that cannot be repaired are quarantined. They are dropped from the
+batch and counted per symbol and issue. They are recorded as merged
+[start, end] ranges per symbol. With `quarantine_dir`, the raw rows are also
+written to .npy files with an `issues` bitmask.
+
+    validator = Validator(state_path=os.path.join(VALIDATION_DIR, "state.json"))
+    validator.listen(cache_listener(response_cache))
+    await Pipeline(source, subscribers, validator=validator).run()
+
+Each quarantine or split bumps the state generation and records the symbol
+and time range it affected. Listeners receive {symbol: (start_ns, end_ns)}
+for only those symbols. Other processes can poll `changes(since)` on the
+persisted state, so no cache has to be flushed globally.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from tracing import traced
+
+from .records import ensure_capacity
+
+VALIDATION_DIR = os.getenv("FINSIGHT_VALIDATION_DIR", os.path.join("data", "validation"))
+
+# Issue bits, also the column order of the per-symbol counters.
+ISSUES = ("non_finite", "non_positive", "negative_size", "ohlc", "duplicate", "out_of_order", "split", "jump",
+          "future_ts", "suspected_split")
+BIT = {name: 1 << i for i, name in enumerate(ISSUES)}
+QUARANTINE = (BIT["non_finite"] | BIT["non_positive"] | BIT["negative_size"] | BIT["duplicate"]
+              | BIT["out_of_order"] | BIT["future_ts"] | BIT["suspected_split"])
+
+SPLIT_RATIOS = (2, 3, 4, 5, 8, 10, 20, 50, 100)
+DAY_NS = 86400 * 10 ** 9
+
+_NO_TS = np.iinfo(np.int64).min
+
+
+def _layout(dtype):
+    """(reference price, all price columns, size column, duplicate key) for a record dtype."""
+    names = dtype.names
+    if "close" in names:
+        return "close", ("open", "high", "low", "close"), "volume", ("symbol", "ts")
+    return "price", tuple(n for n in ("price", "bid", "ask") if n in names), "size", ("symbol", "ts", "price", "size")
+
+
+def _duplicates(batch, order, tie, key):
+    """Rows repeating an earlier row's key, given `order` sorted by (symbol, ts) and its (symbol, ts) ties."""
+    if not tie.any():
+        return order[:0]
+    if key == ("symbol", "ts"):
+        return order[1:][tie]
+    # Only rows sharing a timestamp can repeat each other; sort those few by the full key.
+    shared = np.zeros(len(order), dtype=bool)
+    shared[1:] |= tie
+    shared[:-1] |= tie
+    rows = order[shared]
+    rows = rows[np.lexsort([rows] + [batch[k][rows] for k in reversed(key)])]
+    same = np.ones(len(rows) - 1, dtype=bool)
+    for k in key:
+        col = batch[k][rows]
+        same &= col[1:] == col[:-1]
+    return rows[1:][same]
+
+
+def _merge_range(ranges, start, end, mask, limit):
+    """Insert [start, end, mask] into sorted, non-overlapping `ranges` in place."""
+    for r in ranges:
+        if start <= r[1] and end >= r[0]:
+            start, end, mask = min(start, r[0]), max(end, r[1]), mask | r[2]
+    ranges[:] = [r for r in ranges if r[1] < start or r[0] > end] + [[start, end, mask]]
+    ranges.sort()
+    del ranges[:-limit]
+
+
+class Validator:
+    """Checks, repairs and filters batches; keeps per-symbol validation state.
+
+    `max_move` is the largest absolute log move between consecutive prices
+    that is not reported as a jump (non-split jumps are counted, not
+    dropped). Moves within `split_tolerance` (in log terms) of a split ratio
+    are splits only when `corporate_actions` ({symbol: [(ts_ns, ratio)]},
+    or `add_split`) confirms them, and are then rescaled when
+    `repair_splits` is set; unconfirmed ones are quarantined. Rows more
+    than `max_skew` ns ahead of the wall clock are quarantined (None
+    disables the check, e.g. for synthetic timestamps).
+    """
+
+    def __init__(self, state_path=None, quarantine_dir=None, max_move=0.25, split_tolerance=0.02,
+                 corporate_actions=None, repair_splits=True, max_skew=DAY_NS, max_ranges=1000,
+                 max_changes=10000):
+        self.state_path = state_path
+        self.quarantine_dir = quarantine_dir
+        self.max_move = max_move
+        self.split_tolerance = split_tolerance
+        self.repair_splits = repair_splits
+        self.actions = {name: [(int(at), float(r)) for at, r in acts] for name, acts in (corporate_actions or {}).items()}
+        self.max_skew = max_skew
+        self.max_ranges = max_ranges
+        self.max_changes = max_changes
+        self.listeners = []
+
+        self.last_ts = np.empty(0, dtype=np.int64)
+        self.last_log = np.empty(0)         # last accepted raw log price, before split adjustment
+        self.log_adjust = np.empty(0)       # log factor applied to prices since the last split
+        self.rows = np.empty(0, dtype=np.int64)
+        self.counts = {name: np.empty(0, dtype=np.int64) for name in ISSUES}
+        self.names = []
+        self.generation = 0
+        self.quarantined = {}               # symbol -> [[start_ns, end_ns, issue mask], ...]
+        self.splits = {}                    # symbol -> [[ts_ns, ratio], ...]
+        self._changes = []                  # [generation, symbol, start_ns, end_ns, issue mask]
+        self._saved = {}                    # persisted per-symbol state, applied when a symbol is first seen
+        self._seq = 0
+        if state_path and os.path.exists(state_path):
+            self._load(state_path)
+
+    def listen(self, callback):
+        """Call `callback({symbol: (start_ns, end_ns)})` whenever ingested data is quarantined or rescaled."""
+        self.listeners.append(callback)
+        return callback
+
+    # --- State ---
+    def _grow(self, symbols):
+        n, known = len(symbols), len(self.names)
+        if n <= known:
+            return
+        self.last_ts = ensure_capacity(self.last_ts, n, _NO_TS)
+        self.last_log = ensure_capacity(self.last_log, n)
+        self.log_adjust = ensure_capacity(self.log_adjust, n, 0.0)
+        self.rows = ensure_capacity(self.rows, n, 0)
+        for name in ISSUES:
+            self.counts[name] = ensure_capacity(self.counts[name], n, 0)
+        self.names = list(symbols.names[:n])
+        for sid in range(known, n):
+            saved = self._saved.pop(self.names[sid], None)
+            if saved is None:
+                continue
+            self.last_ts[sid] = saved["last_ts"]
+            self.last_log[sid] = np.log(saved["last_price"]) if saved["last_price"] else np.nan
+            self.log_adjust[sid] = np.log(saved["adjust"])
+            self.rows[sid] = saved["rows"]
+            for name, count in saved["issues"].items():
+                if name in self.counts:
+                    self.counts[name][sid] = count
+
+    def _load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.generation = state["generation"]
+        self._changes = state["changes"]
+        for name, entry in state["symbols"].items():
+            self.quarantined[name] = entry.pop("quarantined")
+            self.splits[name] = entry.pop("splits")
+            self._saved[name] = entry
+
+    def summary(self, symbol=None):
+        """Per-symbol validation state (what `save` persists)."""
+        out = {name: dict(entry, quarantined=self.quarantined.get(name, []), splits=self.splits.get(name, []))
+               for name, entry in self._saved.items()}
+        for sid, name in enumerate(self.names):
+            if not self.rows[sid] and name not in self.quarantined:
+                continue
+            out[name] = {
+                "last_ts": int(self.last_ts[sid]),
+                "last_price": float(np.exp(self.last_log[sid])) if np.isfinite(self.last_log[sid]) else None,
+                "adjust": float(np.exp(self.log_adjust[sid])),
+                "rows": int(self.rows[sid]),
+                "issues": {k: int(self.counts[k][sid]) for k in ISSUES if self.counts[k][sid]},
+                "quarantined": self.quarantined.get(name, []),
+                "splits": self.splits.get(name, []),
+            }
+        return out if symbol is None else out.get(symbol)
+
+    def save(self, path=None):
+        path = path or self.state_path
+        if not path:
+            return None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        state = {"generation": self.generation, "saved_at": time.time(), "symbols": self.summary(),
+                 "changes": self._changes}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+        return path
+
+    def changes(self, since=0):
+        """{symbol: (start_ns, end_ns)} affected by quarantines and splits after generation `since`."""
+        return changes(self._changes, since)
+
+    # --- Validation ---
+    @traced()
+    def validate(self, batch, symbols):
+        """Return the repaired batch without its quarantined rows."""
+        n = len(batch)
+        if not n:
+            return batch
+        self._grow(symbols)
+        ref, prices, size, key = _layout(batch.dtype)
+        sym = batch["symbol"].astype(np.intp)
+        ts = batch["ts"]
+        issues = np.zeros(n, dtype=np.uint16)
+        out = batch
+
+        def writable():
+            nonlocal out
+            if out is batch:
+                out = np.array(batch)
+            return out
+
+        # Repairs of secondary columns
+        bad_size = ~np.isfinite(batch[size])
+        if bad_size.any():
+            writable()[size][bad_size] = 0.0
+        for col in prices:
+            if col == ref:
+                continue
+            missing = ~np.isfinite(out[col])
+            if missing.any():
+                writable()[col][missing] = out[ref][missing]
+        if ref == "close":
+            o, h, l, c = (out[col] for col in prices)
+            top, bottom = np.maximum(o, c), np.minimum(o, c)
+            bracket = (h < top) | (l > bottom)
+            if bracket.any():
+                issues[bracket] |= BIT["ohlc"]
+                w = writable()
+                w["high"] = np.maximum(w["high"], top)
+                w["low"] = np.minimum(w["low"], bottom)
+
+        # Value checks
+        for col in prices:
+            v = out[col]
+            finite = np.isfinite(v)
+            issues[~finite] |= BIT["non_finite"]
+            issues[finite & (v <= 0)] |= BIT["non_positive"]
+        issues[out[size] < 0] |= BIT["negative_size"]
+
+        # Timestamps: duplicates and backwards moves, within the batch and against earlier batches.
+        # One stable sort by symbol (radix for small ids) gives arrival order per symbol, which is
+        # already (symbol, ts) order unless something ran backwards.
+        order = np.argsort(sym.astype(np.uint16) if len(self.rows) <= 1 << 16 else sym, kind="stable")
+        s, t = sym[order], ts[order]
+        same_symbol = s[1:] == s[:-1]
+        last = self.last_ts[sym]
+        issues[ts < last] |= BIT["out_of_order"]
+        if ref == "close":
+            issues[ts == last] |= BIT["duplicate"]
+        if self.max_skew is not None:
+            issues[ts > time.time_ns() + self.max_skew] |= BIT["future_ts"]
+        if (same_symbol & (t[1:] < t[:-1])).any():
+            # A row ahead of both of its neighbours is the bad timestamp, not the rows after it.
+            prev, nxt = np.empty_like(t), np.empty_like(t)
+            prev[1:], nxt[:-1] = t[:-1], t[1:]
+            head = np.ones(n, dtype=bool)
+            head[1:] = ~same_symbol
+            tail = np.ones(n, dtype=bool)
+            tail[:-1] = ~same_symbol
+            prev[head] = self.last_ts[s[head]]
+            nxt[tail] = np.iinfo(np.int64).max
+            issues[order[(t > nxt) & (prev <= nxt)]] |= BIT["future_ts"]
+            rank = np.unique(ts, return_inverse=True)[1].reshape(-1).astype(np.int64)
+            keyed = s * np.int64(n) + rank[order]
+            outlier = (issues[order] & BIT["future_ts"]) != 0
+            running = np.maximum.accumulate(np.where(outlier, s * np.int64(n), keyed))
+            issues[order[1:][keyed[1:] < running[:-1]]] |= BIT["out_of_order"]
+            order = order[np.argsort(keyed, kind="stable")]
+            s, t = sym[order], ts[order]
+            same_symbol = s[1:] == s[:-1]
+        issues[_duplicates(out, order, same_symbol & (t[1:] == t[:-1]), key)] |= BIT["duplicate"]
+        keep = (issues & QUARANTINE) == 0
+
+        # Jumps and splits against the previous accepted price of the same symbol. A split-like
+        # move is only a split when a corporate action confirms it; until then the suspect and
+        # every later row of the symbol at a split-like distance from the last good price are
+        # quarantined (the loop repeats only if a symbol has more than one suspect level).
+        while True:
+            kept = order[keep[order]]                       # accepted rows, per symbol in time order
+            ksym, kts = sym[kept], ts[kept]
+            raw_log = np.log(out[ref][kept])
+            first = np.ones(len(kept), dtype=bool)
+            first[1:] = ksym[1:] != ksym[:-1]
+            before, before_ts = np.empty_like(raw_log), np.empty_like(kts)
+            before[1:], before_ts[1:] = raw_log[:-1], kts[:-1]
+            before[first] = self.last_log[ksym[first]]
+            before_ts[first] = self.last_ts[ksym[first]]
+            moves = raw_log - before
+            split, exact = self._split_like(moves)
+            suspect = split.copy()
+            if split.any():
+                idx = np.flatnonzero(split)
+                suspect[idx] = ~self._confirmed(ksym[idx], before_ts[idx], kts[idx], exact[idx])
+            if not suspect.any():
+                break
+            group = np.cumsum(first) - 1
+            suspects = np.flatnonzero(suspect)
+            groups, at = np.unique(group[suspects], return_index=True)
+            anchor = np.full(group[-1] + 1, np.nan)
+            since = np.full(group[-1] + 1, len(kept))
+            anchor[groups], since[groups] = before[suspects[at]], suspects[at]
+            held = (np.arange(len(kept)) >= since[group]) & self._split_like(raw_log - anchor[group])[0]
+            issues[kept[held]] |= BIT["suspected_split"]
+            keep[kept[held]] = False
+
+        with np.errstate(invalid="ignore"):
+            issues[kept[(np.abs(moves) > self.max_move) & ~split]] |= BIT["jump"]
+        issues[kept[split]] |= BIT["split"]
+
+        if len(kept):
+            # Split adjustment: cumulative per symbol on top of the carried factor
+            log_factor = self.log_adjust[ksym]
+            if split.any() and self.repair_splits:
+                increment = np.where(split, -exact, 0.0)
+                total = np.cumsum(increment)
+                starts = np.flatnonzero(first)
+                total -= np.repeat(total[starts] - increment[starts], np.diff(np.append(starts, len(kept))))
+                log_factor = log_factor + total
+            scale = log_factor != 0
+            if scale.any():
+                rows, factor = kept[scale], np.exp(log_factor[scale])
+                w = writable()
+                for col in prices:
+                    w[col][rows] *= factor
+                w[size][rows] /= factor
+            # Per-symbol state: the last row of each symbol wins
+            self.log_adjust[ksym] = log_factor
+            self.last_log[ksym] = raw_log
+            self.last_ts[ksym] = kts
+
+        # Counters
+        self.rows += np.bincount(sym, minlength=len(self.rows))
+        flagged = np.flatnonzero(issues)
+        if len(flagged):
+            fsym, fbits = sym[flagged], issues[flagged]
+            for name in ISSUES:
+                hit = (fbits & BIT[name]) != 0
+                if hit.any():
+                    self.counts[name] += np.bincount(fsym[hit], minlength=len(self.rows))
+        if not keep.all():
+            self._quarantine(batch, order, issues, keep)
+        if split.any():
+            self._record_splits(ksym, kts, exact, split)
+        return out if keep.all() else out[keep]
+
+    def __call__(self, batch, symbols):
+        return self.validate(batch, symbols)
+
+    def _split_like(self, moves):
+        """(mask, exact signed log ratio) of moves beyond `max_move` and near a split ratio."""
+        mask, exact = np.zeros(len(moves), dtype=bool), np.zeros(len(moves))
+        with np.errstate(invalid="ignore"):
+            big = np.flatnonzero(np.abs(moves) > self.max_move)
+        if len(big):
+            ratios = np.log(np.asarray(SPLIT_RATIOS, dtype=np.float64))
+            dist = np.abs(np.abs(moves[big])[:, None] - ratios)
+            nearest = dist.argmin(axis=1)
+            hit = dist[np.arange(len(big)), nearest] <= self.split_tolerance
+            mask[big[hit]] = True
+            exact[big[hit]] = np.sign(moves[big[hit]]) * ratios[nearest[hit]]
+        return mask, exact
+
+    def _confirmed(self, sids, prev_ts, ts, exact):
+        """Whether a corporate action of the symbol between the two timestamps matches each move."""
+        out = np.zeros(len(sids), dtype=bool)
+        for i, (sid, lo, hi, move) in enumerate(zip(sids.tolist(), prev_ts.tolist(), ts.tolist(), exact.tolist())):
+            out[i] = any(lo < at <= hi and abs(np.log(ratio) + move) <= self.split_tolerance
+                         for at, ratio in self.actions.get(self.names[sid], ()))
+        return out
+
+    def add_split(self, symbol, ts, ratio):
+        """Confirm a split effective at `ts` (ns); `ratio` 2 for 2-for-1, 0.1 for a 1-for-10 reverse split."""
+        self.actions.setdefault(symbol, []).append((int(ts), float(ratio)))
+
+    def _quarantine(self, batch, order, issues, keep):
+        bad, ts = ~keep, batch["ts"]
+        if self.quarantine_dir:
+            os.makedirs(self.quarantine_dir, exist_ok=True)
+            rows = batch[bad]
+            dump = np.empty(len(rows), dtype=batch.dtype.descr + [("issues", "<u2")])
+            for name in batch.dtype.names:
+                dump[name] = rows[name]
+            dump["issues"] = issues[bad]
+            self._seq += 1
+            np.save(os.path.join(self.quarantine_dir, f"q-{int(ts[bad].min())}-{os.getpid()}-{self._seq}.npy"), dump)
+
+        # Runs of consecutive quarantined rows per symbol in time order are one range each.
+        q, s = bad[order], batch["symbol"][order].astype(np.intp)
+        edge = np.ones(len(q) + 1, dtype=bool)
+        edge[1:-1] = (q[1:] != q[:-1]) | (s[1:] != s[:-1])
+        bounds = np.flatnonzero(edge)
+        starts, ends = bounds[:-1], bounds[1:] - 1
+        runs = q[starts]
+        starts, ends = starts[runs], ends[runs]
+        masks = np.bitwise_or.reduceat(issues[order], bounds[:-1])[runs]
+        self._record(s[starts], ts[order][starts], ts[order][ends], masks)
+
+    def _record_splits(self, ksym, kts, exact, split):
+        idx = np.flatnonzero(split)
+        for i in idx:
+            name = self.names[ksym[i]]
+            self.splits.setdefault(name, []).append([int(kts[i]), round(float(np.exp(-exact[i])), 4)])
+        # Everything of the symbol from the split on was rescaled.
+        end = np.full(len(self.names), _NO_TS)
+        np.maximum.at(end, ksym, kts)
+        self._record(ksym[idx], kts[idx], end[ksym[idx]], np.full(len(idx), BIT["split"]))
+
+    def _record(self, sids, starts, ends, masks):
+        self.generation += 1
+        affected = {}
+        for sid, start, end, mask in zip(sids.tolist(), starts.tolist(), ends.tolist(), masks.tolist()):
+            name = self.names[sid]
+            if mask & QUARANTINE:
+                _merge_range(self.quarantined.setdefault(name, []), start, end, mask, self.max_ranges)
+            self._changes.append([self.generation, name, start, end, mask])
+            lo, hi = affected.get(name, (start, end))
+            affected[name] = (min(lo, start), max(hi, end))
+        del self._changes[:-self.max_changes]
+        for callback in self.listeners:
+            callback(affected)
+
+
+def changes(entries, since=0):
+    """Merge change entries ([generation, symbol, start, end, mask]) newer than `since` per symbol."""
+    out = {}
+    for generation, name, start, end, _ in entries:
+        if generation <= since:
+            continue
+        lo, hi = out.get(name, (start, end))
+        out[name] = (min(lo, start), max(hi, end))
+    return out
+
+
+def load_changes(path=None, since=0):
+    """(generation, changes since `since`) from a state file written by `Validator.save`."""
+    path = path or os.path.join(VALIDATION_DIR, "state.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return since, {}
+    return state["generation"], changes(state["changes"], since)
+
+
+def cache_listener(cache, prefix="symbol:"):
+    """Listener invalidating only the `<prefix><symbol>` tags of a backend ResponseCache."""
+    def invalidate(affected):
+        if affected:
+            cache.invalidate(*(f"{prefix}{name}" for name in affected))
+    return invalidate
@@ -0,0 +1,42 @@
+"""
+Deferred imports for heavy dependencies.
+
+    openai = lazy_import("openai")   # found, but not executed yet (None if missing)
+    openai.ChatCompletion            # the real import happens here
+
+Used by the war-game scripts, the backend and ai_modules so that starting a
+CLI or forking a worker doesn't pay for libraries the run never touches.
+"""
+
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Return `name` as a module that executes on first attribute access.
+
+    Returns None when the module is not installed, matching the
+    `try: import x / except ImportError: x = None` idiom it replaces.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or spec.loader is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name):
+    """True once `name` has actually been executed (not just lazily registered)."""
+    module = sys.modules.get(name)
+    # Checked via type() because any attribute access would trigger the load.
+    return module is not None and not issubclass(type(module), importlib.util._LazyModule)
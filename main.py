@@ -1,11 +1,90 @@
-﻿from fastapi import FastAPI
+﻿import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
 
-app = FastAPI()
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+
+from backend import dataplane, diagnostics, resources
+from backend.admin import require_admin
+from backend.cache import CacheMiddleware, cached, response_cache
+from backend.serialization import negotiated, read_mapping
+from backend.static import SiteFiles
+from tracing import TracingMiddleware, span
+
+WORKER = {'pid': os.getpid(), 'started_at': None}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # No-op under gunicorn_conf.py: the master already loaded everything
+    # before forking, so workers reuse those pages copy-on-write.
+    resources.preload()
+    WORKER.update(pid=os.getpid(), started_at=time.time())
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(CacheMiddleware, cache=response_cache)
+# Outermost, so cache hits are traced too (FINSIGHT_TRACE_SAMPLE > 0 enables it).
+app.add_middleware(TracingMiddleware)
+# Sizes reported by GET /admin/memory (served only with FINSIGHT_MEMDIAG=1).
+diagnostics.register_cache('response_cache', response_cache)
+diagnostics.register_cache('resources', lambda: {name: {'bytes': diagnostics.nbytes(value)}
+                                                 for name, value in resources.RESOURCES.items()})
+# Generated landing pages and index (`wargame pages`), precompressed and range-capable.
+# Only files in the site build manifest are served, not the rest of the output dir.
+app.mount('/site', SiteFiles(directory=os.getenv('FINSIGHT_SITE_DIR', 'output_plan')), name='site')
 
 @app.get('/')
+@cached(ttl=5, tags=('status',))
 def read_root():
     return {'status': 'White-Label AI Backend Running'}
 
+@app.get('/health')
+def health():
+    return {
+        'status': 'ok',
+        'worker_pid': WORKER['pid'],
+        'master_pid': os.getppid(),
+        'uptime_s': time.time() - WORKER['started_at'] if WORKER['started_at'] else None,
+        'resources': resources.status(),
+    }
+
+@app.get('/dataplane')
+def dataplane_catalog():
+    # Same-host clients map these files directly (backend.dataplane.DataPlaneReader).
+    return {'root': dataplane.DATAPLANE_DIR, 'datasets': dataplane.catalog()}
+
+@app.post('/admin/cache/invalidate', dependencies=[Depends(require_admin)])
+def invalidate_cache(tags: Optional[List[str]] = Query(None)):
+    # Generations are shared (backend.cache.GENERATIONS_FILE), so every worker sees this.
+    response_cache.invalidate(*(tags or ()))
+    return {'invalidated': tags or ['*'], 'cache': response_cache.info()}
+
+def require_memdiag():
+    # The memory endpoints do not exist unless FINSIGHT_MEMDIAG is set.
+    if not diagnostics.ENABLED:
+        raise HTTPException(404)
+
+@app.get('/admin/memory', dependencies=[Depends(require_memdiag), Depends(require_admin)])
+def memory_report(group: str = 'module', limit: int = 20, diff: bool = False, objects: bool = False):
+    # Per worker: the pid in the response says which one answered.
+    return diagnostics.report(group, limit, diff, objects)
+
+@app.post('/admin/memory/baseline', dependencies=[Depends(require_memdiag), Depends(require_admin)])
+def memory_baseline():
+    return {'pid': os.getpid(), 'baseline': diagnostics.baseline()}
+
 @app.post('/run')
-def run_model():
-    return {'result': 'AI model executed successfully'}
+async def run_model(request: Request):
+    # Inputs/outputs may carry numpy arrays; the client picks JSON, msgpack or
+    # Arrow IPC via Content-Type / Accept (see backend/serialization.py).
+    with span('run.decode', content_type=request.headers.get('content-type', '')):
+        inputs = await read_mapping(request)
+    with span('run.execute'):
+        result = {'result': 'AI model executed successfully'}
+        if inputs:
+            result['inputs'] = {k: list(getattr(v, 'shape', ())) for k, v in inputs.items()}
+    with span('run.encode'):
+        return negotiated(request, result)
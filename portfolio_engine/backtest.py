@@ -0,0 +1,217 @@
+"""
+Walk-forward backtesting engine for portfolio_engine strategies.
+
+Runs strategy x parameter-grid x time-window combinations on a process pool.
+The price matrix is copied into shared memory once and every worker attaches
+to it by name, so tasks only carry a strategy name, a parameter dict and the
+window list. Parameter sets that are clearly losing stop walking forward early.
+
+Usage:
+    with WalkForwardBacktester(prices, walk_forward_windows(len(prices), 756, 126)) as bt:
+        report = bt.run({"momentum": {"lookback": [20, 60, 120], "top_frac": [0.1, 0.2]}})
+    print(report.walk_forward())
+"""
+
+import itertools
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import tracing
+
+from .strategies import STRATEGIES
+
+TRADING_DAYS = 252
+
+Window = namedtuple("Window", ["train_start", "train_end", "test_end"])
+
+
+# --- Grid / window construction ---
+def walk_forward_windows(n_obs, train, test, step=None):
+    """Rolling (train, test) windows over `n_obs` rows; `step` defaults to `test`."""
+    step = step or test
+    windows = []
+    start = 0
+    while start + train + test <= n_obs:
+        windows.append(Window(start, start + train, start + train + test))
+        start += step
+    return windows
+
+
+def param_grid(grid):
+    """Expand {"a": [1, 2], "b": [3]} into [{"a": 1, "b": 3}, {"a": 2, "b": 3}]."""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def metrics(pnl):
+    """Annualized Sharpe, total return and max drawdown of a daily P&L series."""
+    if pnl.size == 0:
+        return {"sharpe": 0.0, "total_return": 0.0, "max_drawdown": 0.0}
+    std = pnl.std()
+    sharpe = float(pnl.mean() / std * np.sqrt(TRADING_DAYS)) if std > 0 else 0.0
+    equity = np.cumprod(1.0 + pnl)
+    drawdown = 1.0 - equity / np.maximum.accumulate(equity)
+    return {
+        "sharpe": sharpe,
+        "total_return": float(equity[-1] - 1.0),
+        "max_drawdown": float(drawdown.max()),
+    }
+
+
+# --- Shared price matrix ---
+class SharedPrices:
+    """Owns a shared-memory copy of a price matrix for the lifetime of a run."""
+
+    def __init__(self, prices):
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(prices.nbytes, 1))
+        np.ndarray(prices.shape, prices.dtype, buffer=self._shm.buf)[:] = prices
+        self.spec = (self._shm.name, prices.shape, prices.dtype.str)
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+_worker_shm = None
+_worker_prices = None
+
+
+def _attach(spec):
+    global _worker_shm, _worker_prices
+    name, shape, dtype = spec
+    # Pool workers share the parent's resource tracker, so attaching here does
+    # not hand ownership over; the parent still unlinks the segment on close().
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_prices = np.ndarray(shape, np.dtype(dtype), buffer=_worker_shm.buf)
+    _worker_prices.flags.writeable = False
+
+
+# --- Evaluation ---
+@dataclass
+class EarlyStop:
+    """Stop a parameter set once it is clearly losing.
+
+    After `min_windows` windows, a configuration is dropped if its mean
+    in-sample Sharpe is below `min_sharpe` or any in-sample drawdown exceeded
+    `max_drawdown`.
+    """
+    min_windows: int = 3
+    min_sharpe: float = -0.5
+    max_drawdown: float = 0.6
+
+    def should_stop(self, window_results):
+        if len(window_results) < self.min_windows:
+            return False
+        in_sample = [w["in_sample"] for w in window_results]
+        mean_sharpe = sum(m["sharpe"] for m in in_sample) / len(in_sample)
+        worst_dd = max(m["max_drawdown"] for m in in_sample)
+        return mean_sharpe < self.min_sharpe or worst_dd > self.max_drawdown
+
+
+@dataclass
+class ConfigResult:
+    strategy: str
+    params: dict
+    windows: list = field(default_factory=list)
+    stopped_early: bool = False
+
+
+@tracing.traced()
+def evaluate_config(prices, strategy, params, windows, early_stop=None):
+    """Walk one (strategy, params) pair forward over `windows`."""
+    signal, warmup = STRATEGIES[strategy]
+    lookback = int(warmup(params))
+    result = ConfigResult(strategy, dict(params))
+    for idx, w in enumerate(windows):
+        start = max(0, w.train_start - lookback)
+        block = prices[start:w.test_end]
+        weights = signal(block, **params)
+        returns = block[1:] / block[:-1] - 1.0
+        pnl = np.einsum("ij,ij->i", np.nan_to_num(weights[:-1]), np.nan_to_num(returns))
+        # pnl[k] is realised on row start + k + 1
+        split = w.train_end - start - 1
+        first = w.train_start - start
+        result.windows.append({
+            "window": idx,
+            "in_sample": metrics(pnl[first:split]),
+            "out_of_sample": metrics(pnl[split:]),
+        })
+        if early_stop is not None and early_stop.should_stop(result.windows):
+            result.stopped_early = idx < len(windows) - 1
+            break
+    return result
+
+
+def _run_task(task):
+    strategy, params, windows, early_stop = task
+    return evaluate_config(_worker_prices, strategy, params, windows, early_stop)
+
+
+# --- Engine ---
+@dataclass
+class BacktestReport:
+    windows: list
+    results: list
+
+    def walk_forward(self):
+        """Per strategy: choose the best in-sample params per window, score them out of sample."""
+        summary = {}
+        for strategy in sorted({r.strategy for r in self.results}):
+            chosen = []
+            for idx in range(len(self.windows)):
+                candidates = [
+                    (r.windows[idx], r.params) for r in self.results
+                    if r.strategy == strategy and len(r.windows) > idx
+                ]
+                if not candidates:
+                    continue
+                best, params = max(candidates, key=lambda c: c[0]["in_sample"]["sharpe"])
+                chosen.append({"window": idx, "params": params, **best["out_of_sample"]})
+            oos = [c["sharpe"] for c in chosen]
+            summary[strategy] = {
+                "windows": chosen,
+                "mean_oos_sharpe": float(np.mean(oos)) if oos else 0.0,
+                "stopped_early": sum(r.stopped_early for r in self.results if r.strategy == strategy),
+            }
+        return summary
+
+
+class WalkForwardBacktester:
+    def __init__(self, prices, windows, workers=None, early_stop=None):
+        """`early_stop` defaults to a fresh EarlyStop(); pass False to evaluate every window."""
+        self.windows = list(windows)
+        self.workers = workers or os.cpu_count() or 1
+        self.early_stop = EarlyStop() if early_stop is None else early_stop or None
+        self._prices = SharedPrices(prices)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._prices.close()
+
+    @tracing.traced()
+    def run(self, grids):
+        """`grids` maps strategy name -> {param: [values]}."""
+        tasks = [
+            (strategy, params, self.windows, self.early_stop)
+            for strategy, grid in grids.items()
+            for params in param_grid(grid)
+        ]
+        if not tasks:
+            return BacktestReport(self.windows, [])
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        with ProcessPoolExecutor(self.workers, initializer=_attach, initargs=(self._prices.spec,)) as pool:
+            results = list(pool.map(tracing.propagate(_run_task), tasks, chunksize=chunksize))
+        return BacktestReport(self.windows, results)
@@ -0,0 +1,234 @@
+"""
+Cross-sectional factor risk model for portfolio_engine.
+
+For every date t the asset returns are regressed on the exposures,
+
+    r_t = X_t f_t + e_t        (weighted least squares, weights w_t)
+
+giving factor returns f_t and specific returns e_t. The regressions for all
+dates run as batched matrix products and one batched solve per block of
+dates, never a Python loop per date. From them:
+
+* factor covariance F: exponentially weighted with `factor_half_life`,
+* specific variance D: exponentially weighted squared residuals per asset
+  with `specific_half_life`, shrunk towards the cross-sectional mean,
+
+so that the asset covariance is  X F X' + diag(D). Both estimators keep their
+decayed sums, so a new day is folded in with `update()` in O(K^2 + N K^2)
+instead of refitting the history.
+
+Usage:
+    model = FactorRiskModel(factor_half_life=90).fit(returns, exposures, weights=np.sqrt(mcap))
+    risk = model.risk_model()                     # RiskModel, ready for optimizer.min_variance
+    model.update(returns_today, exposures_today)  # incremental
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from tracing import traced
+
+# Elements of the (dates, assets, factors) block materialized at a time.
+BLOCK_ELEMENTS = 8_000_000
+
+
+def _decay(half_life):
+    return 0.5 ** (1.0 / half_life)
+
+
+# --- Regressions ---
+def _solve_normal_equations(xtwx, xtwr, ridge):
+    """Batched ridge-stabilized solve of (B, K, K) @ f = (B, K)."""
+    n_factors = xtwx.shape[-1]
+    scale = np.trace(xtwx, axis1=1, axis2=2) / n_factors
+    xtwx = xtwx + (ridge * np.maximum(scale, 1e-12))[:, None, None] * np.eye(n_factors)
+    return np.linalg.solve(xtwx, xtwr[..., None])[..., 0]
+
+
+@traced()
+def cross_sectional_regression(returns, exposures, weights=None, ridge=1e-8):
+    """Factor returns (T, K) and specific returns (T, N) for every date at once.
+
+    `returns` is (T, N) with NaN for missing observations; `exposures` is
+    (T, N, K), or (N, K) when constant. Assets with a NaN return or exposure
+    get zero weight on that date and a NaN residual. `ridge` (relative to the
+    mean diagonal) keeps collinear sets, e.g. industries plus a market
+    factor, solvable.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    n_dates, n_assets = returns.shape
+    exposures = np.asarray(exposures)  # a (T, N, K) float32/memmap history is upcast per block
+    n_factors = exposures.shape[-1]
+    if weights is None:
+        weights = np.ones_like(returns)
+    else:
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), returns.shape)
+
+    if exposures.ndim == 2:
+        # Constant exposures: X' W_t X for all dates is one GEMM of the
+        # weights against the per-asset outer products x_i x_i'.
+        valid = ~np.isnan(returns) & ~np.isnan(exposures).any(axis=1)
+        x = np.nan_to_num(exposures.astype(np.float64))
+        w = np.where(valid, np.nan_to_num(weights), 0.0)
+        outer = (x[:, :, None] * x[:, None, :]).reshape(n_assets, n_factors * n_factors)
+        xtwx = (w @ outer).reshape(n_dates, n_factors, n_factors)
+        xtwr = (w * np.where(valid, returns, 0.0)) @ x
+        factor_returns = _solve_normal_equations(xtwx, xtwr, ridge)
+        fitted = factor_returns @ x.T
+    else:
+        factor_returns = np.empty((n_dates, n_factors))
+        fitted = np.empty_like(returns)
+        valid = np.empty(returns.shape, dtype=bool)
+        block = max(1, BLOCK_ELEMENTS // (n_assets * n_factors))
+        for start in range(0, n_dates, block):
+            stop = min(start + block, n_dates)
+            x = exposures[start:stop].astype(np.float64)  # a private copy, zeroed in place
+            missing = np.isnan(x)
+            ok = ~np.isnan(returns[start:stop]) & ~missing.any(axis=-1)
+            x[missing] = 0.0
+            xw_t = (x * np.where(ok, np.nan_to_num(weights[start:stop]), 0.0)[..., None]).transpose(0, 2, 1)
+            xtwx = np.matmul(xw_t, x)                                                    # (B, K, K)
+            xtwr = np.matmul(xw_t, np.where(ok, returns[start:stop], 0.0)[..., None])[..., 0]
+            f = _solve_normal_equations(xtwx, xtwr, ridge)
+            factor_returns[start:stop] = f
+            fitted[start:stop] = np.matmul(x, f[..., None])[..., 0]
+            valid[start:stop] = ok
+
+    enough = valid.sum(axis=1) > n_factors
+    factor_returns[~enough] = np.nan
+    residuals = np.where(valid & enough[:, None], returns - fitted, np.nan)
+    return factor_returns, residuals
+
+
+# --- Exponentially weighted estimators ---
+class EWCovariance:
+    """Exponentially weighted (zero-mean) covariance of a K-vector series."""
+
+    def __init__(self, half_life, n):
+        self.decay = _decay(half_life)
+        self.sum = np.zeros((n, n))
+        self.weight = 0.0
+
+    def fit(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        x = x[~np.isnan(x).any(axis=1)]
+        w = self.decay ** np.arange(len(x) - 1, -1, -1)
+        self.sum = (x * w[:, None]).T @ x
+        self.weight = float(w.sum())
+        return self
+
+    def update(self, x_t):
+        x_t = np.asarray(x_t, dtype=np.float64)
+        if np.isnan(x_t).any():
+            return self
+        self.sum *= self.decay
+        self.sum += np.outer(x_t, x_t)
+        self.weight = self.weight * self.decay + 1.0
+        return self
+
+    @property
+    def cov(self):
+        return self.sum / self.weight if self.weight > 0 else np.full_like(self.sum, np.nan)
+
+
+class EWSpecificVariance:
+    """Per-asset exponentially weighted mean of squared residuals (NaN = no observation).
+
+    Assets with less than `min_weight` effective observations fall back to the
+    cross-sectional median; all are shrunk towards the cross-sectional mean by
+    `shrinkage`.
+    """
+
+    def __init__(self, half_life, n, shrinkage=0.1, min_weight=5.0):
+        self.decay = _decay(half_life)
+        self.shrinkage = shrinkage
+        self.min_weight = min_weight
+        self.sum = np.zeros(n)
+        self.weight = np.zeros(n)
+
+    def fit(self, resid):
+        resid = np.asarray(resid, dtype=np.float64)
+        obs = ~np.isnan(resid)
+        w = self.decay ** np.arange(len(resid) - 1, -1, -1)
+        self.sum = w @ np.where(obs, resid, 0.0) ** 2
+        self.weight = w @ obs
+        return self
+
+    def update(self, e_t):
+        e_t = np.asarray(e_t, dtype=np.float64)
+        obs = ~np.isnan(e_t)
+        self.sum = self.sum * self.decay + np.where(obs, e_t, 0.0) ** 2
+        self.weight = self.weight * self.decay + obs
+        return self
+
+    @property
+    def var(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            raw = self.sum / self.weight
+        reliable = self.weight >= self.min_weight
+        if not reliable.any():
+            return np.full_like(raw, np.nan)
+        raw = np.where(reliable, raw, np.median(raw[reliable]))
+        return (1.0 - self.shrinkage) * raw + self.shrinkage * raw.mean()
+
+
+# --- Model ---
+@dataclass
+class RiskModel:
+    """Asset covariance in factor form: exposures @ factor_cov @ exposures.T + diag(specific_var)."""
+    exposures: np.ndarray      # (N, K)
+    factor_cov: np.ndarray     # (K, K)
+    specific_var: np.ndarray   # (N,)
+
+    def covariance(self):
+        """Dense (N, N) covariance; prefer `variance` / the optimizer for large N."""
+        x = self.exposures
+        cov = x @ self.factor_cov @ x.T
+        cov[np.diag_indices_from(cov)] += self.specific_var
+        return cov
+
+    def variance(self, weights):
+        """Portfolio variance of `weights` (N,) or (P, N) without forming the N x N matrix."""
+        weights = np.asarray(weights, dtype=np.float64)
+        factor = weights @ self.exposures
+        return np.einsum("...k,kl,...l->...", factor, self.factor_cov, factor) + (weights ** 2) @ self.specific_var
+
+
+class FactorRiskModel:
+    def __init__(self, factor_half_life=90, specific_half_life=45, shrinkage=0.1, ridge=1e-8):
+        self.factor_half_life = factor_half_life
+        self.specific_half_life = specific_half_life
+        self.shrinkage = shrinkage
+        self.ridge = ridge
+        self.factor_returns = None
+        self.specific_returns = None
+        self._factor_cov = None
+        self._specific = None
+        self._exposures = None
+
+    @traced()
+    def fit(self, returns, exposures, weights=None):
+        """Run every date's regression in one batch and build both estimators."""
+        exposures = np.asarray(exposures)
+        f, e = cross_sectional_regression(returns, exposures, weights, self.ridge)
+        self.factor_returns, self.specific_returns = f, e
+        self._factor_cov = EWCovariance(self.factor_half_life, f.shape[1]).fit(f)
+        self._specific = EWSpecificVariance(self.specific_half_life, e.shape[1], self.shrinkage).fit(e)
+        self._exposures = np.asarray(exposures if exposures.ndim == 2 else exposures[-1], dtype=np.float64)
+        return self
+
+    @traced()
+    def update(self, returns_t, exposures_t, weights_t=None):
+        """Fold in one new date; returns its (factor returns, specific returns)."""
+        exposures_t = np.asarray(exposures_t, dtype=np.float64)
+        weights = None if weights_t is None else np.asarray(weights_t, dtype=np.float64)[None]
+        f, e = cross_sectional_regression(np.asarray(returns_t, dtype=np.float64)[None], exposures_t[None],
+                                          weights, self.ridge)
+        self._factor_cov.update(f[0])
+        self._specific.update(e[0])
+        self._exposures = exposures_t
+        return f[0], e[0]
+
+    def risk_model(self):
+        return RiskModel(self._exposures, self._factor_cov.cov, self._specific.var)
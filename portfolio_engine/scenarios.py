@@ -0,0 +1,335 @@
+"""
+Memoized what-if scenarios across FX, country risk and the factor model.
+
+A scenario is a set of primitive shocks, e.g.
+
+    scenario = parse("EUR -5%, downgrade IT 2, factor momentum -1%")
+    engine = ScenarioEngine(market)
+    engine.pnl(scenario)              # P&L of market.positions, total and per asset
+    engine.sweep(FxShock("EUR", 0), np.linspace(-0.1, 0.1, 41))
+
+Every primitive maps to a unit response that is computed once per data
+version and then only scaled:
+
+* FxShock(currency, pct): log FX moves of every currency against the base,
+  propagated from the shocked one through the FX covariance (conditional
+  expectation), so "EUR -5%" also moves CHF and the Nordics;
+* CountryDowngrade(country, notches): spread widening on assets exposed to
+  the country (exposure x spread duration x bp per notch), plus an optional
+  move of its currency;
+* FactorShock(factor, size): factor returns conditional on the shocked
+  factor under the factor covariance of a RiskModel, times the exposures.
+
+Combined scenarios add the scaled responses (local returns and log FX moves
+separately) and compound them per asset, so "EUR -5% + IT downgrade" is two
+cached lookups and a few vector operations. Components and scenario returns
+live in an LRU keyed by the market data version; `update()` with new data
+changes the version, and stale entries are never served and age out.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from tracing import traced
+
+
+# --- Shocks ---
+@dataclass(frozen=True)
+class FxShock:
+    currency: str
+    pct: float          # -0.05: the currency loses 5% against the base currency
+
+    def __post_init__(self):
+        if not self.pct > -1:
+            raise ValueError(f"FX move for {self.currency} must be above -100%, not {self.pct!r}")
+
+    @property
+    def unit(self):
+        return ("fx", self.currency)
+
+    @property
+    def size(self):
+        return float(np.log1p(self.pct))
+
+
+@dataclass(frozen=True)
+class CountryDowngrade:
+    country: str
+    notches: float = 1.0
+
+    @property
+    def unit(self):
+        return ("geo", self.country)
+
+    @property
+    def size(self):
+        return float(self.notches)
+
+
+@dataclass(frozen=True)
+class FactorShock:
+    factor: str
+    size: float         # factor return, e.g. -0.01
+
+    @property
+    def unit(self):
+        return ("factor", self.factor)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A canonical set of shocks: the same unit shocked twice is combined."""
+    shocks: tuple = ()
+
+    @classmethod
+    def of(cls, *shocks):
+        merged = {}
+        for shock in shocks:
+            merged.setdefault(shock.unit, []).append(shock)
+        return cls(tuple(sorted((_merge(group) for group in merged.values()), key=lambda s: s.unit)))
+
+    def __add__(self, other):
+        return Scenario.of(*self.shocks, *other.shocks)
+
+    def __str__(self):
+        return ", ".join(_describe(s) for s in self.shocks) or "base"
+
+
+def _merge(group):
+    first = group[0]
+    if len(group) == 1:
+        return first
+    if isinstance(first, FxShock):
+        return FxShock(first.currency, float(np.expm1(sum(s.size for s in group))))
+    if isinstance(first, CountryDowngrade):
+        return CountryDowngrade(first.country, sum(s.notches for s in group))
+    return FactorShock(first.factor, sum(s.size for s in group))
+
+
+def _describe(shock):
+    if isinstance(shock, FxShock):
+        return f"{shock.currency} {shock.pct:+.2%}"
+    if isinstance(shock, CountryDowngrade):
+        return f"downgrade {shock.country} {shock.notches:g}"
+    return f"factor {shock.factor} {shock.size:+.2%}"
+
+
+_FX = re.compile(r"^([A-Za-z]{3})\s*([+-]?\d+(?:\.\d+)?)(%?)$")
+_DOWNGRADE = re.compile(r"^downgrade\s+(\S+)(?:\s+(\d+(?:\.\d+)?))?$", re.I)
+_FACTOR = re.compile(r"^factor\s+(\S+)\s+([+-]?\d+(?:\.\d+)?)(%?)$", re.I)
+
+
+def _number(value, pct):
+    return float(value) / 100 if pct else float(value)
+
+
+def parse(text):
+    """Scenario from "EUR -5%, downgrade IT 2, factor value +1%" (comma, ';' or ' + ' separated).
+
+    FX moves must carry a % sign ("EUR -5" is rejected, not read as -500%);
+    factor sizes may be bare fractions ("factor value 0.01").
+    """
+    shocks = []
+    for part in re.split(r"[,;]|\s\+\s", text):
+        part = part.strip()
+        if not part:
+            continue
+        if m := _FX.match(part):
+            if not m.group(3):
+                raise ValueError(f"Write the FX move in {part!r} as a percentage, e.g. '{m.group(1)} {m.group(2)}%'")
+            shocks.append(FxShock(m.group(1).upper(), _number(m.group(2), m.group(3))))
+        elif m := _DOWNGRADE.match(part):
+            shocks.append(CountryDowngrade(m.group(1), float(m.group(2) or 1)))
+        elif m := _FACTOR.match(part):
+            shocks.append(FactorShock(m.group(1), _number(m.group(2), m.group(3))))
+        else:
+            raise ValueError(f"Cannot parse shock {part!r}")
+    return Scenario.of(*shocks)
+
+
+# --- Market data ---
+@dataclass
+class MarketData:
+    """Everything a scenario needs about the book; `version` keys the caches."""
+    assets: list
+    positions: np.ndarray                       # (N,) market value in the base currency
+    currencies: list                            # currency codes, base currency included
+    asset_currency: np.ndarray                  # (N,) index into `currencies`
+    base: str = "USD"
+    fx_cov: np.ndarray = None                   # (C, C) covariance of log FX moves vs base
+    countries: list = field(default_factory=list)
+    country_exposure: np.ndarray = None         # (N, G) share of each asset's risk in each country
+    spread_duration: np.ndarray = None          # (N,) price sensitivity to its spread, in years
+    downgrade_bp: np.ndarray = None             # (G,) spread widening per notch, in basis points
+    downgrade_fx: np.ndarray = None             # (G,) log move of the country's currency per notch
+    country_currency: list = None               # (G,) currency code of each country
+    risk: object = None                         # factor_model.RiskModel for FactorShock
+    factors: list = None                        # factor names, columns of risk.exposures
+    version: str = None
+
+    def __post_init__(self):
+        self.positions = np.asarray(self.positions, dtype=np.float64)
+        self.asset_currency = np.asarray(self.asset_currency, dtype=np.intp)
+        if self.version is None:
+            self.version = self.fingerprint()
+
+    def fingerprint(self):
+        """Content hash of every array and list, used when no explicit version is given."""
+        digest = hashlib.blake2b(digest_size=12)
+        for value in self.__dict__.values():
+            if isinstance(value, np.ndarray):
+                digest.update(np.ascontiguousarray(value).tobytes())
+            elif hasattr(value, "__dataclass_fields__"):  # RiskModel
+                for arr in value.__dict__.values():
+                    digest.update(np.ascontiguousarray(arr).tobytes())
+            else:
+                digest.update(repr(value).encode())
+        return digest.hexdigest()
+
+
+# --- Cache ---
+class ScenarioCache:
+    """Thread-safe LRU of computed components, keyed by (data version, ...)."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False       # shared by every caller
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
+
+    def prune(self, keep_version):
+        """Drop entries of every other data version now instead of waiting for eviction."""
+        with self._lock:
+            for key in [k for k in self._data if k[0] != keep_version]:
+                del self._data[key]
+
+    def info(self):
+        with self._lock:
+            return {"entries": len(self._data), "max_entries": self.max_entries, "hits": self.hits,
+                    "misses": self.misses,
+                    "nbytes": sum(v.nbytes for v in self._data.values() if isinstance(v, np.ndarray))}
+
+
+# --- Engine ---
+class ScenarioEngine:
+    def __init__(self, market, cache=None):
+        self.market = market
+        self.cache = cache if cache is not None else ScenarioCache()
+
+    def update(self, market, prune=True):
+        """Swap in new market data; cached results of the old version are no longer used."""
+        self.market = market
+        if prune:
+            self.cache.prune(market.version)
+
+    # --- Unit responses: (local asset returns (N,), log FX moves (C,)) per unit of shock ---
+    def response(self, unit):
+        m = self.market
+        return self.cache.get((m.version, "unit") + unit, lambda: self._response(m, unit))
+
+    @staticmethod
+    def _response(m, unit):
+        kind, name = unit
+        n, c = len(m.assets), len(m.currencies)
+        local, fx = np.zeros(n), np.zeros(c)
+        if kind == "fx":
+            k = m.currencies.index(name)
+            if name == m.base:
+                raise ValueError(f"Cannot shock the base currency {name}; shock the others instead")
+            if m.fx_cov is not None and m.fx_cov[k, k] > 0:
+                fx = np.asarray(m.fx_cov[:, k], dtype=np.float64) / m.fx_cov[k, k]
+            else:
+                fx[k] = 1.0
+            fx[m.currencies.index(m.base)] = 0.0
+        elif kind == "geo":
+            g = m.countries.index(name)
+            bp = 0.0 if m.downgrade_bp is None else m.downgrade_bp[g]
+            duration = np.zeros(n) if m.spread_duration is None else m.spread_duration
+            local = -m.country_exposure[:, g] * duration * bp * 1e-4
+            if m.downgrade_fx is not None and m.country_currency is not None:
+                currency = m.country_currency[g]
+                if currency in m.currencies and currency != m.base:
+                    fx[m.currencies.index(currency)] = m.downgrade_fx[g]
+        elif kind == "factor":
+            if m.risk is None:
+                raise ValueError("FactorShock needs MarketData.risk (a factor_model.RiskModel)")
+            k = m.factors.index(name)
+            cov = m.risk.factor_cov
+            local = m.risk.exposures @ (cov[:, k] / cov[k, k])
+        else:
+            raise ValueError(f"Unknown shock kind {kind!r}")
+        return np.concatenate([local, fx])
+
+    def _split(self, combined):
+        n = len(self.market.assets)
+        return combined[..., :n], combined[..., n:]
+
+    def returns(self, scenario):
+        """Per-asset return in the base currency under `scenario` (N,)."""
+        m = self.market
+        if isinstance(scenario, str):
+            scenario = parse(scenario)
+        return self.cache.get((m.version, "returns", scenario.shocks), lambda: self._returns(scenario))
+
+    def _returns(self, scenario):
+        m = self.market
+        total = np.zeros(len(m.assets) + len(m.currencies))
+        for shock in scenario.shocks:
+            total += shock.size * self.response(shock.unit)
+        local, fx = self._split(total)
+        return (1.0 + local) * np.exp(fx[m.asset_currency]) - 1.0
+
+    @traced()
+    def pnl(self, scenario, positions=None):
+        """{"total", "by_asset", "by_currency"} P&L of `positions` (default: the market's book)."""
+        m = self.market
+        positions = m.positions if positions is None else np.asarray(positions, dtype=np.float64)
+        by_asset = positions * self.returns(scenario)
+        by_currency = np.bincount(m.asset_currency, by_asset, minlength=len(m.currencies))
+        return {"total": float(by_asset.sum()), "by_asset": by_asset,
+                "by_currency": dict(zip(m.currencies, by_currency.tolist()))}
+
+    @traced()
+    def sweep(self, shock, sizes, base=None, positions=None):
+        """Total P&L for each value in `sizes` of `shock` (an FxShock pct, notches or factor size),
+        on top of the `base` scenario; one matrix product instead of one scenario per value."""
+        m = self.market
+        sizes = np.asarray(sizes, dtype=np.float64)
+        positions = m.positions if positions is None else np.asarray(positions, dtype=np.float64)
+        unit = self.response(shock.unit)
+        if isinstance(shock, FxShock) and not (sizes > -1).all():
+            raise ValueError("FX moves in `sizes` must be above -100%")
+        scaled = np.log1p(sizes) if isinstance(shock, FxShock) else sizes
+        base_total = np.zeros_like(unit)
+        if base is not None:
+            base = parse(base) if isinstance(base, str) else base
+            for s in base.shocks:
+                base_total += s.size * self.response(s.unit)
+        local, fx = self._split(base_total + scaled[:, None] * unit)           # (S, N), (S, C)
+        returns = (1.0 + local) * np.exp(fx[:, m.asset_currency]) - 1.0
+        return returns @ positions
+
+    def info(self):
+        return {"version": self.market.version, "cache": self.cache.info()}
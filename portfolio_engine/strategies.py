@@ -0,0 +1,63 @@
+"""
+Vectorized trading strategies for portfolio_engine.
+
+Every strategy maps a (T, N) price matrix to a (T, N) weight matrix where row t
+only uses prices up to and including t. The backtester applies the weights of
+day t to the returns of day t + 1, so strategies never see the future.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+Strategy = namedtuple("Strategy", ["signal", "warmup"])
+
+
+# --- Helpers ---
+def _rolling_mean(prices, window):
+    csum = np.cumsum(prices, axis=0)
+    out = np.full_like(prices, np.nan)
+    out[window - 1:] = csum[window - 1:]
+    out[window:] -= csum[:-window]
+    out[window - 1:] /= window
+    return out
+
+
+def _equal_weight(mask):
+    mask = mask.astype(np.float64)
+    counts = mask.sum(axis=1, keepdims=True)
+    np.divide(mask, counts, out=mask, where=counts > 0)
+    return mask
+
+
+# --- Strategies ---
+def momentum(prices, lookback=60, top_frac=0.2):
+    """Equal-weight the top `top_frac` assets by trailing `lookback` return."""
+    trailing = np.full_like(prices, np.nan)
+    trailing[lookback:] = prices[lookback:] / prices[:-lookback] - 1.0
+    n_top = max(1, int(round(prices.shape[1] * top_frac)))
+    ranks = np.argsort(np.argsort(-np.nan_to_num(trailing, nan=-np.inf), axis=1), axis=1)
+    mask = (ranks < n_top) & ~np.isnan(trailing)
+    return _equal_weight(mask)
+
+
+def ma_crossover(prices, fast=20, slow=100):
+    """Equal-weight every asset whose fast moving average is above its slow one."""
+    if fast >= slow:
+        return np.zeros_like(prices)
+    mask = _rolling_mean(prices, fast) > _rolling_mean(prices, slow)
+    return _equal_weight(mask)
+
+
+def mean_reversion(prices, lookback=5, threshold=0.02):
+    """Equal-weight assets that fell more than `threshold` over `lookback` days."""
+    trailing = np.full_like(prices, np.nan)
+    trailing[lookback:] = prices[lookback:] / prices[:-lookback] - 1.0
+    return _equal_weight(trailing < -threshold)
+
+
+STRATEGIES = {
+    "momentum": Strategy(momentum, lambda p: p.get("lookback", 60)),
+    "ma_crossover": Strategy(ma_crossover, lambda p: p.get("slow", 100)),
+    "mean_reversion": Strategy(mean_reversion, lambda p: p.get("lookback", 5)),
+}
@@ -0,0 +1,42 @@
+#!/usr/bin/env bash
+# ===========================================================
+# Production launcher for the FastAPI backend (Linux)
+# Multi-worker gunicorn + uvicorn workers, see gunicorn_conf.py
+# ===========================================================
+set -euo pipefail
+cd "$(dirname "$0")"
+
+PIDFILE="${FINSIGHT_PIDFILE:-/tmp/finsight-gunicorn.pid}"
+export FINSIGHT_PIDFILE="$PIDFILE"
+
+master_pid() {
+    [ -f "$PIDFILE" ] && cat "$PIDFILE"
+}
+
+case "${1:-start}" in
+    start)
+        exec gunicorn -c gunicorn_conf.py main:app
+        ;;
+    daemon)
+        gunicorn -c gunicorn_conf.py --daemon main:app
+        echo "Started, master pid file: $PIDFILE"
+        ;;
+    reload)
+        # Reload models/reference data in the master and roll the workers.
+        kill -HUP "$(master_pid)"
+        ;;
+    upgrade)
+        # Start a new master running the current code, then retire the old one.
+        old="$(master_pid)"
+        kill -USR2 "$old"
+        sleep 5
+        kill -QUIT "$old"
+        ;;
+    stop)
+        kill -TERM "$(master_pid)"
+        ;;
+    *)
+        echo "usage: $0 {start|daemon|reload|upgrade|stop}" >&2
+        exit 1
+        ;;
+esac
@@ -1,3 +1,74 @@
 ﻿import streamlit as st
-st.title('Default White-Label AI Dashboard')
-st.info('Dashboard auto-generated. Replace this file with your custom dashboard.py.')
+
+from backend.dataplane import DataPlaneReader
+from wargame import config
+from wargame.history import RunStore
+
+st.set_page_config(page_title='FinSight Dashboard', layout='wide')
+st.title('FinSight War-Game Dashboard')
+
+paths = config.Paths()
+
+
+@st.cache_resource
+def run_store(path):
+    return RunStore(path)
+
+
+@st.cache_resource
+def data_plane():
+    # One reader per dashboard process: it keeps each dataset mapped and only
+    # remaps when the backend publishes a new version.
+    return DataPlaneReader()
+
+
+# --- Shared data (same-host backend) ---
+reader = data_plane()
+versions = reader.versions()
+if versions:
+    st.subheader('Backend data')
+    name = st.selectbox('Dataset', sorted(versions))
+    data, version = reader.get(name)
+    if hasattr(data, 'num_rows'):  # Arrow table
+        st.caption(f'{name} v{version}: {data.num_rows} rows')
+        st.dataframe(data.slice(0, 1000).to_pandas(), use_container_width=True)
+    elif data is not None:
+        st.caption(f'{name} v{version}: {data.dtype} {data.shape}')
+        if data.ndim == 1 or (data.ndim == 2 and data.shape[1] <= 50):
+            st.line_chart(data[-5000:])
+        else:
+            st.dataframe(data[:200, :50], use_container_width=True)
+
+if not paths.runs_db.exists():
+    st.info(f'No run history yet: run `wargame plan` or `wargame pages` to fill {paths.runs_db}.')
+    st.stop()
+
+store = run_store(str(paths.runs_db))
+
+# --- Search ---
+query = st.text_input('Search prompts, responses and ideas')
+if query:
+    hits = store.search(query, limit=50)
+    st.subheader(f"{len(hits['calls'])} responses, {len(hits['ideas'])} ideas")
+    st.dataframe(hits['ideas'], use_container_width=True)
+    st.dataframe(hits['calls'], use_container_width=True)
+
+# --- Runs ---
+runs = store.runs(limit=200)
+st.subheader('Runs')
+st.dataframe(runs, use_container_width=True)
+if runs:
+    run_id = st.selectbox('Run', [r['id'] for r in runs],
+                          format_func=lambda i: next(f"#{r['id']} {r['command']} ({r['status']})"
+                                                     for r in runs if r['id'] == i))
+    ideas = store.ideas(run_id)
+    if ideas:
+        st.subheader('Ideas')
+        st.table(ideas)
+    st.subheader('Calls')
+    for call in store.calls(run_id):
+        label = f"{call['budget_key'] or '-'} [{call['source']}] {call['seconds']:.2f}s, " \
+                f"{call['prompt_tokens']}+{call['completion_tokens']} tokens"
+        with st.expander(label):
+            st.caption(call['user'])
+            st.text(call['response'])
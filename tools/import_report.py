@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Startup-time report: where does import time go?
+
+Runs each target in a fresh interpreter with `-X importtime`, groups the
+self-time of every imported module by top-level package and prints the most
+expensive ones, plus the median wall-clock start time. CLIs (scripts and
+CLI_MODULES) are checked against --budget-ms; the exit status is 1 if any of
+them is over budget.
+
+Usage:
+    python -m tools.import_report                          # default targets
+    python -m tools.import_report main wargame.cli AI_Million_Dollar_War_Game_clean.py
+    python -m tools.import_report --budget-ms 200 --top 15 ingestion
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_TARGETS = (
+    "wargame.cli",
+    "AI_Million_Dollar_War_Game_v4.py",
+    "main",
+    "ai_modules",
+    "ingestion",
+)
+
+CLI_MODULES = ("wargame.cli",)
+
+
+def _is_cli(target):
+    return target.endswith(".py") or target in CLI_MODULES
+
+
+def _code(target):
+    """Python snippet that loads `target` without running its __main__ block."""
+    if target.endswith(".py"):
+        return f"import runpy; runpy.run_path({str(ROOT / target)!r}, run_name='__startup__')"
+    return f"import {target}"
+
+
+def import_times(target):
+    """{module: (self_us, cumulative_us)} from `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _code(target)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def wall_time(target, runs=5):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", _code(target)], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def report(target, top, budget_ms):
+    times = import_times(target)
+    by_package = defaultdict(int)
+    for name, (self_us, _) in times.items():
+        by_package[name.split(".")[0]] += self_us
+    wall_ms = wall_time(target) * 1e3
+    baseline_ms = wall_time("sys") * 1e3
+    within = wall_ms <= budget_ms or not _is_cli(target)
+    status = "" if not _is_cli(target) else \
+        f", budget {budget_ms:.0f} ms: {'OK' if within else 'OVER BUDGET'}"
+    print(f"\n== {target}: {wall_ms:.0f} ms wall (interpreter alone {baseline_ms:.0f} ms), "
+          f"{len(times)} modules{status}")
+    total = sum(by_package.values()) or 1
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {us / 1e3:8.1f} ms  {us / total:6.1%}  {package}")
+    return within
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-import startup time report")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS,
+                        help="module names or .py scripts relative to the repo root")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=200.0)
+    args = parser.parse_args(argv)
+    ok = True
+    for target in args.targets:
+        try:
+            ok &= report(target, args.top, args.budget_ms)
+        except RuntimeError as e:
+            print(f"\n== {target}: failed to import: {e}")
+            ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
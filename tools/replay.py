@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Historical replay harness for load testing.
+
+Replays an archived market-data file (CSV, Parquet or .npy ticks) into the
+backend's /run endpoint or straight into the ingestion pipeline at 1x, Nx or
+maximum speed, preserving inter-arrival timing. Every run writes latency
+percentiles and throughput to replay_runs/, so performance changes can be
+compared on the same recorded day.
+
+At a paced speed the ingest target hands ticks to the pipeline in slices of
+at most --pace-ms of market time (1 ms by default), each on its own schedule,
+so arrivals keep their recorded pattern to within that slice rather than
+arriving --batch-size rows at a time. At max speed, batches are --batch-size.
+
+Usage:
+    python -m tools.replay data/2024-03-01.parquet --target ingest --speed max
+    python -m tools.replay data/2024-03-01.parquet --target ingest --validate
+    python -m tools.replay data/2024-03-01.csv --target http --speed 10 --url http://127.0.0.1:8000/run
+    python -m tools.replay --compare replay_runs/before.json replay_runs/after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from ingestion import FileReplaySource, Pipeline, SymbolTable, Validator, default_subscribers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+RUNS_DIR = Path("replay_runs")
+PERCENTILES = (50, 90, 99, 99.9)
+PACE_MS = 1.0
+
+
+# --- Stats ---
+def summarize(latencies_s):
+    """Latency percentiles in milliseconds."""
+    lat = np.asarray(latencies_s, dtype=np.float64) * 1e3
+    if lat.size == 0:
+        return {"count": 0}
+    out = {"count": int(lat.size), "mean_ms": float(lat.mean()), "max_ms": float(lat.max())}
+    for p, v in zip(PERCENTILES, np.percentile(lat, PERCENTILES)):
+        out[f"p{p:g}_ms"] = float(v)
+    return out
+
+
+def parse_speed(value):
+    """'max' -> None (no pacing), '1x'/'10' -> float multiplier."""
+    if value.lower() in ("max", "0", "inf"):
+        return None
+    return float(value.lower().rstrip("x"))
+
+
+def sanitize(label):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in label)[:60]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- Ingestion target ---
+class _TimedSubscriber:
+    """Wraps a subscriber and records its per-batch latency and lag behind schedule."""
+
+    def __init__(self, inner, clock):
+        self.inner = inner
+        self.name = getattr(inner, "name", type(inner).__name__)
+        self.clock = clock
+        self.service = []
+        self.lag = []
+
+    def on_batch(self, batch, symbols):
+        start = time.perf_counter()
+        if self.clock["speed"] and len(batch):
+            due = self.clock["wall0"] + (int(batch["ts"][0]) - self.clock["ts0"]) / 1e9 / self.clock["speed"]
+            self.lag.append(max(start - due, 0.0))
+        self.inner.on_batch(batch, symbols)
+        self.service.append(time.perf_counter() - start)
+
+
+def pace_slices(batch, window_ns):
+    """Split `batch` wherever consecutive ticks fall in different `window_ns` slots of market time."""
+    slot = batch["ts"].astype(np.int64) // window_ns
+    return np.split(batch, np.flatnonzero(slot[1:] != slot[:-1]) + 1)
+
+
+async def replay_ingest(path, speed, batch_size, validate=False, pace_ms=PACE_MS):
+    # Pacing happens here, per slice, rather than per source batch.
+    source = FileReplaySource(path, batch_size=batch_size)
+    clock = {"speed": speed, "wall0": None, "ts0": None}
+    inner_batches = source.batches
+    window_ns = max(int(pace_ms * 1e6), 1)
+
+    async def paced(symbols):
+        async for batch in inner_batches(symbols):
+            for part in pace_slices(batch, window_ns) if speed else (batch,):
+                if not len(part):
+                    continue
+                first = int(part["ts"][0])
+                if clock["wall0"] is None:
+                    clock["wall0"], clock["ts0"] = time.perf_counter(), first
+                if speed:
+                    delay = clock["wall0"] + (first - clock["ts0"]) / 1e9 / speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                yield part
+
+    source.batches = paced
+    subscribers = [_TimedSubscriber(s, clock) for s in default_subscribers()]
+    validator = Validator() if validate else None
+    stats = await Pipeline(source, subscribers, validator=validator).run()
+    return {
+        "events": stats["ticks"],
+        "quarantined": stats["quarantined"],
+        "batches": stats["batches"],
+        "seconds": stats["seconds"],
+        "throughput_per_s": stats["ticks"] / stats["seconds"] if stats["seconds"] else 0.0,
+        "subscribers": {
+            s.name: {"service": summarize(s.service), "lag": summarize(s.lag)} for s in subscribers
+        },
+    }
+
+
+# --- HTTP target ---
+def _load_records(path, symbols):
+    return np.concatenate(list(FileReplaySource(path)._read(symbols)))
+
+
+def _encode(records, symbols):
+    body = {name: np.ascontiguousarray(records[name]) for name in records.dtype.names}
+    body["symbol"] = [symbols.names[i] for i in records["symbol"]]
+    if orjson is not None:
+        return orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps({k: (v.tolist() if hasattr(v, "tolist") else v) for k, v in body.items()}).encode()
+
+
+async def replay_http(path, speed, url, rows_per_request, concurrency):
+    import requests
+
+    symbols = SymbolTable()
+    records = _load_records(path, symbols)
+    local = threading.local()
+
+    def post(body):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        sent = time.perf_counter()
+        resp = session.post(url, data=body, headers={"Content-Type": "application/json"}, timeout=30)
+        return sent, time.perf_counter(), resp.status_code
+
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(concurrency)
+    response, service, errors = [], [], 0
+    pending = set()
+    ts0 = int(records["ts"][0]) if len(records) else 0
+    wall0 = time.perf_counter()
+
+    async def send(body, due):
+        nonlocal errors
+        try:
+            sent, done, status = await loop.run_in_executor(pool, post, body)
+        except Exception:
+            errors += 1
+            return
+        errors += status >= 400
+        # Measured from the scheduled time, so a slow server cannot hide
+        # queueing delay by slowing the sender down (coordinated omission).
+        response.append(done - due)
+        service.append(done - sent)
+
+    for i in range(0, len(records), rows_per_request):
+        chunk = records[i:i + rows_per_request]
+        body = _encode(chunk, symbols)
+        due = wall0 + ((int(chunk["ts"][0]) - ts0) / 1e9 / speed if speed else 0.0)
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif not speed:
+            due = time.perf_counter()
+        task = asyncio.create_task(send(body, due))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        if len(pending) >= concurrency * 4:
+            await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    if pending:
+        await asyncio.wait(pending)
+    pool.shutdown()
+    seconds = time.perf_counter() - wall0
+    return {
+        "events": int(len(records)),
+        "requests": len(response) + errors,
+        "errors": errors,
+        "seconds": seconds,
+        "throughput_per_s": len(response) / seconds if seconds else 0.0,
+        "response": summarize(response),
+        "service": summarize(service),
+    }
+
+
+# --- Reporting ---
+def write_run(result):
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+    name = "_".join(filter(None, (stamp, result["target"], sanitize(result["label"]))))
+    path = RUNS_DIR / f"{name}.json"
+    path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return path
+
+
+def _flatten(d, prefix=""):
+    for k, v in d.items():
+        if isinstance(v, dict):
+            yield from _flatten(v, f"{prefix}{k}.")
+        elif isinstance(v, (int, float)):
+            yield f"{prefix}{k}", v
+
+
+def compare(before_path, after_path):
+    before = dict(_flatten(json.loads(Path(before_path).read_text(encoding="utf-8"))))
+    after = dict(_flatten(json.loads(Path(after_path).read_text(encoding="utf-8"))))
+    print(f"{'metric':50} {'before':>12} {'after':>12} {'change':>8}")
+    for key in sorted(before.keys() & after.keys()):
+        if not (key.endswith("_ms") or key.endswith("_per_s")):
+            continue
+        b, a = before[key], after[key]
+        change = f"{(a - b) / b * 100:+.1f}%" if b else "n/a"
+        print(f"{key:50} {b:12.3f} {a:12.3f} {change:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay archived market data for load testing.")
+    parser.add_argument("path", nargs="?", help="CSV, Parquet or .npy tick file")
+    parser.add_argument("--target", choices=("ingest", "http"), default="ingest")
+    parser.add_argument("--speed", default="1x", help="1x, Nx or max")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/run")
+    parser.add_argument("--rows-per-request", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=16384, help="rows read per source batch")
+    parser.add_argument("--pace-ms", type=float, default=PACE_MS,
+                        help="market time per delivered slice when paced (ingest target)")
+    parser.add_argument("--validate", action="store_true", help="run the ingest validation stage before fan-out")
+    parser.add_argument("--label", default="", help="free-form tag stored with the run")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if not args.path:
+        parser.error("path is required unless --compare is given")
+
+    speed = parse_speed(args.speed)
+    if args.target == "ingest":
+        result = asyncio.run(replay_ingest(args.path, speed, args.batch_size, args.validate, args.pace_ms))
+    else:
+        result = asyncio.run(replay_http(args.path, speed, args.url, args.rows_per_request, args.concurrency))
+    result.update({
+        "target": args.target,
+        "source": os.path.abspath(args.path),
+        "speed": args.speed,
+        "label": args.label,
+        "git": git_revision(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+    })
+    path = write_run(result)
+    print(f"{result['events']} events in {result['seconds']:.2f}s "
+          f"({result['throughput_per_s']:.0f}/s). Run saved to {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
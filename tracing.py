@@ -0,0 +1,404 @@
+"""
+Lightweight request tracing with OpenTelemetry-compatible export.
+
+    from tracing import span, traced
+
+    @traced("factor_model.fit")
+    def fit(...): ...
+
+    with span("load_prices", symbols=len(symbols)):
+        ...
+
+Spans nest through a contextvar, so a span opened in an endpoint is the
+parent of those opened by the modules it calls. Work handed to pools keeps
+its parent: ai_modules.executor ships `traceparent()` with every chunk, and
+`propagate(fn)` does the same for any callable given to a thread or process
+pool (each process exports its own spans).
+
+Configuration (environment):
+
+    FINSIGHT_TRACE_SAMPLE   fraction of traces to record; 0 (default) turns
+                            tracing off, and then `span` / `traced` cost one
+                            flag check
+    FINSIGHT_TRACE_EXPORT   file:<path> (default file:traces.jsonl in the temp
+                            dir) appends OTLP/JSON ExportTraceServiceRequest
+                            lines; http(s)://host:4318/v1/traces posts them to
+                            an OTLP/HTTP collector
+    FINSIGHT_SERVICE_NAME   resource service.name (default "finsight")
+
+The sampling decision is made once per trace from its id (like OTel's
+TraceIdRatioBased) and follows an incoming W3C `traceparent`, so a trace is
+either recorded everywhere or nowhere. `python -m tracing folded FILE` turns
+an export into collapsed stacks for flamegraph.pl / speedscope.
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import multiprocessing.util
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+SAMPLE = float(os.getenv("FINSIGHT_TRACE_SAMPLE", "0") or 0)
+EXPORT = os.getenv("FINSIGHT_TRACE_EXPORT", "file:" + os.path.join(tempfile.gettempdir(), "traces.jsonl"))
+SERVICE = os.getenv("FINSIGHT_SERVICE_NAME", "finsight")
+ENABLED = SAMPLE > 0
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT, PRODUCER, CONSUMER = 1, 2, 3, 4, 5
+
+_current = contextvars.ContextVar("finsight_span", default=None)
+_ids = random.Random()  # reseeded after fork so workers don't repeat ids
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled", "kind", "start_ns", "end_ns",
+                 "attributes", "error", "_token")
+
+    def __init__(self, name, trace_id, parent_id, sampled, kind=INTERNAL, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{_ids.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = self.end_ns = 0
+        self.error = None
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        _current.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        if self.sampled:
+            _exporter().add(self)
+        return False
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+class _NoopSpan:
+    """Returned while tracing is off."""
+    sampled = False
+    traceparent = None
+
+    def set(self, **attributes):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP = _NoopSpan()
+
+
+def _sample(trace_id):
+    return int(trace_id[16:], 16) < SAMPLE * 2 ** 64
+
+
+def span(name, kind=INTERNAL, parent=None, **attributes):
+    """Context manager for a child of the current span (or a new trace).
+
+    `parent` is a W3C traceparent string, for spans continuing a remote trace.
+    """
+    if not ENABLED:
+        return NOOP
+    if parent is not None:
+        context = parse_traceparent(parent)
+        if context is None:
+            parent = None
+        else:
+            trace_id, parent_id, sampled = context
+    if parent is None:
+        current = _current.get()
+        if current is None:
+            trace_id = f"{_ids.getrandbits(128):032x}"
+            parent_id, sampled = None, _sample(trace_id)
+        else:
+            trace_id, parent_id, sampled = current.trace_id, current.span_id, current.sampled
+    # Unsampled spans are still created so their children inherit the decision.
+    return Span(name, trace_id, parent_id, sampled, kind, attributes)
+
+
+def traced(name=None, **attributes):
+    """Decorator: run the function inside `span(name or qualname)`."""
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with span(label, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current():
+    return _current.get()
+
+
+def parse_traceparent(value):
+    """(trace_id, parent span_id, sampled) from a W3C traceparent header, or None."""
+    parts = (value or "").strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3][:2], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+# --- Propagation ---
+def traceparent():
+    """traceparent of the current span, or None; what to ship with work sent elsewhere."""
+    current_span = _current.get() if ENABLED else None
+    return current_span.traceparent if current_span is not None else None
+
+
+def propagate(fn, name=None):
+    """`fn` wrapped to run as a child of the span current now, in whatever thread,
+    process or host ends up calling it (pickles as long as `fn` does)."""
+    return Propagated(fn, name, traceparent())
+
+
+class Propagated:
+    def __init__(self, fn, name, parent):
+        self.fn = fn
+        self.name = name or getattr(fn, "__qualname__", repr(fn))
+        self.traceparent = parent
+
+    def __call__(self, *args, **kwargs):
+        if not ENABLED or self.traceparent is None:
+            return self.fn(*args, **kwargs)
+        with span(self.name, parent=self.traceparent, pid=os.getpid()):
+            return self.fn(*args, **kwargs)
+
+
+# --- ASGI ---
+class TracingMiddleware:
+    """Root span per HTTP request; honours and returns `traceparent`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = None
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                incoming = value.decode("latin-1")
+        root = span(f"{scope['method']} {scope['path']}", kind=SERVER, parent=incoming,
+                    **{"http.method": scope["method"], "http.target": scope["path"]})
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                root.set(**{"http.status_code": message["status"]})
+                if root.traceparent:
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"traceparent", root.traceparent.encode())]
+            await send(message)
+
+        with root:
+            await self.app(scope, receive, send_with_trace)
+
+
+# --- Export ---
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp(spans):
+    """OTLP/JSON ExportTraceServiceRequest for `spans`."""
+    resource = {"service.name": SERVICE, "process.pid": os.getpid(), "host.name": platform.node()}
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_attribute(k, v) for k, v in resource.items()]},
+        "scopeSpans": [{
+            "scope": {"name": "finsight.tracing"},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                "name": s.name,
+                "kind": s.kind,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [_attribute(k, v) for k, v in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 0},
+            } for s in spans],
+        }],
+    }]}
+
+
+class Exporter:
+    """Batches finished spans and writes them from a background thread."""
+
+    def __init__(self, target=EXPORT, max_batch=512, interval=1.0):
+        self.target = target
+        self.max_batch = max_batch
+        self.interval = interval
+        self._spans = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="finsight-trace-export", daemon=True)
+        self._thread.start()
+
+    def add(self, s):
+        with self._lock:
+            self._spans.append(s)
+            full = len(self._spans) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if not spans:
+            return
+        line = json.dumps(to_otlp(spans), separators=(",", ":"))
+        try:
+            if self.target.startswith(("http://", "https://")):
+                request = urllib.request.Request(self.target, line.encode(), {"Content-Type": "application/json"})
+                urllib.request.urlopen(request, timeout=5).close()
+            else:
+                path = self.target[5:] if self.target.startswith("file:") else self.target
+                # One write per batch with O_APPEND, so processes sharing the file don't interleave.
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, (line + "\n").encode())
+                finally:
+                    os.close(fd)
+        except OSError as e:
+            print(f"tracing: dropped {len(spans)} spans: {e}", file=sys.stderr)
+
+
+_EXPORTER = None
+_exporter_lock = threading.Lock()
+
+
+def _exporter():
+    global _EXPORTER
+    if _EXPORTER is None:
+        with _exporter_lock:
+            if _EXPORTER is None:
+                _EXPORTER = Exporter()
+    return _EXPORTER
+
+
+def flush():
+    if _EXPORTER is not None:
+        _EXPORTER.flush()
+
+
+def configure(sample=None, export=None):
+    """Change sampling / export target at runtime (e.g. from tests or a CLI flag)."""
+    global SAMPLE, ENABLED, EXPORT, _EXPORTER
+    if sample is not None:
+        SAMPLE = float(sample)
+        ENABLED = SAMPLE > 0
+    if export is not None:
+        flush()
+        EXPORT, _EXPORTER = export, None
+        if ENABLED:
+            _EXPORTER = Exporter(export)
+
+
+def _after_fork():
+    # The exporter thread does not survive fork; forked workers start their own.
+    global _EXPORTER, _exporter_lock
+    _EXPORTER, _exporter_lock = None, threading.Lock()
+    _ids.seed()
+
+
+def _flush_at_process_exit(_):
+    # multiprocessing children leave through os._exit, which skips atexit; their
+    # exit hook runs finalizers instead (registered after the fork clears them).
+    multiprocessing.util.Finalize(None, flush, exitpriority=0)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+multiprocessing.util.register_after_fork(_ids, _flush_at_process_exit)
+atexit.register(flush)
+
+
+# --- Flame graphs ---
+def folded(lines):
+    """Collapsed stacks ("root;child;leaf <self microseconds>") from OTLP/JSON export lines."""
+    spans = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        for rs in json.loads(line).get("resourceSpans", ()):
+            for ss in rs.get("scopeSpans", ()):
+                for s in ss.get("spans", ()):
+                    spans[s["spanId"]] = s
+    child_time = {}
+    for s in spans.values():
+        parent = s.get("parentSpanId")
+        if parent in spans:
+            child_time[parent] = child_time.get(parent, 0) + int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])
+    stacks = {}
+    for span_id, s in spans.items():
+        path, node = [], s
+        while node is not None:
+            path.append(node["name"].replace(";", ","))
+            node = spans.get(node.get("parentSpanId"))
+        own = int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"]) - child_time.get(span_id, 0)
+        key = ";".join(reversed(path))
+        stacks[key] = stacks.get(key, 0) + max(own, 0) // 1000
+    return [f"{k} {v}" for k, v in sorted(stacks.items())]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2 or argv[0] != "folded":
+        print("usage: python -m tracing folded TRACES.jsonl > traces.folded", file=sys.stderr)
+        return 2
+    with open(argv[1], "r", encoding="utf-8") as f:
+        print("\n".join(folded(f)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
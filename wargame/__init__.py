@@ -0,0 +1,10 @@
+"""
+FinSight AI War-Game CLI.
+
+One package behind the former AI_Million_Dollar_War_Game_*.py scripts:
+
+    wargame plan     run every prompt in prompts.json, write responses + landing page
+    wargame ideas    generate the 10 faceless product ideas (output_plan/ideas.json)
+    wargame pages    build a landing page per idea plus an index page
+    wargame history  list, show and search past runs (output_plan/runs.db)
+"""
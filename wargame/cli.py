@@ -0,0 +1,99 @@
+"""Command-line entry point: `wargame {plan,ideas,pages}` (or `python -m wargame`)."""
+
+import argparse
+import sys
+
+from . import commands, config
+from .client import ModelClient
+from .history import RunStore
+from .output import ensure_dirs
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def build_parser():
+    base = argparse.ArgumentParser(add_help=False)
+    base.add_argument("--output-dir", default=str(config.OUTPUT_DIR), help="default: %(default)s")
+    common = argparse.ArgumentParser(add_help=False, parents=[base])
+    common.add_argument("--model", default=config.MODEL, help="default: %(default)s")
+    common.add_argument("--jobs", "-j", type=positive_int, default=1, help="parallel model calls")
+    common.add_argument("--dry-run", action="store_true", help="estimate tokens, cost and latency; send nothing")
+    common.add_argument("--no-cache", action="store_true", help="ignore and don't write the response cache")
+    common.add_argument("--near-dup", type=float, metavar="SIMILARITY",
+                        help="reuse the answer of an earlier prompt at least this similar (0-1)")
+    common.add_argument("--no-history", action="store_true", help="don't record this run in runs.db")
+    common.add_argument("--text-ideas", action="store_true",
+                        help="request ideas as free text (automatic for models without JSON-schema output)")
+
+    parser = argparse.ArgumentParser(prog="wargame", description="FinSight AI War-Game generator")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("plan", parents=[common], help="run every prompt in prompts.json")
+    sub.add_parser("ideas", parents=[common], help="generate 10 faceless product ideas")
+    pages = sub.add_parser("pages", parents=[common], help="landing page per idea + index page")
+    pages.add_argument("--regenerate-ideas", action="store_true", help="ignore a saved ideas.json")
+    pages.add_argument("--page-size", type=positive_int, default=commands.INDEX_PAGE_SIZE, help="ideas per index page")
+    history = sub.add_parser("history", parents=[base], help="query past runs in runs.db")
+    history.add_argument("action", nargs="?", default="runs", choices=["runs", "show", "ideas", "search"])
+    history.add_argument("target", nargs="*", help="run id (show/ideas), search text, or command (runs)")
+    history.add_argument("--limit", type=int, default=20)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    paths = config.Paths(args.output_dir)
+    if args.command == "history":
+        if not paths.runs_db.exists():
+            print(f"No run history yet ({paths.runs_db}).")
+            return 1
+        with RunStore(paths.runs_db) as store:
+            commands.history(store, args.action, " ".join(args.target) or None, args.limit)
+        return 0
+
+    client = ModelClient(model=args.model, cache_dir=None if args.no_cache else paths.cache,
+                         near_dup=args.near_dup)
+    regenerate = getattr(args, "regenerate_ideas", False)
+
+    if args.dry_run:
+        commands.dry_run(client, paths, args.command, args.jobs, regenerate)
+        return 0
+    if not client.live:
+        print("OPENAI_API_KEY or the openai package is missing: using mock responses.")
+    store = None
+    if not args.no_history:
+        ensure_dirs(paths.root)
+        store = RunStore(paths.runs_db)
+        client.run = store.start_run(args.command, client.model, vars(args))
+    status = "error"
+    try:
+        structured = not args.text_ideas and config.supports_structured(client.model)
+        if args.command == "plan":
+            commands.plan(client, paths, args.jobs)
+        elif args.command == "ideas":
+            commands.ideas(client, paths, structured=structured)
+        else:
+            commands.pages(client, paths, args.jobs, regenerate, structured=structured,
+                           page_size=args.page_size)
+        status = "ok"
+    finally:
+        if store is not None:
+            client.run.finish(client.stats, status)
+            store.close()
+    stats = client.stats
+    print(f"\nDone: {stats['calls']} model calls ({stats['seconds']:.1f}s), {stats['cache_hits']} cached, "
+          f"{stats['deduped'] + stats['near_dup']} deduplicated, {stats['mock']} mocked, "
+          f"{stats['failures']} failed. Outputs in {paths.root}/")
+    if stats["calls"]:
+        print(f"Tokens: {stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion, "
+              f"~${stats['cost_usd']:.3f}")
+    if store is not None:
+        print(f"Recorded as run {client.run.id} (wargame history show {client.run.id})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
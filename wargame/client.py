@@ -0,0 +1,354 @@
+"""
+Model client shared by every subcommand.
+
+Wraps the (lazily imported) OpenAI ChatCompletion API with retries, an
+on-disk response cache and per-run statistics. Without OPENAI_API_KEY or the
+openai package it returns deterministic mock responses, so every command
+also works offline.
+"""
+
+import hashlib
+import json
+import os
+import textwrap
+import threading
+import time
+
+from lazy_imports import lazy_import
+
+from . import config
+from .dedup import NearDuplicateIndex, SingleFlight, normalize
+from .tokens import CompletionHistory, count_messages, count_tokens
+
+openai = lazy_import("openai")
+
+
+def example_from_schema(schema, label="Mock"):
+    """Smallest instance of a JSON schema, used as the offline mock for structured calls."""
+    kind = schema.get("type")
+    if kind == "object":
+        return {k: example_from_schema(v, f"{label} {k}") for k, v in schema.get("properties", {}).items()}
+    if kind == "array":
+        n = schema.get("minItems", 1)
+        return [example_from_schema(schema.get("items", {}), f"{label} {i}") for i in range(1, n + 1)]
+    if kind in ("integer", "number"):
+        return 0
+    if kind == "boolean":
+        return False
+    return label
+
+
+def _status(error):
+    """HTTP status of an OpenAI error (0.x `http_status` or 1.x `status_code`), if any."""
+    return getattr(error, "http_status", None) or getattr(error, "status_code", None)
+
+
+class ModelClient:
+    """Prompts are compared after `dedup.normalize`: identical prompts in flight
+    share one request, and with `near_dup` (a similarity threshold in (0, 1])
+    prompts close to an already-answered one reuse its answer.
+
+    Calls given a `budget_key` send a `max_tokens` sized from the completion
+    lengths previously recorded under that key (the passed value is the cap)
+    and record their own length afterwards.
+    """
+
+    def __init__(self, model=config.MODEL, api_key=config.OPENAI_API_KEY, cache_dir=None,
+                 temperature=config.TEMPERATURE, near_dup=None):
+        self.model = model
+        self.api_key = api_key
+        self.cache_dir = cache_dir
+        self.temperature = temperature
+        self.stats = {"calls": 0, "cache_hits": 0, "deduped": 0, "near_dup": 0, "mock": 0,
+                      "failures": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                      "cost_usd": 0.0}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._answers = {}  # near-duplicate answers by cache key when there is no disk cache
+        self.run = None  # a history.Run to record every answered call into
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.history = CompletionHistory(os.path.join(cache_dir, "completion_tokens.json") if cache_dir else None)
+        self.near_dup = None
+        if near_dup:
+            index_path = os.path.join(cache_dir, "near_dup.jsonl") if cache_dir else None
+            self.near_dup = NearDuplicateIndex(near_dup, path=index_path)
+
+    @property
+    def live(self):
+        return bool(self.api_key and openai)
+
+    # --- Cache ---
+    def _cache_key(self, system_prompt, user_prompt, max_tokens):
+        raw = json.dumps([self.model, self.temperature, max_tokens, normalize(system_prompt),
+                          normalize(user_prompt)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json"), "r", encoding="utf-8") as f:
+                return json.load(f)["content"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _cache_put(self, key, content):
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model, "content": content}, f)
+        os.replace(tmp, path)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    # --- Run history ---
+    def _record(self, source, system_prompt, user_prompt, content, budget_key, started):
+        if self.run is None:
+            return
+        self.run.record_call({
+            "source": source,
+            "system": system_prompt,
+            "user": user_prompt,
+            "response": content,
+            "budget_key": budget_key,
+            "seconds": time.perf_counter() - started,
+            "prompt_tokens": count_messages(system_prompt, user_prompt, self.model),
+            "completion_tokens": count_tokens(content, self.model),
+        })
+
+    # --- Token accounting ---
+    def cost(self, prompt_tokens, completion_tokens):
+        price_in, price_out = config.PRICING.get(self.model, config.PRICING["gpt-4"])
+        return prompt_tokens / 1000 * price_in + completion_tokens / 1000 * price_out
+
+    def _sized(self, max_tokens, budget_key):
+        return self.history.max_tokens(budget_key, max_tokens) if budget_key else max_tokens
+
+    def _account(self, system_prompt, user_prompt, content, budget_key, usage=None):
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or count_messages(system_prompt, user_prompt, self.model)
+        completion_tokens = getattr(usage, "completion_tokens", None) or count_tokens(content, self.model)
+        self._count("prompt_tokens", prompt_tokens)
+        self._count("completion_tokens", completion_tokens)
+        self._count("cost_usd", self.cost(prompt_tokens, completion_tokens))
+        if budget_key:
+            self.history.record(budget_key, completion_tokens)
+
+    # --- Near duplicates ---
+    def _scope(self, system_prompt, max_tokens, extra):
+        raw = json.dumps([self.model, self.temperature, max_tokens, normalize(system_prompt), extra])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _reuse(self, system_prompt, user_prompt, max_tokens, extra=""):
+        if self.near_dup is None:
+            return None
+        key, _ = self.near_dup.find(self._scope(system_prompt, max_tokens, extra), normalize(user_prompt))
+        if key is None:
+            return None
+        content = self._answers.get(key) or self._cache_get(key)
+        if content is not None:
+            self._count("near_dup")
+        return content
+
+    def _remember(self, key, system_prompt, user_prompt, max_tokens, content, extra=""):
+        self._cache_put(key, content)
+        if self.near_dup is not None:
+            if not self.cache_dir:
+                self._answers[key] = content
+            self.near_dup.add(self._scope(system_prompt, max_tokens, extra), normalize(user_prompt), key)
+
+    # --- Calls ---
+    def mock_response(self, user_prompt):
+        return textwrap.dedent(
+            f"""
+            MOCK RESPONSE
+            Instruction executed: {user_prompt}
+            """
+        ).strip()
+
+    def mock_structured(self, response_format):
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        return json.dumps(example_from_schema(schema))
+
+    def _create(self, system_prompt, user_prompt, max_tokens, **kwargs):
+        openai.api_key = self.api_key
+        return openai.ChatCompletion.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            **kwargs,
+        )
+
+    def _request(self, system_prompt, user_prompt, max_tokens):
+        for attempt in range(1, config.MAX_RETRIES + 1):
+            try:
+                resp = self._create(system_prompt, user_prompt, max_tokens)
+                return resp.choices[0].message.get("content", "").strip(), getattr(resp, "usage", None)
+            except Exception as e:
+                print(f"OpenAI call failed ({attempt}/{config.MAX_RETRIES}): {e}")
+                if attempt < config.MAX_RETRIES:
+                    time.sleep(config.RETRY_BACKOFF ** attempt)
+        return None, None
+
+    def complete(self, system_prompt, user_prompt, max_tokens=900, budget_key=None):
+        """Model response text (cached); a mock response when offline or on failure."""
+        started = time.perf_counter()
+        content, source = self._complete(system_prompt, user_prompt, max_tokens, budget_key)
+        self._record(source, system_prompt, user_prompt, content, budget_key, started)
+        return content
+
+    def _complete(self, system_prompt, user_prompt, max_tokens, budget_key):
+        key = self._cache_key(system_prompt, user_prompt, max_tokens)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._count("cache_hits")
+            return cached, "cache"
+        if not self.live:
+            self._count("mock")
+            return self.mock_response(user_prompt), "mock"
+        call, leader = self._flights.begin(key)
+        if not leader:
+            self._count("deduped")
+            content = self._flights.wait(call)
+            return (content, "deduped") if content is not None else (self.mock_response(user_prompt), "failed")
+        content = None
+        try:
+            content = self._reuse(system_prompt, user_prompt, max_tokens)
+            if content is not None:
+                return content, "near_dup"
+            content, source = self._complete_live(key, system_prompt, user_prompt, max_tokens, budget_key)
+            return content, source
+        finally:
+            self._flights.finish(key, call, content)
+
+    def _complete_live(self, key, system_prompt, user_prompt, max_tokens, budget_key):
+        started = time.perf_counter()
+        self._count("calls")
+        content, usage = self._request(system_prompt, user_prompt, self._sized(max_tokens, budget_key))
+        self._count("seconds", time.perf_counter() - started)
+        if content is None:
+            self._count("failures")
+            return self.mock_response(user_prompt), "failed"
+        self._account(system_prompt, user_prompt, content, budget_key, usage)
+        self._remember(key, system_prompt, user_prompt, max_tokens, content)
+        return content, "live"
+
+    def stream(self, system_prompt, user_prompt, max_tokens=900, response_format=None, budget_key=None):
+        """Yield the response text in chunks as the model produces it.
+
+        With `response_format` (a JSON-schema response format) the request is
+        schema-constrained. The full text is cached once the stream completes;
+        cached, mock, deduplicated and failed calls yield their whole text as
+        one chunk.
+        """
+        started = time.perf_counter()
+        meta = {"source": "live"}
+        parts = []
+        try:
+            for chunk in self._stream(system_prompt, user_prompt, max_tokens, response_format, budget_key, meta):
+                parts.append(chunk)
+                yield chunk
+        finally:  # also when the consumer stops early, e.g. after the last idea
+            self._record(meta["source"], system_prompt, user_prompt, "".join(parts), budget_key, started)
+
+    def _stream(self, system_prompt, user_prompt, max_tokens, response_format, budget_key, meta):
+        fmt = json.dumps(response_format)
+        key = self._cache_key(system_prompt, user_prompt + fmt, max_tokens)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._count("cache_hits")
+            meta["source"] = "cache"
+            yield cached
+            return
+        if not self.live:
+            self._count("mock")
+            meta["source"] = "mock"
+            yield self.mock_structured(response_format) if response_format else self.mock_response(user_prompt)
+            return
+        call, leader = self._flights.begin(key)
+        if not leader:
+            self._count("deduped")
+            content = self._flights.wait(call)
+            meta["source"] = "deduped" if content is not None else "failed"
+            yield content if content is not None else self.mock_response(user_prompt)
+            return
+        content = None
+        try:
+            content = self._reuse(system_prompt, user_prompt, max_tokens, fmt)
+            if content is not None:
+                meta["source"] = "near_dup"
+                yield content
+                return
+            parts = []
+            yield from self._stream_live(system_prompt, user_prompt, self._sized(max_tokens, budget_key),
+                                         response_format, parts)
+            content = "".join(parts) if parts else None
+            if content is not None:
+                self._account(system_prompt, user_prompt, content, budget_key)
+                self._remember(key, system_prompt, user_prompt, max_tokens, content, fmt)
+            else:
+                meta["source"] = "failed"
+        finally:
+            self._flights.finish(key, call, content)
+
+    def _stream_live(self, system_prompt, user_prompt, max_tokens, response_format, parts):
+        kwargs = {"stream": True}
+        if response_format:
+            kwargs["response_format"] = response_format
+        started = time.perf_counter()
+        self._count("calls")
+        for attempt in range(1, config.MAX_RETRIES + 1):
+            try:
+                for event in self._create(system_prompt, user_prompt, max_tokens, **kwargs):
+                    delta = event.choices[0].get("delta", {}).get("content")
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                break
+            except Exception as e:
+                print(f"OpenAI stream failed ({attempt}/{config.MAX_RETRIES}): {e}")
+                if parts:  # the consumer has already seen part of it; don't replay
+                    break
+                if "response_format" in kwargs and _status(e) in (400, 422):
+                    print("Retrying without response_format (not supported by this model?)")
+                    del kwargs["response_format"]  # callers parse free text too
+                    continue
+                if attempt < config.MAX_RETRIES:
+                    time.sleep(config.RETRY_BACKOFF ** attempt)
+        self._count("seconds", time.perf_counter() - started)
+        if not parts:
+            self._count("failures")
+            yield self.mock_response(user_prompt)
+
+    # --- Dry run ---
+    def estimate(self, system_prompt, user_prompt, max_tokens=900, seen=None, budget_key=None):
+        """Projected tokens, cost (USD) and latency (s) of one call, without sending it.
+
+        Pass the same `seen` set for every call of a run: repeats of a prompt
+        already in it are free, as they would be deduplicated. The completion
+        is projected from the lengths recorded under `budget_key`, if any.
+        """
+        prompt_tokens = count_messages(system_prompt, user_prompt, self.model)
+        completion_tokens = self.history.expected(budget_key, max_tokens) if budget_key else max_tokens
+        speed = config.TOKENS_PER_SECOND.get(self.model, 20.0)
+        key = self._cache_key(system_prompt, user_prompt, max_tokens)
+        cached = self._cache_get(key) is not None
+        if seen is not None:
+            cached = cached or key in seen
+            seen.add(key)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "max_tokens": self._sized(max_tokens, budget_key),
+            "cost_usd": 0.0 if cached else self.cost(prompt_tokens, completion_tokens),
+            "latency_s": 0.0 if cached else config.REQUEST_OVERHEAD_S + completion_tokens / speed,
+            "cached": cached,
+        }
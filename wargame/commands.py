@@ -0,0 +1,250 @@
+"""
+Subcommand implementations.
+
+Each command first builds the list of model calls it needs, so --dry-run can
+price them without sending anything, then executes them on up to `jobs`
+threads while writing outputs in a deterministic order.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import pages as html
+from .ideas import IDEAS_RESPONSE_FORMAT, iter_ideas, parse_ideas
+from .output import (ensure_dirs, now_utc_str, read_json, sanitize_filename, write_json,
+                     write_text_file)
+from .prompts import (DEFAULT_SYSTEM_PROMPT, IDEAS_PROMPT, IDEAS_SYSTEM_PROMPT, LANDING_PROMPT,
+                      prompt_items, safe_load_prompts)
+from .site import SiteBuilder
+from .tokens import compress_prompt
+
+PLAN_MAX_TOKENS = 900
+IDEAS_MAX_TOKENS = 1200
+LANDING_MAX_TOKENS = 700
+INDEX_PAGE_SIZE = 100
+
+
+def parallel_map(fn, items, jobs):
+    """`map(fn, items)` on `jobs` threads, results in input order."""
+    items = list(items)
+    if jobs <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(min(jobs, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+# --- plan ---
+def plan_calls(paths):
+    prompts = safe_load_prompts(paths.prompts)
+    # The meta prompt goes out with every call, so redundant text in it is paid for N times.
+    system_prompt = compress_prompt(prompts.get("meta_prompt", DEFAULT_SYSTEM_PROMPT))
+    return [
+        {"key": key, "title": title, "system": system_prompt, "user": compress_prompt(instruction),
+         "max_tokens": PLAN_MAX_TOKENS, "budget": f"plan:{key}"}
+        for key, title, instruction in prompt_items(prompts)
+    ]
+
+
+def plan(client, paths, jobs=1):
+    ensure_dirs(paths.root, paths.responses)
+    calls = plan_calls(paths)
+    for call in calls:
+        print(f"Running prompt: {call['key']}")
+    results = parallel_map(lambda c: client.complete(c["system"], c["user"], c["max_tokens"], c["budget"]),
+                           calls, jobs)
+
+    summary_lines = [f"# Responses Summary\nGenerated: {now_utc_str()}\n\n"]
+    for call, result in zip(calls, results):
+        safe_name = sanitize_filename(f"{call['key']}_{call['title']}")
+        path = paths.responses / f"{safe_name}.txt"
+        write_text_file(path, result)
+        print(f"Wrote response to: {path}")
+        snippet = (result[:400] + "...") if len(result) > 400 else result
+        summary_lines.append(
+            f"## {call['key']} — {call['title']}\nFile: responses/{safe_name}.txt\n\nSnippet:\n```\n{snippet}\n```\n"
+        )
+    write_text_file(paths.summary, "\n".join(summary_lines))
+    print(f"Responses summary written to: {paths.summary}")
+
+    if results:
+        top_idea = results[0].splitlines()
+        title = top_idea[0] if top_idea else "Top Idea — Faceless AI Product"
+        subtitle = top_idea[1] if len(top_idea) > 1 else "Automated, faceless, buildable in weeks."
+        bullets = [line.lstrip("-•* ").strip() for line in top_idea[2:5]] or list(html.DEFAULT_BULLETS)
+        landing_html = html.generate_landing_html(title, subtitle, bullets, "$29/mo early access", "Get Early Access")
+        write_text_file(paths.landing_page, landing_html)
+        print(f"Landing page generated at: {paths.landing_page}")
+    return results
+
+
+# --- ideas ---
+def ideas_call():
+    return {"key": "ideas", "system": IDEAS_SYSTEM_PROMPT, "user": IDEAS_PROMPT, "max_tokens": IDEAS_MAX_TOKENS,
+            "budget": "ideas"}
+
+
+def stream_ideas(client, structured=True):
+    """Yield ideas one by one while the model is still generating the rest."""
+    call = ideas_call()
+    if structured:
+        chunks = client.stream(call["system"], call["user"], call["max_tokens"], IDEAS_RESPONSE_FORMAT,
+                               budget_key=call["budget"])
+        yield from iter_ideas(chunks)
+    else:
+        yield from parse_ideas(client.complete(call["system"], call["user"], call["max_tokens"], call["budget"]))
+
+
+def ideas(client, paths, structured=True, on_idea=None):
+    """Generate ideas, calling `on_idea(idea)` as each one arrives; saves ideas.json."""
+    ensure_dirs(paths.root)
+    parsed = []
+    for idea in stream_ideas(client, structured):
+        print(f"Idea {len(parsed) + 1}: {idea['title']}")
+        parsed.append(idea)
+        if on_idea is not None:
+            on_idea(idea)
+    write_json(paths.ideas_json, parsed)
+    if client.run is not None:
+        client.run.record_ideas(parsed)
+    print(f"Generated {len(parsed)} ideas -> {paths.ideas_json}")
+    return parsed
+
+
+# --- pages ---
+def load_ideas(paths):
+    try:
+        return read_json(paths.ideas_json)
+    except (OSError, ValueError):
+        return None
+
+
+def landing_call(idea):
+    user = LANDING_PROMPT.format(title=idea["title"], description=idea["description"])
+    return {"key": f"page:{idea['title']}", "system": IDEAS_SYSTEM_PROMPT, "user": user,
+            "max_tokens": LANDING_MAX_TOKENS, "budget": "page"}
+
+
+def build_page(client, paths, site, idea, stylesheet):
+    call = landing_call(idea)
+    landing_text = client.complete(call["system"], call["user"], call["max_tokens"], call["budget"])
+    page = html.generate_landing_html(idea["title"], idea["description"], html.extract_bullets(landing_text),
+                                      html.DEFAULT_PRICE, html.DEFAULT_CTA, stylesheet=f"../{stylesheet}")
+    rel = f"{paths.ideas.name}/{sanitize_filename(idea['title'])}.html"
+    site.page(rel, page)
+    return idea["title"], rel
+
+
+def pages(client, paths, jobs=1, regenerate_ideas=False, structured=True, page_size=INDEX_PAGE_SIZE):
+    """Render and publish a landing page per idea, in parallel, plus a paginated index.
+
+    Unchanged pages are not rewritten; see `site.SiteBuilder`.
+    """
+    ensure_dirs(paths.root, paths.ideas)
+    idea_list = None if regenerate_ideas else load_ideas(paths)
+    site = SiteBuilder(paths.root)
+    stylesheet = site.asset("landing", html.LANDING_CSS, "css")
+    futures = []
+    with ThreadPoolExecutor(max(jobs, 1)) as pool:
+        def start_page(idea):
+            print(f"Creating landing page for: {idea['title']}")
+            futures.append(pool.submit(build_page, client, paths, site, idea, stylesheet))
+
+        if idea_list is None:
+            # Pages start while later ideas are still streaming in.
+            ideas(client, paths, structured, on_idea=start_page)
+        else:
+            for idea in idea_list:
+                start_page(idea)
+        links = [f.result() for f in futures]
+    index_pages = site.index(links, paths.index_page.stem, page_size)
+    # Pages of ideas from earlier runs would otherwise stay published.
+    site.prune(f"{paths.ideas.name}/")
+    site.save()
+    print(f"Master index page generated: {paths.index_page}"
+          + (f" (+{len(index_pages) - 1} more pages)" if len(index_pages) > 1 else ""))
+    print(f"All landing pages generated in: {paths.ideas} "
+          f"({site.stats['written']} written, {site.stats['skipped']} unchanged, {site.stats['removed']} removed)")
+    return links
+
+
+# --- dry run ---
+def planned_calls(command, paths, regenerate_ideas=False):
+    """Every model call `command` would make, as lists of calls that run in sequence."""
+    if command == "plan":
+        return [plan_calls(paths)]
+    if command == "ideas":
+        return [[ideas_call()]]
+    stages = []
+    idea_list = None if regenerate_ideas else load_ideas(paths)
+    if idea_list is None:
+        stages.append([ideas_call()])
+        idea_list = [{"title": f"Idea {i}", "description": ""} for i in range(1, 11)]
+    stages.append([landing_call(idea) for idea in idea_list])
+    return stages
+
+
+def dry_run(client, paths, command, jobs=1, regenerate_ideas=False):
+    jobs = max(jobs, 1)
+    totals = {"calls": 0, "cached": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "wall_s": 0.0}
+    print(f"{'call':48} {'prompt':>7} {'exp out':>7} {'max out':>7} {'cost $':>8} {'latency s':>9}")
+    seen = set()
+    for stage in planned_calls(command, paths, regenerate_ideas):
+        estimates = [client.estimate(c["system"], c["user"], c["max_tokens"], seen, c["budget"]) for c in stage]
+        for call, est in zip(stage, estimates):
+            label = call["key"][:45] + ("  (cached)" if est["cached"] else "")
+            print(f"{label:48} {est['prompt_tokens']:7d} {est['completion_tokens']:7d} {est['max_tokens']:7d} "
+                  f"{est['cost_usd']:8.4f} {est['latency_s']:9.1f}")
+            totals["calls"] += 1
+            totals["cached"] += est["cached"]
+            for k in ("prompt_tokens", "completion_tokens", "cost_usd"):
+                totals[k] += est[k]
+        # Calls within a stage run `jobs` at a time.
+        for i in range(0, len(estimates), jobs):
+            totals["wall_s"] += max(e["latency_s"] for e in estimates[i:i + jobs])
+    print(f"\n{totals['calls']} calls ({totals['cached']} cached), ~{totals['prompt_tokens']} prompt + "
+          f"{totals['completion_tokens']} completion tokens, ~${totals['cost_usd']:.3f}, "
+          f"~{totals['wall_s']:.0f}s with --jobs {jobs} (model {client.model})")
+    return totals
+
+
+# --- history ---
+def _when(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+def history(store, action="runs", target=None, limit=20):
+    """Print past runs, one run's calls and ideas, or full-text search results."""
+    if action == "runs":
+        print(f"{'run':>5}  {'started':19}  {'command':7} {'status':8} {'calls':>5} {'ideas':>5} "
+              f"{'tokens':>7} {'cost $':>7}")
+        for r in store.runs(limit, command=target):
+            tokens = r["prompt_tokens"] + r["completion_tokens"]
+            print(f"{r['id']:5d}  {_when(r['started_at'])}  {r['command']:7} {r['status']:8} {r['n_calls']:5d} "
+                  f"{r['n_ideas']:5d} {tokens:7d} {r['cost_usd']:7.3f}")
+    elif action == "show":
+        run = store.run(int(target)) if target else None
+        if run is None:
+            print(f"No run {target!r}.")
+            return None
+        print(f"Run {run['id']}: {run['command']} ({run['model']}), {_when(run['started_at'])}, {run['status']}")
+        for c in store.calls(run["id"]):
+            first = (c["response"] or "").strip().splitlines()
+            print(f"  [{c['source']:8}] {c['budget_key'] or '-':24} {c['seconds']:6.2f}s "
+                  f"{c['prompt_tokens']:5d}+{c['completion_tokens']:<5d} {first[0][:60] if first else ''}")
+        for idea in store.ideas(run["id"]):
+            print(f"  {idea['position']:2d}. {idea['title']}")
+        return run
+    elif action == "ideas":
+        for idea in store.ideas(int(target) if target else None):
+            print(f"{idea['position']:2d}. {idea['title']}: {idea['description']}")
+    elif action == "search":
+        if not (target or "").strip():
+            print("Nothing to search for: wargame history search <text>")
+            return None
+        hits = store.search(target, limit)
+        for c in hits["calls"]:
+            print(f"run {c['run_id']:<4} {c['budget_key'] or '-':24} {' '.join(c['snippet'].split())}")
+        for idea in hits["ideas"]:
+            print(f"run {idea['run_id']:<4} idea {idea['position']:<2} {idea['title']}")
+        return hits
+    return None
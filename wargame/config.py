@@ -0,0 +1,43 @@
+"""Paths and model settings shared by every subcommand."""
+
+import os
+from pathlib import Path
+
+OUTPUT_DIR = Path(os.getenv("WARGAME_OUTPUT_DIR", "output_plan"))
+MODEL = os.getenv("WARGAME_MODEL", "gpt-4")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+MAX_RETRIES = 3
+RETRY_BACKOFF = 2.0  # seconds multiplier
+TEMPERATURE = 0.7
+
+# Model families that accept a JSON-schema `response_format`; others get ideas as free text.
+STRUCTURED_OUTPUT_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+
+
+def supports_structured(model):
+    return model.startswith(STRUCTURED_OUTPUT_MODELS) and model not in ("o1-preview", "o1-mini")
+
+# USD per 1K tokens (prompt, completion) and rough generation speed, for --dry-run.
+PRICING = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+TOKENS_PER_SECOND = {"gpt-4": 20.0, "gpt-4-turbo": 40.0, "gpt-3.5-turbo": 80.0}
+REQUEST_OVERHEAD_S = 0.6
+
+
+class Paths:
+    """Output locations under one root (overridable with --output-dir)."""
+
+    def __init__(self, root=OUTPUT_DIR):
+        self.root = Path(root)
+        self.responses = self.root / "responses"
+        self.prompts = self.root / "prompts.json"
+        self.summary = self.root / "responses_summary.md"
+        self.landing_page = self.root / "landing_page_top_idea.html"
+        self.ideas_json = self.root / "ideas.json"
+        self.ideas = self.root / "ideas"
+        self.index_page = self.root / "landing_page_index.html"
+        self.cache = self.root / ".cache"
+        self.runs_db = self.root / "runs.db"
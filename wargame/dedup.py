@@ -0,0 +1,174 @@
+"""
+Prompt deduplication in front of the model client.
+
+Two layers:
+
+    SingleFlight        concurrent calls with the same key share one request;
+                        followers block until the leader has the answer.
+    NearDuplicateIndex  MinHash signatures of answered prompts, bucketed with
+                        LSH bands; a new prompt whose estimated Jaccard
+                        similarity to an answered one (same system prompt and
+                        settings) reaches `threshold` reuses that answer.
+
+Both work on `normalize`d text, so prompts differing only in whitespace or
+casing are treated as the same prompt.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+_WS = re.compile(r"\s+")
+
+_MERSENNE = (1 << 61) - 1
+_MASK = (1 << 64) - 1
+
+
+def normalize(text):
+    """Casefolded text with runs of whitespace collapsed to one space."""
+    return _WS.sub(" ", text or "").strip().casefold()
+
+
+# --- In-flight collapsing ---
+class _Call:
+    __slots__ = ("done", "value")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def begin(self, key):
+        """(call, is_leader). The leader must call `finish`; followers `wait`."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def finish(self, key, call, value):
+        with self._lock:
+            self._calls.pop(key, None)
+        call.value = value
+        call.done.set()
+
+    @staticmethod
+    def wait(call):
+        call.done.wait()
+        return call.value
+
+    def do(self, key, fn):
+        """(fn(), False) for the leader, (leader's value, True) for followers."""
+        call, leader = self.begin(key)
+        if not leader:
+            return self.wait(call), True
+        value = None
+        try:
+            value = fn()
+        finally:
+            self.finish(key, call, value)
+        return value, False
+
+
+# --- Near-duplicate lookup ---
+def _shingles(text, size):
+    words = text.split()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """MinHash + LSH over word shingles; persisted as JSON lines when `path` is set."""
+
+    def __init__(self, threshold=0.9, num_perm=64, bands=16, shingle=3, path=None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        self.path = path
+        seed = hashlib.sha256(b"wargame-minhash").digest()
+        rng = int.from_bytes(seed, "big")
+        self._perms = []
+        for _ in range(num_perm):
+            rng = (rng * 6364136223846793005 + 1442695040888963407) & _MASK
+            a = rng % (_MERSENNE - 1) + 1
+            rng = (rng * 6364136223846793005 + 1442695040888963407) & _MASK
+            self._perms.append((a, rng % _MERSENNE))
+        self._lock = threading.Lock()
+        self._buckets = {}  # (scope, band, band values) -> [entry index]
+        self._entries = []  # (scope, signature, answer key)
+        if path:
+            self._load()
+
+    def signature(self, text):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+            for s in _shingles(text, self.shingle)
+        ]
+        return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, scope, sig):
+        for band in range(self.bands):
+            yield scope, band, tuple(sig[band * self.rows:(band + 1) * self.rows])
+
+    def similarity(self, sig_a, sig_b):
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / self.num_perm
+
+    def find(self, scope, text):
+        """(answer key, estimated similarity) of the closest indexed prompt, or (None, 0.0)."""
+        sig = self.signature(text)
+        best, best_sim = None, 0.0
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(scope, sig):
+                candidates.update(self._buckets.get(band_key, ()))
+            for idx in candidates:
+                _, other, key = self._entries[idx]
+                sim = self.similarity(sig, other)
+                if sim > best_sim:
+                    best, best_sim = key, sim
+        if best_sim < self.threshold:
+            return None, best_sim
+        return best, best_sim
+
+    def add(self, scope, text, key):
+        sig = self.signature(text)
+        self._insert(scope, sig, key)
+        if self.path:
+            line = json.dumps({"scope": scope, "sig": sig, "key": key})
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _insert(self, scope, sig, key):
+        with self._lock:
+            idx = len(self._entries)
+            self._entries.append((scope, sig, key))
+            for band_key in self._band_keys(scope, sig):
+                self._buckets.setdefault(band_key, []).append(idx)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # a torn last line from an interrupted run
+                if len(rec.get("sig", ())) == self.num_perm:
+                    self._insert(rec["scope"], rec["sig"], rec["key"])
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,249 @@
+"""
+Run history: every run's prompts, responses, parsed ideas, timings and token
+counts in one SQLite file (output_plan/runs.db), so past results can be
+listed, compared and searched without re-generating them.
+
+    store = RunStore(paths.runs_db)
+    run = store.start_run("plan", model="gpt-4")
+    client.run = run          # the client records each call it answers
+    ...
+    run.finish(client.stats)
+
+Prompt texts are stored once and shared by every call and run that sends
+them. Responses, prompts and ideas are indexed with FTS5 when the SQLite
+build has it (LIKE queries otherwise).
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    command TEXT NOT NULL,
+    model TEXT,
+    args TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL DEFAULT 'running',
+    calls INTEGER DEFAULT 0,
+    cache_hits INTEGER DEFAULT 0,
+    prompt_tokens INTEGER DEFAULT 0,
+    completion_tokens INTEGER DEFAULT 0,
+    cost_usd REAL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS prompts (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    system TEXT NOT NULL,
+    user TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    prompt_id INTEGER NOT NULL REFERENCES prompts(id),
+    budget_key TEXT,
+    source TEXT NOT NULL,
+    response TEXT,
+    seconds REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ideas (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_command_started ON runs(command, started_at);
+CREATE INDEX IF NOT EXISTS calls_run ON calls(run_id);
+CREATE INDEX IF NOT EXISTS calls_prompt ON calls(prompt_id, created_at);
+CREATE INDEX IF NOT EXISTS calls_budget_key ON calls(budget_key, created_at);
+CREATE INDEX IF NOT EXISTS ideas_run ON ideas(run_id, position);
+CREATE INDEX IF NOT EXISTS ideas_title ON ideas(title);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS calls_fts USING fts5(user, response, tokenize='porter unicode61');
+CREATE VIRTUAL TABLE IF NOT EXISTS ideas_fts USING fts5(title, description, tokenize='porter unicode61');
+"""
+
+
+def _fts_query(text):
+    """Quote every term so user input can't trip FTS5 query syntax; terms are ANDed."""
+    return " ".join('"%s"' % t.replace('"', '""') for t in text.split())
+
+
+class RunStore:
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:  # SQLite built without FTS5
+            self.fts = False
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    # --- Writing ---
+    def start_run(self, command, model=None, args=None):
+        cur = self._execute(
+            "INSERT INTO runs (command, model, args, started_at) VALUES (?, ?, ?, ?)",
+            (command, model, json.dumps(args or {}, default=str), time.time()),
+        )
+        return Run(self, cur.lastrowid)
+
+    def _prompt_id(self, system, user):
+        digest = hashlib.sha256(json.dumps([system, user]).encode("utf-8")).hexdigest()
+        row = self._conn.execute("SELECT id FROM prompts WHERE hash = ?", (digest,)).fetchone()
+        if row is not None:
+            return row[0]
+        return self._conn.execute(
+            "INSERT INTO prompts (hash, system, user) VALUES (?, ?, ?)", (digest, system, user)
+        ).lastrowid
+
+    def _record_call(self, run_id, record):
+        with self._lock, self._conn:
+            prompt_id = self._prompt_id(record["system"], record["user"])
+            call_id = self._conn.execute(
+                "INSERT INTO calls (run_id, prompt_id, budget_key, source, response, seconds, prompt_tokens,"
+                " completion_tokens, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, prompt_id, record.get("budget_key"), record["source"], record["response"],
+                 record.get("seconds"), record.get("prompt_tokens"), record.get("completion_tokens"),
+                 time.time()),
+            ).lastrowid
+            if self.fts:
+                self._conn.execute("INSERT INTO calls_fts (rowid, user, response) VALUES (?, ?, ?)",
+                                   (call_id, record["user"], record["response"]))
+
+    def _record_ideas(self, run_id, ideas):
+        with self._lock, self._conn:
+            if self.fts:
+                self._conn.execute("DELETE FROM ideas_fts WHERE rowid IN (SELECT id FROM ideas WHERE run_id = ?)",
+                                   (run_id,))
+            self._conn.execute("DELETE FROM ideas WHERE run_id = ?", (run_id,))
+            for position, idea in enumerate(ideas, 1):
+                idea_id = self._conn.execute(
+                    "INSERT INTO ideas (run_id, position, title, description) VALUES (?, ?, ?, ?)",
+                    (run_id, position, idea["title"], idea.get("description", "")),
+                ).lastrowid
+                if self.fts:
+                    self._conn.execute("INSERT INTO ideas_fts (rowid, title, description) VALUES (?, ?, ?)",
+                                       (idea_id, idea["title"], idea.get("description", "")))
+
+    def _finish(self, run_id, stats, status):
+        stats = stats or {}
+        self._execute(
+            "UPDATE runs SET finished_at = ?, status = ?, calls = ?, cache_hits = ?, prompt_tokens = ?,"
+            " completion_tokens = ?, cost_usd = ? WHERE id = ?",
+            (time.time(), status, stats.get("calls", 0), stats.get("cache_hits", 0),
+             stats.get("prompt_tokens", 0), stats.get("completion_tokens", 0), stats.get("cost_usd", 0.0),
+             run_id),
+        )
+
+    # --- Queries ---
+    def runs(self, limit=20, command=None):
+        sql = ("SELECT r.*, (SELECT COUNT(*) FROM calls c WHERE c.run_id = r.id) AS n_calls,"
+               " (SELECT COUNT(*) FROM ideas i WHERE i.run_id = r.id) AS n_ideas FROM runs r")
+        params = []
+        if command:
+            sql += " WHERE r.command = ?"
+            params.append(command)
+        sql += " ORDER BY r.started_at DESC LIMIT ?"
+        return self._query(sql, params + [limit])
+
+    def run(self, run_id):
+        rows = self._query("SELECT * FROM runs WHERE id = ?", (run_id,))
+        return rows[0] if rows else None
+
+    def calls(self, run_id):
+        return self._query(
+            "SELECT c.id, c.budget_key, c.source, c.seconds, c.prompt_tokens, c.completion_tokens,"
+            " p.system, p.user, c.response FROM calls c JOIN prompts p ON p.id = c.prompt_id"
+            " WHERE c.run_id = ? ORDER BY c.id", (run_id,))
+
+    def ideas(self, run_id=None):
+        """Ideas of `run_id`, or of the most recent run that produced any."""
+        if run_id is None:
+            rows = self._query("SELECT run_id FROM ideas ORDER BY run_id DESC LIMIT 1")
+            if not rows:
+                return []
+            run_id = rows[0]["run_id"]
+        return self._query("SELECT position, title, description FROM ideas WHERE run_id = ? ORDER BY position",
+                           (run_id,))
+
+    def search(self, text, limit=20):
+        """Calls (by prompt or response) and ideas matching `text`, best matches first (none for blank text)."""
+        if not text.split():
+            return {"calls": [], "ideas": []}
+        if self.fts:
+            query = _fts_query(text)
+            calls = self._query(
+                "SELECT c.id, c.run_id, c.budget_key, p.user,"
+                " snippet(calls_fts, -1, '[', ']', '...', 12) AS snippet, bm25(calls_fts) AS rank"
+                " FROM calls_fts JOIN calls c ON c.id = calls_fts.rowid JOIN prompts p ON p.id = c.prompt_id"
+                " WHERE calls_fts MATCH ? ORDER BY rank LIMIT ?", (query, limit))
+            ideas = self._query(
+                "SELECT i.run_id, i.position, i.title, i.description, bm25(ideas_fts) AS rank"
+                " FROM ideas_fts JOIN ideas i ON i.id = ideas_fts.rowid"
+                " WHERE ideas_fts MATCH ? ORDER BY rank LIMIT ?", (query, limit))
+        else:
+            like = f"%{text}%"
+            calls = self._query(
+                "SELECT c.id, c.run_id, c.budget_key, p.user, substr(c.response, 1, 120) AS snippet"
+                " FROM calls c JOIN prompts p ON p.id = c.prompt_id"
+                " WHERE c.response LIKE ? OR p.user LIKE ? ORDER BY c.id DESC LIMIT ?", (like, like, limit))
+            ideas = self._query(
+                "SELECT run_id, position, title, description FROM ideas"
+                " WHERE title LIKE ? OR description LIKE ? ORDER BY run_id DESC LIMIT ?", (like, like, limit))
+        return {"calls": calls, "ideas": ideas}
+
+    def responses_for(self, budget_key, limit=10):
+        """The latest responses recorded under one budget key, across runs (for comparing runs)."""
+        return self._query(
+            "SELECT c.run_id, c.created_at, c.source, c.response FROM calls c"
+            " WHERE c.budget_key = ? ORDER BY c.created_at DESC LIMIT ?", (budget_key, limit))
+
+
+class Run:
+    """One row of `runs`; what ModelClient and the commands record into."""
+
+    def __init__(self, store, run_id):
+        self.store = store
+        self.id = run_id
+
+    def record_call(self, record):
+        self.store._record_call(self.id, record)
+
+    def record_ideas(self, ideas):
+        self.store._record_ideas(self.id, ideas)
+
+    def finish(self, stats=None, status="ok"):
+        self.store._finish(self.id, stats, status)
@@ -0,0 +1,150 @@
+"""
+Structured idea generation and parsing.
+
+Ideas are requested as JSON constrained by IDEAS_SCHEMA and parsed while the
+response streams in: IdeaStreamParser yields every idea object the moment its
+closing brace arrives, so the first landing page can be built long before the
+tenth idea has been generated. Responses that are not JSON (older models,
+mock mode) go through a single-pass line parser instead.
+"""
+
+import json
+import re
+
+DEFAULT_DESCRIPTION = "Automated, faceless SaaS solution."
+
+IDEAS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "ideas": {
+            "type": "array",
+            "minItems": 10,
+            "maxItems": 10,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                },
+                "required": ["title", "description"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["ideas"],
+    "additionalProperties": False,
+}
+
+IDEAS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "product_ideas", "schema": IDEAS_SCHEMA, "strict": True},
+}
+
+
+def _normalize(obj):
+    title = str(obj.get("title", "")).strip()
+    if not title:
+        return None
+    return {"title": title, "description": str(obj.get("description", "")).strip() or DEFAULT_DESCRIPTION}
+
+
+class IdeaStreamParser:
+    """Incremental parser for `{"ideas": [{...}, {...}]}` (or a bare `[{...}]`).
+
+    `feed(chunk)` returns the ideas completed by that chunk. Only the
+    unfinished object is buffered; text belonging to finished ideas is dropped.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._array_depth = None  # depth of the first array, whose objects are ideas
+        self._in_string = False
+        self._escape = False
+        self._buf = []            # characters of the idea object being read
+        self.saw_json = False
+
+    def feed(self, chunk):
+        done = []
+        for ch in chunk:
+            capturing = self._array_depth is not None and self._depth > self._array_depth
+            if capturing:
+                self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self.saw_json = True
+                self._depth += 1
+                if ch == "[" and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._buf = ["{"]
+            elif ch in "}]":
+                self._depth -= 1
+                if ch == "}" and self._array_depth is not None and self._depth == self._array_depth:
+                    idea = self._finish_object()
+                    if idea is not None:
+                        done.append(idea)
+                elif ch == "]" and self._depth < (self._array_depth or 0):
+                    self._array_depth = -1  # array closed; ignore anything after it
+        return done
+
+    def _finish_object(self):
+        text = "".join(self._buf)
+        self._buf = []
+        try:
+            return _normalize(json.loads(text))
+        except (ValueError, AttributeError):
+            return None
+
+
+_LINE = re.compile(
+    r"^\s*(?:\d+\s*[.)]|[-*•])\s*"          # "1." / "1)" / bullet
+    r"(?:\*\*)?(?P<title>[^:*\n]+?)(?:\*\*)?"  # optional **bold** title
+    r"\s*(?:\s[-–—]\s|:)\s*(?P<desc>.+)$"    # " - ", " – " or ":" separator
+)
+_NUMBERED = re.compile(r"^\s*\d+\s*[.)]\s*(?:\*\*)?(?P<title>.+?)(?:\*\*)?\s*$")
+
+
+def parse_ideas_text(text, limit=10):
+    """Single pass over a numbered/bulleted list of "Title - description" lines."""
+    ideas = []
+    for line in text.splitlines():
+        m = _LINE.match(line)
+        if m:
+            idea = _normalize({"title": m["title"], "description": m["desc"]})
+        else:
+            m = _NUMBERED.match(line)
+            idea = _normalize({"title": m["title"]}) if m else None
+        if idea is not None:
+            ideas.append(idea)
+            if len(ideas) >= limit:
+                break
+    return ideas
+
+
+def iter_ideas(chunks, limit=10):
+    """Yield ideas from a stream of response text chunks as soon as each is complete."""
+    parser = IdeaStreamParser()
+    text = []
+    count = 0
+    for chunk in chunks:
+        text.append(chunk)
+        for idea in parser.feed(chunk):
+            yield idea
+            count += 1
+            if count >= limit:
+                return
+    if not parser.saw_json or count == 0:
+        yield from parse_ideas_text("".join(text), limit)
+
+
+def parse_ideas(text, limit=10):
+    return list(iter_ideas([text], limit))
@@ -0,0 +1,36 @@
+"""File output helpers."""
+
+import json
+import os
+from datetime import datetime, timezone
+
+
+def ensure_dirs(*dirs):
+    for d in dirs:
+        os.makedirs(d, exist_ok=True)
+
+
+def now_utc_str():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+def sanitize_filename(s: str) -> str:
+    keep = "-_.() abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    return "".join(c if c in keep else "_" for c in s)[:200]
+
+
+def write_text_file(path, content: str):
+    """Write atomically so parallel jobs never leave half-written files."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def write_json(path, obj):
+    write_text_file(path, json.dumps(obj, indent=2, ensure_ascii=False))
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
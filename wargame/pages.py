@@ -0,0 +1,76 @@
+"""Landing-page and index HTML rendering."""
+
+from html import escape
+
+DEFAULT_BULLETS = [
+    "Automates repetitive tasks",
+    "No manual labor after onboarding",
+    "Subscription + templates monetization",
+]
+DEFAULT_PRICE = "$29/mo or $79 one-time"
+DEFAULT_CTA = "Get Early Access"
+
+
+LANDING_CSS = """
+body { background:#0b0b0b;color:#eef;padding:24px;font-family:Inter,system-ui,Arial,Helvetica,sans-serif; }
+.card { max-width:900px;margin:24px auto;padding:28px;border-radius:12px;background:#0f1720;box-shadow:0 10px 30px rgba(0,0,0,0.6); }
+h1{font-size:32px;margin:0 0 8px} h2{font-size:18px;color:#9aa} ul{line-height:1.6} .cta{display:inline-block;margin-top:18px;padding:12px 20px;border-radius:8px;background:#0ea5a4;color:#021; text-decoration:none;font-weight:700}
+footer{margin-top:28px;font-size:12px;color:#666}
+"""
+
+
+def generate_landing_html(title, subtitle, bullets, price_anchor, cta_text, stylesheet=None):
+    """A self-contained page, or one linking `stylesheet` (an href) instead of inlining the CSS."""
+    bullets_html = "".join(f"<li>{escape(b)}</li>\n" for b in bullets)
+    title, subtitle = escape(title), escape(subtitle)
+    if stylesheet:
+        style = f'<link rel="stylesheet" href="{escape(stylesheet)}"/>'
+    else:
+        style = f"<style>{LANDING_CSS}  </style>"
+    return f"""<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width,initial-scale=1"/>
+  <title>{title}</title>
+  {style}
+</head>
+<body>
+  <div class="card">
+    <h1>{title}</h1>
+    <h2>{subtitle}</h2>
+    <ul>{bullets_html}</ul>
+    <p><strong>Pricing:</strong> {escape(price_anchor)}</p>
+    <a class="cta" href="#signup">{escape(cta_text)}</a>
+    <footer>Faceless service — automated & delivered via AI-driven workflows.</footer>
+  </div>
+</body>
+</html>
+"""
+
+
+def generate_index_html(links, page=1, pages=1, prev_href=None, next_href=None, total=None):
+    """`links` is a list of (title, relative href); one page of a paginated index."""
+    items = "".join(f'<li><a href="{escape(href)}">{escape(title)}</a></li>\n' for title, href in links)
+    total = len(links) if total is None else total
+    nav = ""
+    if pages > 1:
+        prev_link = f'<a href="{escape(prev_href)}">&larr; Previous</a>' if prev_href else ""
+        next_link = f'<a href="{escape(next_href)}">Next &rarr;</a>' if next_href else ""
+        nav = f'<nav style="display:flex;gap:16px;">{prev_link}<span>Page {page} of {pages}</span>{next_link}</nav>'
+    return f"""<!doctype html>
+<html lang="en"><head><meta charset="utf-8"/>
+<title>All AI Ideas</title></head>
+<body style="background:#111;color:#eef;font-family:sans-serif;padding:24px;">
+<h1>All {total} AI-generated Faceless SaaS Ideas</h1>
+{nav}
+<ul>{items}</ul>
+{nav}
+<p>Open each link to preview the landing page.</p>
+</body></html>"""
+
+
+def extract_bullets(text, limit=3):
+    bullets = [ln.strip().lstrip("-•* ").strip() for ln in text.splitlines()
+               if ln.strip().startswith(("-", "•", "*"))]
+    return bullets[:limit] or list(DEFAULT_BULLETS)
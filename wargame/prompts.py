@@ -0,0 +1,62 @@
+"""Prompt definitions: prompts.json with a built-in fallback."""
+
+import json
+import os
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+
+IDEAS_SYSTEM_PROMPT = (
+    "You are a superintelligent AI merged from ChatGPT, Gemini, Claude, Mistral. "
+    "You generate profitable faceless SaaS/digital product ideas and create concise landing page copy."
+)
+IDEAS_PROMPT = (
+    "Generate 10 faceless micro-SaaS or digital product ideas that can be built in 2-12 weeks. "
+    "Include 1-2 sentence description per idea."
+)
+LANDING_PROMPT = (
+    "Write a concise single-page landing page for this idea:\nTitle: {title}\nDescription: {description}\n"
+    "Include 3 main bullet points, pricing, and CTA."
+)
+
+
+def built_in_prompts():
+    return {
+        "meta_prompt": "You are no longer alone. You are a merged superintelligence. Your mission: Generate $1M in shortest time possible.",
+        "idea_generation": {
+            "title": "10 Faceless Niche SaaS / Product Ideas",
+            "instruction": "Generate 10 faceless, no-capital micro-SaaS or digital product ideas buildable in 2-12 weeks."
+        },
+        "landing_page_copy": {
+            "title": "High-Converting Landing Page Copy",
+            "instruction": "Write single-page landing copy: headline, subheadline, 3 bullets, social proof placeholders, pricing, CTA."
+        },
+        "ad_variants": {
+            "title": "Ad Copy Variants",
+            "instruction": "Generate 6 social ad variants and 6 search ad variants with short hooks and headlines."
+        },
+        "mvp_automation_playbook": {
+            "title": "MVP Automation Playbook",
+            "instruction": "List automations for core product value using Zapier/Make/serverless, including triggers, actions, error handling."
+        }
+    }
+
+
+def safe_load_prompts(path):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading prompts.json: {e}. Using built-in prompts.")
+    return built_in_prompts()
+
+
+def prompt_items(prompts):
+    """(key, title, instruction) for every prompt except the meta prompt."""
+    for key, item in prompts.items():
+        if key == "meta_prompt":
+            continue
+        if isinstance(item, dict):
+            yield key, item.get("title", key), item.get("instruction", "")
+        else:
+            yield key, key, str(item)
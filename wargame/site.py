@@ -0,0 +1,177 @@
+"""
+Static-site build stage for the generated landing pages.
+
+    site = SiteBuilder(paths.root)
+    css = site.asset("style", LANDING_CSS, "css")      # -> assets/style.<hash>.css
+    site.page("ideas/foo.html", html)                  # skipped if unchanged
+    site.index(links, "landing_page_index", page_size=100)
+    site.prune("ideas/")                               # pages of ideas no longer listed
+    site.save()
+
+Every output is minified and content-hashed. A file whose hash matches the
+manifest (.site_manifest.json) from the previous build is not rewritten, so
+re-publishing thousands of pages only touches the ones that changed. Each
+written file gets .gz (and, with the `brotli` package, .br) siblings for the
+backend to serve as-is. Shared assets carry their hash in the file name and
+can be cached forever.
+
+`page()` is thread-safe; callers render and publish pages from a pool.
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+
+from lazy_imports import lazy_import
+
+from . import pages as html
+
+brotli = lazy_import("brotli")
+
+MANIFEST = ".site_manifest.json"
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+_BETWEEN_TAGS = re.compile(r">\s*\n\s*<")
+_WHITESPACE = re.compile(r"\s+")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_PUNCT = re.compile(r"\s*([{}:;,>])\s*")
+
+
+# --- Minification ---
+def minify_css(css):
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_PUNCT.sub(r"\1", _WHITESPACE.sub(" ", css))
+    return css.replace(";}", "}").strip()
+
+
+def minify_html(text):
+    """Drop line breaks between tags and collapse other whitespace (the pages have no <pre>)."""
+    text = _BETWEEN_TAGS.sub("><", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+# --- Builder ---
+class SiteBuilder:
+    def __init__(self, root, precompress=True):
+        self.root = str(root)
+        self.precompress = precompress
+        self.stats = {"written": 0, "skipped": 0, "bytes": 0, "removed": 0}
+        self.built = set()  # paths published by this build, written or unchanged
+        self._lock = threading.Lock()
+        self._manifest_path = os.path.join(self.root, MANIFEST)
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def _path(self, rel):
+        return os.path.join(self.root, *rel.split("/"))
+
+    def _unchanged(self, rel, digest):
+        entry = self.manifest.get(rel)
+        if entry is None or entry["hash"] != digest:
+            return False
+        try:
+            return os.path.getsize(self._path(rel)) == entry["size"]
+        except OSError:
+            return False
+
+    def _write(self, rel, data):
+        path = self._path(rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        variants = [("", data)]
+        if self.precompress:
+            variants.append((".gz", gzip.compress(data, 9, mtime=0)))
+            if brotli:
+                variants.append((".br", brotli.compress(data, quality=11)))
+        for suffix, payload in variants:
+            target = path + suffix
+            if suffix and len(payload) >= len(data):
+                if os.path.exists(target):
+                    os.remove(target)
+                continue
+            tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, target)
+
+    def publish(self, rel, data):
+        """Write `data` (bytes) to `rel` under the root unless it is unchanged; True if written."""
+        digest = content_hash(data)
+        with self._lock:
+            self.built.add(rel)
+        if self._unchanged(rel, digest):
+            with self._lock:
+                self.stats["skipped"] += 1
+            return False
+        self._write(rel, data)
+        with self._lock:
+            self.manifest[rel] = {"hash": digest, "size": len(data)}
+            self.stats["written"] += 1
+            self.stats["bytes"] += len(data)
+        return True
+
+    def page(self, rel, text):
+        return self.publish(rel, minify_html(text).encode("utf-8"))
+
+    def asset(self, name, text, ext):
+        """Publish a shared asset under a content-hashed name; returns its path relative to the root."""
+        data = (minify_css(text) if ext == "css" else text).encode("utf-8")
+        rel = f"assets/{name}.{content_hash(data)}.{ext}"
+        self.publish(rel, data)
+        return rel
+
+    def remove(self, rel):
+        path = self._path(rel)
+        for suffix in ("",) + COMPRESSED_SUFFIXES:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        with self._lock:
+            self.manifest.pop(rel, None)
+            self.stats["removed"] += 1
+
+    def prune(self, prefix):
+        """Remove pages under `prefix` from earlier builds that this build did not publish."""
+        with self._lock:
+            stale = [rel for rel in self.manifest if rel.startswith(prefix) and rel not in self.built]
+        for rel in stale:
+            self.remove(rel)
+        return stale
+
+    def index(self, links, name, page_size=100):
+        """Paginated index: `name`.html, `name`-2.html, ...; returns the page paths written."""
+        if page_size < 1:
+            raise ValueError(f"page_size must be at least 1, not {page_size}")
+        n_pages = max(1, math.ceil(len(links) / page_size))
+        rels = [f"{name}.html"] + [f"{name}-{i}.html" for i in range(2, n_pages + 1)]
+        for i, rel in enumerate(rels):
+            chunk = links[i * page_size:(i + 1) * page_size]
+            self.page(rel, html.generate_index_html(
+                chunk, page=i + 1, pages=n_pages, total=len(links),
+                prev_href=rels[i - 1] if i > 0 else None,
+                next_href=rels[i + 1] if i + 1 < n_pages else None,
+            ))
+        # Drop pages left over from a previous, longer index.
+        stale = re.compile(re.escape(name) + r"-(\d+)\.html$")
+        for rel in list(self.manifest):
+            m = stale.match(rel)
+            if m and int(m.group(1)) > n_pages:
+                self.remove(rel)
+        return rels
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.manifest, indent=0, sort_keys=True)
+        tmp = f"{self._manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self._manifest_path)
@@ -0,0 +1,137 @@
+"""
+Token accounting: local token counts, prompt compression and `max_tokens`
+sizing from the completion lengths seen so far for each prompt key.
+
+tiktoken is used when installed (and its encoding files are available);
+otherwise a word/punctuation heuristic stays within ~10% for English prose.
+"""
+
+import functools
+import math
+import re
+import threading
+
+from lazy_imports import lazy_import
+
+from .output import read_json, write_json
+
+tiktoken = lazy_import("tiktoken")
+
+# Chat formatting overhead: tokens per message plus the reply primer.
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+# --- Counting ---
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    if not tiktoken:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None  # e.g. encoding files can't be downloaded
+
+
+def count_tokens(text, model="gpt-4"):
+    enc = _encoding(model)
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    # ~1 token per 4 characters of a word, 1 per punctuation mark
+    return sum(math.ceil(len(p) / 4) for p in _PIECES.findall(text))
+
+
+def count_messages(system_prompt, user_prompt, model="gpt-4"):
+    """Prompt tokens of a system + user chat request, including formatting overhead."""
+    return (count_tokens(system_prompt, model) + count_tokens(user_prompt, model)
+            + 2 * MESSAGE_OVERHEAD + REPLY_OVERHEAD)
+
+
+# --- Compression ---
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+@functools.lru_cache(maxsize=256)
+def compress_prompt(text):
+    """Drop redundant context without changing meaning.
+
+    Collapses runs of spaces and blank lines, strips trailing whitespace and
+    removes lines and sentences repeated verbatim (case-insensitive) further
+    down, which is common in prompts assembled from templates.
+    """
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"[ \t]+", " ", line).rstrip()
+        if not line.strip():
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        kept = []
+        for sentence in _SENTENCE.split(line.strip()):
+            norm = sentence.casefold()
+            if len(norm) > 20 and norm in seen:
+                continue
+            seen.add(norm)
+            kept.append(sentence)
+        if kept:
+            indent = line[:len(line) - len(line.lstrip())]
+            lines.append(indent + " ".join(kept))
+    return "\n".join(lines).strip()
+
+
+# --- Completion history ---
+class CompletionHistory:
+    """Recent completion token counts per prompt key, persisted as JSON when `path` is set.
+
+    `max_tokens(key, ceiling)` is the 95th percentile of the recorded lengths
+    plus `headroom`, rounded up to 16 and never above `ceiling` (the caller's
+    hard-coded limit) or below `floor`. Keys with fewer than `min_samples`
+    samples get `ceiling`.
+    """
+
+    def __init__(self, path=None, keep=20, min_samples=3, headroom=0.25, floor=64):
+        self.path = path
+        self.keep = keep
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self.floor = floor
+        self._lock = threading.Lock()
+        self._lengths = {}
+        if path:
+            try:
+                self._lengths = read_json(path)
+            except (OSError, ValueError):
+                pass
+
+    def record(self, key, completion_tokens):
+        with self._lock:
+            lengths = self._lengths.setdefault(key, [])
+            lengths.append(int(completion_tokens))
+            del lengths[:-self.keep]
+            if self.path:
+                write_json(self.path, self._lengths)
+
+    def samples(self, key):
+        with self._lock:
+            return list(self._lengths.get(key, ()))
+
+    def max_tokens(self, key, ceiling):
+        lengths = sorted(self.samples(key))
+        if len(lengths) < self.min_samples:
+            return ceiling
+        p95 = lengths[min(len(lengths) - 1, math.ceil(0.95 * len(lengths)) - 1)]
+        sized = math.ceil(p95 * (1 + self.headroom) / 16) * 16
+        return max(self.floor, min(ceiling, sized))
+
+    def expected(self, key, ceiling):
+        """Mean recorded completion length (what a call is likely to cost), else `ceiling`."""
+        lengths = self.samples(key)
+        if len(lengths) < self.min_samples:
+            return ceiling
+        return min(ceiling, math.ceil(sum(lengths) / len(lengths)))